@@ -2,6 +2,32 @@
 import pandas as pd
 import numpy as np
 
+from pipeline.profiling import profiled
+
+TREND_LINES = {
+    1: "Performance trend: Improving 📈",
+    -1: "Performance trend: Declining 📉",
+    0: "Performance trend: Stable ➖",
+}
+STRATEGY_LINES = {
+    "High": "Strategy: Daily revision, reduce backlog, focus on fundamentals.",
+    "Medium": "Strategy: Strengthen weak subjects to move into Low Risk.",
+}
+DEFAULT_STRATEGY = "Strategy: Maintain consistency and aim for excellence."
+TREND_SIGNS = {"Improving": 1, "Declining": -1, "Stable": 0}
+
+
+def _trend_sign(sxy, tol=1e-9):
+    """
+    Sign of a least-squares slope from its numerator; near-zero is Stable.
+    """
+    if sxy > tol:
+        return 1
+    if sxy < -tol:
+        return -1
+    return 0
+
+
 class AdvancedMentorshipAgent:
     """
     Advanced mentorship agent that provides actionable, data-driven
@@ -9,7 +35,14 @@ class AdvancedMentorshipAgent:
     weak subjects, and study plan.
     """
 
-    def generate_mentorship(self, student_info, student_risk, student_weak, student_plan):
+    @profiled("agent.mentorship.generate_mentorship")
+    def generate_mentorship(self, student_info, student_risk, student_weak, student_plan,
+                            student_trend=None):
+        """
+        student_trend: optional PerformanceTrendAgent.student_trend() result;
+        when given, the trend line reflects scores over exam dates instead
+        of the order of the weak subjects.
+        """
         insights = []
 
         # -----------------------------
@@ -40,7 +73,7 @@ class AdvancedMentorshipAgent:
 
             # Weighted priority score
             df["priority_score"] = df["avg_score"] * df["difficulty_factor"]
-            df = df.sort_values("priority_score")
+            df = df.sort_values("priority_score", kind="stable")
 
             insights.append("Priority focus subjects:")
 
@@ -57,7 +90,7 @@ class AdvancedMentorshipAgent:
         # 3️⃣ Study plan summary
         # -----------------------------
         if not student_plan.empty:
-            upcoming = student_plan.sort_values("scheduled_date").head(5)
+            upcoming = student_plan.sort_values("scheduled_date", kind="stable").head(5)
             insights.append("Upcoming study focus:")
             for _, row in upcoming.iterrows():
                 insights.append(f"- {row['subject_id']} on {row['scheduled_date']}")
@@ -67,33 +100,142 @@ class AdvancedMentorshipAgent:
         # -----------------------------
         # 4️⃣ Performance trend (math-based)
         # -----------------------------
-        if not student_weak.empty and len(student_weak) > 1:
+        if student_trend is not None:
+            if student_trend.get("exams", 0) > 1:
+                insights.append(TREND_LINES[TREND_SIGNS[student_trend["trend"]]])
+        elif not student_weak.empty and len(student_weak) > 1:
             scores = df["avg_score"].values
             x = np.arange(len(scores))
-            slope = np.polyfit(x, scores, 1)[0]
-
-            if slope > 0:
-                insights.append("Performance trend: Improving 📈")
-            elif slope < 0:
-                insights.append("Performance trend: Declining 📉")
-            else:
-                insights.append("Performance trend: Stable ➖")
+            # Closed-form least-squares numerator; its sign is the slope's sign
+            n = len(scores)
+            sxy = float((x * scores).sum() - x.sum() * scores.sum() / n)
+            insights.append(TREND_LINES[_trend_sign(sxy)])
 
         # -----------------------------
         # 5️⃣ Improvement strategy
         # -----------------------------
         if not student_risk.empty:
-            if risk_level == "High":
-                insights.append(
-                    "Strategy: Daily revision, reduce backlog, focus on fundamentals."
-                )
-            elif risk_level == "Medium":
-                insights.append(
-                    "Strategy: Strengthen weak subjects to move into Low Risk."
-                )
-            else:
-                insights.append(
-                    "Strategy: Maintain consistency and aim for excellence."
-                )
+            insights.append(STRATEGY_LINES.get(risk_level, DEFAULT_STRATEGY))
 
         return "\n".join(insights)
+
+    # -----------------------------
+    # Cohort mode
+    # -----------------------------
+    @profiled("agent.mentorship.generate_cohort")
+    def generate_cohort(self, risk_df, weak_df, plan_df, subjects=None, student_ids=None,
+                        trends=None):
+        """
+        generate_mentorship for every student in one vectorized pass.
+
+        Takes the cohort-wide agent outputs (weak_df is merged with
+        subjects here if subjects is given) and returns a DataFrame of
+        student_id, insights with the same text the per-student method
+        produces. Students default to those in risk_df. trends is the
+        optional PerformanceTrendAgent.student_trends frame.
+        """
+        if student_ids is None:
+            student_ids = risk_df["student_id"]
+        students = pd.Index(pd.unique(np.asarray(student_ids)), name="student_id")
+        parts = []
+
+        def add(section, sid, rank, line):
+            parts.append(pd.DataFrame({
+                "student_id": np.asarray(sid),
+                "section": section,
+                "rank": np.asarray(rank) if np.ndim(rank) else rank,
+                "line": np.asarray(line, dtype=object),
+            }))
+
+        # 1️⃣ Academic risk summary
+        risk = risk_df.drop_duplicates("student_id")
+        risk = risk[students.get_indexer(np.asarray(risk["student_id"])) >= 0]
+        has_risk = students.isin(np.asarray(risk["student_id"]))
+        add(0, risk["student_id"], 0, [
+            f"Academic Risk Level: {level} (Score: {round(float(score), 2)})"
+            for level, score in zip(risk["risk_level"], risk["risk_score"])
+        ])
+        add(0, students[~has_risk], 0, "Academic Risk Level: Not Available")
+
+        # 2️⃣ Weak subject analysis: grouped 3 smallest priority scores
+        weak = weak_df[students.get_indexer(np.asarray(weak_df["student_id"])) >= 0].copy()
+        if subjects is not None and not weak.empty:
+            weak = weak.merge(subjects, on="subject_id", how="left")
+        weak["avg_score"] = pd.to_numeric(weak["avg_score"], errors="coerce").fillna(0)
+        if "difficulty_factor" in weak.columns:
+            weak["difficulty_factor"] = pd.to_numeric(weak["difficulty_factor"], errors="coerce").fillna(1.0)
+        else:
+            weak["difficulty_factor"] = 1.0
+        weak["priority_score"] = weak["avg_score"] * weak["difficulty_factor"]
+        weak["student_id"] = np.asarray(weak["student_id"])
+
+        # Stable sort by priority, then by student, gives each student's
+        # rows in priority order; cumcount is the rank within the student
+        weak = weak.sort_values("priority_score", kind="stable").sort_values("student_id", kind="stable")
+        weak["rank"] = weak.groupby("student_id", sort=False).cumcount()
+
+        top = weak[weak["rank"] < 3]
+        labels = top["name"] if "name" in top.columns else top["subject_id"]
+        add(1, top["student_id"], top["rank"] + 1, [
+            f"- {label}: Avg {round(avg, 1)}, Difficulty {diff}"
+            for label, avg, diff in zip(labels, top["avg_score"], top["difficulty_factor"])
+        ])
+        weak_students = pd.unique(top["student_id"])
+        add(1, weak_students, 0, "Priority focus subjects:")
+        add(1, students[~students.isin(weak_students)], 0,
+            "No weak subjects detected. Maintain current performance.")
+
+        # 3️⃣ Study plan summary: first 5 dates per student
+        if not plan_df.empty:
+            plan = plan_df[students.get_indexer(np.asarray(plan_df["student_id"])) >= 0]
+        else:
+            plan = plan_df
+        if not plan.empty:
+            plan = plan.assign(student_id=np.asarray(plan["student_id"]))
+            plan = plan.sort_values("scheduled_date", kind="stable").sort_values("student_id", kind="stable")
+            plan = plan.assign(rank=plan.groupby("student_id", sort=False).cumcount())
+            upcoming = plan[plan["rank"] < 5]
+            add(2, upcoming["student_id"], upcoming["rank"] + 1, (
+                "- " + upcoming["subject_id"].astype(str) + " on " + upcoming["scheduled_date"].astype(str)
+            ).to_numpy())
+            plan_students = pd.unique(upcoming["student_id"])
+        else:
+            plan_students = []
+        add(2, plan_students, 0, "Upcoming study focus:")
+        add(2, students[~students.isin(plan_students)], 0, "No immediate study plan required.")
+
+        # 4️⃣ Performance trend: exam-date trends if given, else the
+        # closed-form slope sign over weak-subject order
+        if trends is not None:
+            known = trends[(students.get_indexer(trends.index) >= 0) & (trends["exams"] > 1)]
+            add(3, known.index, 0, [TREND_LINES[TREND_SIGNS[t]] for t in known["trend"]])
+        else:
+            counts = weak.groupby("student_id", sort=False)["rank"].transform("size")
+            trend = weak[counts > 1]
+            if not trend.empty:
+                x = trend["rank"].to_numpy(dtype=np.float64)
+                y = trend["avg_score"].to_numpy(dtype=np.float64)
+                sums = pd.DataFrame({"student_id": trend["student_id"].to_numpy(), "n": 1.0,
+                                     "x": x, "y": y, "xy": x * y}).groupby("student_id", sort=False).sum()
+                sxy = sums["xy"] - sums["x"] * sums["y"] / sums["n"]
+                signs = [_trend_sign(v) for v in sxy.to_numpy()]
+                add(3, sums.index, 0, [TREND_LINES[s] for s in signs])
+
+        # 5️⃣ Improvement strategy
+        add(4, risk["student_id"], 0, [
+            STRATEGY_LINES.get(level, DEFAULT_STRATEGY) for level in risk["risk_level"]
+        ])
+
+        # Assemble: one sort, then concatenate each student's run of lines
+        lines = pd.concat(parts, ignore_index=True)
+        lines["slot"] = students.get_indexer(lines["student_id"].to_numpy())
+        lines = lines.sort_values(["slot", "section", "rank"], kind="stable")
+
+        slots = lines["slot"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, slots[1:] != slots[:-1]])
+        joined = np.add.reduceat((lines["line"] + "\n").to_numpy(dtype=object), starts)
+
+        insights = np.empty(len(students), dtype=object)
+        insights[slots[starts]] = [text[:-1] for text in joined]
+
+        return pd.DataFrame({"student_id": students, "insights": insights})
@@ -0,0 +1,176 @@
+# agents/compiled_forest.py
+import numpy as np
+
+COMPILED_VERSION = 2
+BLOCK_ROWS = 1024  # rows scored together; working memory is O(n_trees * BLOCK_ROWS)
+
+
+class CompiledForest:
+    """
+    A fitted sklearn RandomForestClassifier flattened into NumPy arrays.
+
+    All trees share one node table (feature, threshold, children) with
+    global node ids; children[2 * node] / children[2 * node + 1] are the
+    left / right child, and leaves point at themselves. Leaf class distributions are normalized the way
+    sklearn's tree predict_proba does it. predict() takes BLOCK_ROWS rows
+    at a time, walks every tree for those rows together, one tree level
+    per step and only for paths not yet at a leaf, and averages the
+    leaves in tree order, so labels match the sklearn forest exactly
+    without importing sklearn, and memory does not grow with the rows.
+    """
+
+    def __init__(self, feature, threshold, children, values, roots, labels, depth,
+                 missing_left=None):
+        # intp everywhere node ids are used as indices, so gathers don't convert
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children = np.asarray(children, dtype=np.intp)
+        self.values = values
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.labels = labels
+        self.depth = int(depth)
+        # Where a NaN goes at each node (sklearn learns it per split)
+        self.missing_left = (
+            np.zeros(len(self.feature), dtype=bool) if missing_left is None
+            else np.asarray(missing_left, dtype=bool)
+        )
+        self.is_leaf = self.children[0::2] == np.arange(len(self.feature))
+
+    @classmethod
+    def from_sklearn(cls, forest, labels=None) -> "CompiledForest":
+        """
+        labels: what each of forest.classes_ means (e.g. the LabelEncoder
+        classes for encoded targets); defaults to forest.classes_.
+        """
+        features, thresholds, children, values, roots, missing_left = [], [], [], [], [], []
+        offset, depth = 0, 0
+        n_classes = len(forest.classes_)
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+
+            # Leaves point at themselves, so extra steps past a leaf are no-ops
+            own = np.arange(tree.node_count) + offset
+            children.append(np.stack([
+                np.where(is_leaf, own, tree.children_left + offset),
+                np.where(is_leaf, own, tree.children_right + offset),
+            ], axis=1).ravel())
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            # Older sklearn has no missing-value support; NaN then goes right
+            missing_left.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=bool)))
+
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            if not np.allclose(normalizer, 1.0):
+                # sklearn < 1.4 stores class counts and normalizes at predict
+                # time; newer versions store the fractions, used as they are
+                normalizer[normalizer == 0.0] = 1.0
+                proba = proba / normalizer
+            values.append(proba)
+
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        labels = np.asarray(forest.classes_ if labels is None else labels)
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children),
+            values=np.concatenate(values),
+            roots=roots,
+            labels=labels,
+            depth=depth,
+            missing_left=np.concatenate(missing_left),
+        )
+
+    # -------------------------
+    # Inference
+    # -------------------------
+    def _block_leaves(self, X) -> np.ndarray:
+        """
+        Leaf node id reached in every tree for one block of float32 rows,
+        shape (n_trees, n_rows).
+        """
+        flat = X.ravel()
+        n_rows, n_features = X.shape
+        # One (tree, row) path per entry, tree-major
+        node = np.repeat(self.roots, n_rows)
+        row_start = np.tile(np.arange(0, X.size, n_features), len(self.roots))
+        has_nan = np.isnan(flat).any()
+        active = np.flatnonzero(~self.is_leaf[node])
+        for _ in range(self.depth):
+            if not len(active):
+                break
+            current = node[active]
+            x = flat[row_start[active] + self.feature[current]]
+            go_right = ~(x <= self.threshold[current])
+            if has_nan:
+                missing = np.isnan(x)
+                go_right[missing] = ~self.missing_left[current[missing]]
+            current = self.children[2 * current + go_right]
+            node[active] = current
+            active = active[~self.is_leaf[current]]
+        return node.reshape(len(self.roots), n_rows)
+
+    def _blocks(self, X):
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        for start in range(0, len(X), BLOCK_ROWS):
+            yield start, self._block_leaves(X[start:start + BLOCK_ROWS])
+
+    def leaves(self, X) -> np.ndarray:
+        """
+        Leaf node id reached in every tree, shape (n_trees, n_samples).
+        """
+        out = np.empty((len(self.roots), len(X)), dtype=np.intp)
+        for start, node in self._blocks(X):
+            out[:, start:start + node.shape[1]] = node
+        return out
+
+    def predict_proba(self, X) -> np.ndarray:
+        proba = np.empty((len(X), self.values.shape[1]), dtype=np.float64)
+        for start, node in self._blocks(X):
+            # Summing over the leading (tree) axis adds trees one at a time
+            # in order, like sklearn's accumulation, so ties break identically
+            proba[start:start + node.shape[1]] = self.values[node].sum(axis=0) / len(self.roots)
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.labels[np.argmax(self.predict_proba(X), axis=1)]
+
+    # -------------------------
+    # Persistence (plain .npz, no pickle)
+    # -------------------------
+    def to_arrays(self) -> dict:
+        return {
+            "compiled_version": np.asarray(COMPILED_VERSION),
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children": self.children,
+            "values": self.values,
+            "roots": self.roots,
+            "labels": self.labels.astype(str),
+            "depth": np.asarray(self.depth),
+            "missing_left": self.missing_left,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "CompiledForest":
+        if int(arrays["compiled_version"]) != COMPILED_VERSION:
+            raise ValueError(
+                f"Compiled forest has version {int(arrays['compiled_version'])}, "
+                f"expected {COMPILED_VERSION}"
+            )
+        return cls(
+            feature=arrays["feature"],
+            threshold=arrays["threshold"],
+            children=arrays["children"],
+            values=arrays["values"],
+            roots=arrays["roots"],
+            labels=arrays["labels"],
+            depth=int(arrays["depth"]),
+            missing_left=arrays["missing_left"],
+        )
@@ -1,5 +1,4 @@
 import os
-import google.generativeai as genai
 
 class GeminiMentorshipAgent:
     """
@@ -12,6 +11,8 @@ class GeminiMentorshipAgent:
         if not api_key:
             raise ValueError("GEMINI_API_KEY not set")
 
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel("gemini-pro")
 
@@ -0,0 +1,229 @@
+# agents/performance_trend_agent.py
+import numpy as np
+import pandas as pd
+
+from pipeline.profiling import profiled
+
+# Same-day exams are ordered by type (fraction of a day)
+EXAM_TYPE_OFFSET = {"IA1": 0.0, "IA2": 0.25, "Lab": 0.5, "EndSem": 0.75}
+TIME_ORIGIN = pd.Timestamp("2020-01-01")
+SUM_COLUMNS = ["n", "t", "y", "tt", "ty"]
+
+
+class PerformanceTrendAgent:
+    """
+    Time-based performance trend per student and per (student, subject).
+
+    Scores (marks / max_marks, in %) are regressed on exam time (days, from
+    exam_date and exam_type). Everything is kept as running sums
+    (n, Σt, Σy, Σt², Σty), so slopes are closed-form, new exams can be
+    folded in with update(), and lookups are index hits.
+
+    The student trend pools the within-subject slopes; when no subject has
+    two dated exams yet it falls back to the slope across all exams.
+    An exponentially weighted moving average (alpha) of each subject's
+    scores is kept alongside.
+    """
+
+    def __init__(self, alpha=0.5, stable_band=0.01):
+        self.alpha = alpha
+        self.stable_band = stable_band  # |slope| in points/day treated as flat
+        self.subject_state = pd.DataFrame(
+            columns=SUM_COLUMNS + ["ewma", "last_t"], dtype="float64",
+            index=pd.MultiIndex.from_arrays([[], []], names=["student_id", "subject_id"])
+        )
+        self.student_trends = pd.DataFrame()
+        self._subject_rows = {}
+
+    # -----------------------------
+    # Input rows -> (key, t, y)
+    # -----------------------------
+    @staticmethod
+    def _observations(performance: pd.DataFrame) -> pd.DataFrame:
+        marks = pd.to_numeric(performance["marks_obtained"], errors="coerce").fillna(0)
+        max_marks = pd.to_numeric(performance["max_marks"], errors="coerce").replace(0, 100).fillna(100)
+        dates = pd.to_datetime(performance["exam_date"], errors="coerce")
+        offset = performance["exam_type"].astype(str).map(EXAM_TYPE_OFFSET).fillna(0.0)
+
+        obs = pd.DataFrame({
+            "student_id": np.asarray(performance["student_id"]),
+            "subject_id": np.asarray(performance["subject_id"]),
+            "t": ((dates - TIME_ORIGIN).dt.days + offset).to_numpy(dtype=np.float64),
+            "y": (marks / max_marks * 100).to_numpy(dtype=np.float64),
+        })
+        obs = obs[~np.isnan(obs["t"].to_numpy())]
+        return obs.sort_values("t", kind="stable")
+
+    # -----------------------------
+    # Grouped sums + EWMA for a batch
+    # -----------------------------
+    def _batch_state(self, obs: pd.DataFrame, prior: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregate a time-sorted batch per (student, subject) and roll its
+        EWMA forward from `prior` (the stored state for those keys).
+        """
+        keys = ["student_id", "subject_id"]
+        t, y = obs["t"].to_numpy(), obs["y"].to_numpy()
+        frame = obs[keys].assign(n=1.0, t=t, y=y, tt=t * t, ty=t * y)
+        grouped = frame.groupby(keys, sort=False)
+        sums = grouped[SUM_COLUMNS].sum()
+
+        # EWMA closed form: the j-th of m new scores has weight a(1-a)^(m-1-j);
+        # the carried-in value has weight (1-a)^m. A new key starts at its
+        # first score, which therefore keeps weight (1-a)^(m-1).
+        a = self.alpha
+        m = grouped["n"].transform("size").to_numpy()
+        j = grouped.cumcount().to_numpy()
+        decay = (1 - a) ** (m - 1 - j)
+
+        prior = prior.reindex(sums.index)
+        is_new = prior["ewma"].isna().to_numpy()
+        first = (j == 0)
+        row_is_new = pd.Series(is_new, index=sums.index).reindex(
+            pd.MultiIndex.from_frame(obs[keys])
+        ).to_numpy()
+
+        weights = np.where(first & row_is_new, decay, a * decay)
+        contrib = frame[keys].assign(w=weights * y).groupby(keys, sort=False)["w"].sum()
+        carried = np.where(is_new, 0.0, prior["ewma"].fillna(0).to_numpy() * (1 - a) ** sums["n"].to_numpy())
+
+        sums["ewma"] = contrib.reindex(sums.index).to_numpy() + carried
+        sums["last_t"] = grouped["t"].max().reindex(sums.index).to_numpy()
+        return sums
+
+    @staticmethod
+    def _slope(n, t, y, tt, ty):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sxx = tt - t * t / n
+            sxy = ty - t * y / n
+            slope = np.where(sxx > 1e-12, sxy / sxx, np.nan)
+        return sxx, sxy, slope
+
+    def _refresh(self, student_ids=None):
+        """
+        Recompute derived slopes (all students, or only the touched ones).
+        """
+        state = self.subject_state
+        sxx, sxy, slope = self._slope(*(state[c].to_numpy() for c in SUM_COLUMNS))
+        state["slope"] = slope
+
+        students = state.index.get_level_values("student_id")
+        if student_ids is not None:
+            mask = pd.Index(students).isin(student_ids)
+        else:
+            mask = np.ones(len(state), dtype=bool)
+
+        part = state[mask]
+        agg = pd.DataFrame({
+            "student_id": np.asarray(students[mask]),
+            "sxx": np.nan_to_num(sxx[mask]),
+            "sxy": np.nan_to_num(sxy[mask]),
+            **{c: part[c].to_numpy() for c in SUM_COLUMNS},
+        }).groupby("student_id").sum()
+
+        _, _, overall = self._slope(*(agg[c].to_numpy() for c in SUM_COLUMNS))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pooled = np.where(agg["sxx"].to_numpy() > 1e-12, agg["sxy"] / agg["sxx"], np.nan)
+
+        trends = pd.DataFrame({
+            "slope": np.where(np.isnan(pooled), overall, pooled),
+            "exams": agg["n"].astype(np.int64).to_numpy(),
+            "within_subject": ~np.isnan(pooled),
+        }, index=agg.index)
+        trends["trend"] = self._labels(trends["slope"].to_numpy())
+
+        if student_ids is None or self.student_trends.empty:
+            self.student_trends = trends
+        else:
+            rest = self.student_trends.drop(trends.index, errors="ignore")
+            self.student_trends = pd.concat([rest, trends]).sort_index()
+
+        self._subject_rows = pd.Series(np.arange(len(state)), index=students).groupby(level=0).indices
+        self.subject_state = state
+
+    def _labels(self, slope: np.ndarray) -> np.ndarray:
+        return np.select(
+            [slope > self.stable_band, slope < -self.stable_band],
+            ["Improving", "Declining"],
+            default="Stable"
+        )
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    @profiled("agent.trend.fit")
+    def fit(self, performance: pd.DataFrame) -> "PerformanceTrendAgent":
+        """
+        Build trends for the whole cohort in one grouped pass.
+        """
+        obs = self._observations(performance)
+        empty = pd.DataFrame(columns=["ewma"], dtype="float64")
+        self.subject_state = self._batch_state(obs, empty).sort_index()
+        self._refresh()
+        return self
+
+    @profiled("agent.trend.update")
+    def update(self, new_performance: pd.DataFrame) -> pd.Index:
+        """
+        Fold in newly arrived exams and refresh only the affected students.
+        Returns their student_ids; fit(a).update(b) equals fit(a + b).
+
+        The sums do not depend on order, but the EWMA does, so an exam
+        dated before the last one already seen for its (student, subject)
+        raises ValueError; refit on all rows in that case.
+        """
+        obs = self._observations(new_performance)
+        if obs.empty:
+            return pd.Index([])
+
+        seen = self.subject_state["last_t"].reindex(
+            pd.MultiIndex.from_arrays([obs["student_id"], obs["subject_id"]])
+        ).to_numpy()
+        if (obs["t"].to_numpy() < seen).any():
+            raise ValueError("update() got exams older than ones already seen; refit with fit()")
+
+        batch = self._batch_state(obs, self.subject_state)
+        state = self.subject_state
+
+        existing = batch.index.intersection(state.index)
+        if len(existing):
+            state.loc[existing, SUM_COLUMNS] += batch.loc[existing, SUM_COLUMNS]
+            state.loc[existing, ["ewma", "last_t"]] = batch.loc[existing, ["ewma", "last_t"]].to_numpy()
+
+        new = batch.index.difference(state.index)
+        if len(new):
+            state = pd.concat([state, batch.loc[new, SUM_COLUMNS + ["ewma", "last_t"]]]).sort_index()
+
+        self.subject_state = state
+        touched = pd.Index(pd.unique(batch.index.get_level_values("student_id")))
+        self._refresh(touched)
+        return touched
+
+    def student_trend(self, student_id) -> dict:
+        """
+        O(1) lookup of a student's overall trend.
+        """
+        if student_id not in self.student_trends.index:
+            return {"slope": np.nan, "trend": "Stable", "exams": 0, "within_subject": False}
+        row = self.student_trends.loc[student_id]
+        return {
+            "slope": float(row["slope"]),
+            "trend": row["trend"],
+            "exams": int(row["exams"]),
+            "within_subject": bool(row["within_subject"]),
+        }
+
+    def subject_trends(self, student_id) -> pd.DataFrame:
+        """
+        Per-subject slope (points/day), EWMA and exam count for one student.
+        """
+        rows = self._subject_rows.get(student_id)
+        if rows is None:
+            return pd.DataFrame(columns=["subject_id", "slope", "ewma", "exams"])
+        part = self.subject_state.iloc[rows]
+        return pd.DataFrame({
+            "subject_id": part.index.get_level_values("subject_id"),
+            "slope": part["slope"].to_numpy(),
+            "ewma": part["ewma"].round(2).to_numpy(),
+            "exams": part["n"].astype(np.int64).to_numpy(),
+        })
@@ -1,19 +1,79 @@
 # agents/risk_agent.py
+import hashlib
+import os
+
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier  # Using Random Forest for stability
+
+from agents.compiled_forest import CompiledForest
+from pipeline.profiling import profiled
+
+MODEL_VERSION = 1
+MODEL_PATH = os.path.join("models", "risk_model.joblib")
+FEATURE_COLUMNS = ["avg_marks", "avg_weighted_marks", "avg_attendance", "exams_taken"]
+
+
+def training_fingerprint(performance: pd.DataFrame, subjects: pd.DataFrame) -> str:
+    """
+    Content hash of the columns the model is trained on.
+    Used to detect a saved model that no longer matches the data.
+
+    IDs are hashed as first-appearance ranks rather than values, so string
+    IDs and their int32 codes (pipeline.id_codes) give the same
+    fingerprint and the app and batch runner share one saved model.
+    """
+    perf_cols = [c for c in ["student_id", "subject_id", "exam_type", "marks_obtained",
+                             "max_marks", "attendance"] if c in performance.columns]
+    subj_cols = [c for c in ["subject_id", "difficulty_factor"] if c in subjects.columns]
+    performance = performance[perf_cols].astype(str)
+    subjects = subjects[subj_cols].astype(str)
+
+    def ranks(*columns):
+        # One numbering across columns, so performance rows still match subjects
+        values = np.concatenate([np.asarray(col, dtype=object) for col in columns])
+        codes = pd.factorize(values)[0]
+        return np.split(codes, np.cumsum([len(col) for col in columns])[:-1])
+
+    if "student_id" in perf_cols:
+        performance["student_id"] = ranks(performance["student_id"])[0]
+    if "subject_id" in perf_cols and "subject_id" in subj_cols:
+        performance["subject_id"], subjects["subject_id"] = ranks(
+            performance["subject_id"], subjects["subject_id"]
+        )
+
+    digest = hashlib.sha256()
+    for frame in (performance, subjects):
+        digest.update(",".join(frame.columns).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def compiled_path(path: str = MODEL_PATH) -> str:
+    """
+    Where the sklearn-free export of the model at path lives.
+    """
+    return os.path.splitext(path)[0] + ".npz"
+
 
 class AcademicRiskAgent:
     """
     Predicts academic risk (Low, Medium, High) for students based on
     performance, attendance, and subject difficulty.
+
+    Lifecycle: fit() -> save() once, then load() -> predict() on every request.
+
+    Predictions run on a CompiledForest (plain NumPy arrays) built from the
+    trained forest; save() also writes it as an .npz, and load_compiled()
+    scores from that file without importing sklearn.
     """
 
     def __init__(self):
         self.model = None
-        self.encoder = LabelEncoder()
+        self.encoder = None
+        self.compiled = None
         self.trained = False
+        self.feature_columns = list(FEATURE_COLUMNS)
+        self.fingerprint = None
 
     # -------------------------
     # Feature Engineering
@@ -31,6 +91,9 @@ class AcademicRiskAgent:
         for col in numeric_cols:
             df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
 
+        if self._is_coded(df, subjects):
+            return self._prepare_coded_features(df, subjects)
+
         # Merge with subject difficulty
         if "difficulty_factor" in subjects.columns:
             subjects["difficulty_factor"] = pd.to_numeric(subjects["difficulty_factor"], errors="coerce").fillna(1)
@@ -42,7 +105,7 @@ class AcademicRiskAgent:
         df["weighted_marks"] = df["marks_obtained"] * df["difficulty_factor"]
 
         # Aggregate per student
-        features = df.groupby("student_id").agg(
+        features = df.groupby("student_id", observed=True).agg(
             avg_marks=("marks_obtained", "mean"),
             avg_weighted_marks=("weighted_marks", "mean"),
             avg_attendance=("attendance", "mean"),
@@ -50,13 +113,88 @@ class AcademicRiskAgent:
         ).reset_index()
 
         # Fill any remaining NaNs
-        features = features.fillna(0)
+        value_cols = features.columns.drop("student_id")
+        features[value_cols] = features[value_cols].fillna(0)
         return features
 
+    @staticmethod
+    def _is_coded(df: pd.DataFrame, subjects: pd.DataFrame) -> bool:
+        return (
+            pd.api.types.is_integer_dtype(df["student_id"])
+            and pd.api.types.is_integer_dtype(df["subject_id"])
+            and pd.api.types.is_integer_dtype(subjects["subject_id"])
+        )
+
+    def _prepare_coded_features(self, df: pd.DataFrame, subjects: pd.DataFrame) -> pd.DataFrame:
+        """
+        Same features as prepare_features, for int32-coded IDs:
+        the difficulty join is an array lookup and the per-student
+        means are bincounts.
+        """
+        student = df["student_id"].to_numpy(dtype=np.int64)
+        subject = df["subject_id"].to_numpy(dtype=np.int64)
+        marks = df["marks_obtained"].to_numpy(dtype=np.float64)
+        attendance = df["attendance"].to_numpy(dtype=np.float64)
+
+        # Difficulty by subject code; unknown subjects stay NaN like the left merge
+        if "difficulty_factor" in subjects.columns:
+            n_subjects = int(max(subject.max(initial=-1), subjects["subject_id"].max()) + 1)
+            difficulty = np.full(n_subjects, np.nan)
+            difficulty[subjects["subject_id"].to_numpy()] = pd.to_numeric(
+                subjects["difficulty_factor"], errors="coerce"
+            ).fillna(1).to_numpy(dtype=np.float64)
+            weighted = marks * difficulty[subject]
+        else:
+            weighted = marks
+
+        weighted_ok = ~np.isnan(weighted)
+        n_students = int(student.max(initial=-1)) + 1
+        rows = np.bincount(student, minlength=n_students)
+        present = np.flatnonzero(rows)
+        rows = rows[present]
+
+        def per_student(weights):
+            return np.bincount(student, weights=weights, minlength=n_students)[present]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            features = pd.DataFrame({
+                "student_id": present.astype(df["student_id"].dtype),
+                "avg_marks": per_student(marks) / rows,
+                "avg_weighted_marks": (
+                    per_student(np.where(weighted_ok, weighted, 0.0))
+                    / per_student(weighted_ok.astype(np.float64))
+                ),
+                "avg_attendance": per_student(attendance) / rows,
+                "exams_taken": per_student(
+                    df["exam_type"].notna().to_numpy(dtype=np.float64)
+                ).astype(np.int64),
+            })
+
+        value_cols = features.columns.drop("student_id")
+        features[value_cols] = features[value_cols].fillna(0)
+        return features
+
+    # -------------------------
+    # Risk Labels
+    # -------------------------
+    @staticmethod
+    def label_risk(features: pd.DataFrame) -> pd.Series:
+        """
+        Training labels (dummy example: adjust logic as per your policy).
+        Here, we label risk based on avg_marks.
+        """
+        marks = features["avg_marks"]
+        return pd.Series(
+            np.select([marks >= 75, marks >= 50], ["Low", "Medium"], default="High"),
+            index=features.index
+        )
+
     # -------------------------
     # Train Model
     # -------------------------
     def train_model(self, X: pd.DataFrame, y: pd.Series):
+        from sklearn.ensemble import RandomForestClassifier  # Using Random Forest for stability
+
         self.model = RandomForestClassifier(
             n_estimators=200,
             max_depth=10,
@@ -64,39 +202,165 @@ class AcademicRiskAgent:
         )
         self.model.fit(X, y)
         self.trained = True
+        self.compile()
+
+    def compile(self) -> CompiledForest:
+        """
+        Flatten the trained forest for NumPy-only scoring.
+        """
+        labels = self.encoder.classes_ if self.encoder is not None else None
+        self.compiled = CompiledForest.from_sklearn(self.model, labels=labels)
+        return self.compiled
+
+    @profiled("agent.risk.fit")
+    def fit(self, performance: pd.DataFrame, subjects: pd.DataFrame) -> "AcademicRiskAgent":
+        """
+        Train the model on a training set and remember its fingerprint.
+        """
+        self.fingerprint = training_fingerprint(performance, subjects)
+        from sklearn.preprocessing import LabelEncoder
+
+        features = self.prepare_features(performance.copy(), subjects.copy())
+
+        self.encoder = LabelEncoder()
+        y_enc = self.encoder.fit_transform(self.label_risk(features))
+        self.train_model(features[self.feature_columns], y_enc)
+        return self
 
     # -------------------------
-    # Run Risk Prediction
+    # Persistence
     # -------------------------
-    def run(self, performance: pd.DataFrame, subjects: pd.DataFrame) -> pd.DataFrame:
-        # Prepare features
-        features = self.prepare_features(performance, subjects)
-
-        # Risk labeling (dummy example: adjust logic as per your policy)
-        # Here, we label risk based on avg_marks
-        risk_labels = []
-        for mark in features["avg_marks"]:
-            if mark >= 75:
-                risk_labels.append("Low")
-            elif mark >= 50:
-                risk_labels.append("Medium")
-            else:
-                risk_labels.append("High")
-        y = pd.Series(risk_labels)
-
-        # Encode labels
-        y_enc = self.encoder.fit_transform(y)
-
-        # Train model if not trained
+    def save(self, path: str = MODEL_PATH) -> str:
         if not self.trained:
-            self.train_model(features.drop("student_id", axis=1), y_enc)
+            raise RuntimeError("Cannot save an untrained risk model")
 
-        # Predict risk
-        y_pred_enc = self.model.predict(features.drop("student_id", axis=1))
-        y_pred = self.encoder.inverse_transform(y_pred_enc)
+        import joblib
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump(
+            {
+                "version": MODEL_VERSION,
+                "model": self.model,
+                "encoder": self.encoder,
+                "feature_columns": self.feature_columns,
+                "fingerprint": self.fingerprint,
+            },
+            path
+        )
+        np.savez(
+            compiled_path(path),
+            model_version=np.asarray(MODEL_VERSION),
+            feature_columns=np.asarray(self.feature_columns),
+            fingerprint=np.asarray(self.fingerprint or ""),
+            **self.compiled.to_arrays(),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "AcademicRiskAgent":
+        import joblib
+
+        payload = joblib.load(path)
+        if payload.get("version") != MODEL_VERSION:
+            raise ValueError(
+                f"Risk model at {path} has version {payload.get('version')}, "
+                f"expected {MODEL_VERSION}"
+            )
+
+        agent = cls()
+        agent.model = payload["model"]
+        agent.encoder = payload["encoder"]
+        agent.feature_columns = payload["feature_columns"]
+        agent.fingerprint = payload["fingerprint"]
+        agent.trained = True
+        agent.compile()
+        return agent
+
+    @classmethod
+    def load_compiled(cls, path: str = MODEL_PATH) -> "AcademicRiskAgent":
+        """
+        Load only the compiled export saved next to path. The agent can
+        predict but holds no sklearn model (agent.model is None).
+        """
+        with np.load(compiled_path(path), allow_pickle=False) as arrays:
+            if int(arrays["model_version"]) != MODEL_VERSION:
+                raise ValueError(
+                    f"Compiled risk model at {compiled_path(path)} has version "
+                    f"{int(arrays['model_version'])}, expected {MODEL_VERSION}"
+                )
+            agent = cls()
+            agent.compiled = CompiledForest.from_arrays(arrays)
+            agent.feature_columns = arrays["feature_columns"].tolist()
+            agent.fingerprint = str(arrays["fingerprint"]) or None
+        agent.trained = True
+        return agent
+
+    def is_stale(self, performance: pd.DataFrame, subjects: pd.DataFrame) -> bool:
+        return self.fingerprint != training_fingerprint(performance, subjects)
+
+    @classmethod
+    def load_or_fit(cls, performance: pd.DataFrame, subjects: pd.DataFrame,
+                    path: str = MODEL_PATH) -> "AcademicRiskAgent":
+        """
+        Load the saved model, retraining (and saving) only when it is
+        missing, from another version, or stale for this data. The
+        compiled export is preferred, so sklearn is only imported when
+        the model has to be (re)loaded or trained.
+        """
+        for loader, source in ((cls.load_compiled, compiled_path(path)), (cls.load, path)):
+            if not os.path.exists(source):
+                continue
+            try:
+                agent = loader(path)
+            except (ValueError, KeyError):
+                continue
+            if not agent.is_stale(performance, subjects):
+                if loader is cls.load:
+                    # Compiled export missing or outdated: rewrite it from the model
+                    agent.save(path)
+                return agent
+
+        agent = cls().fit(performance, subjects)
+        agent.save(path)
+        return agent
+
+    # -------------------------
+    # Inference
+    # -------------------------
+    def predict(self, performance: pd.DataFrame, subjects: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score students with the already trained model. Never retrains.
+        """
+        if not self.trained:
+            raise RuntimeError("Risk model is not trained; call fit() or load() first")
+        if performance.empty:
+            # e.g. a runner shard whose students have no marks yet
+            return pd.DataFrame(columns=["student_id", "risk_level", "risk_score"])
+
+        features = self.prepare_features(performance.copy(), subjects.copy())
+        return self.predict_features(features)
+
+    @profiled("agent.risk.predict_features")
+    def predict_features(self, features: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score per-student features from prepare_features (or a compute backend).
+        """
+        if features.empty:
+            return pd.DataFrame(columns=["student_id", "risk_level", "risk_score"])
+        y_pred = self.compiled.predict(features[self.feature_columns].to_numpy(dtype=np.float64))
 
         result = features[["student_id"]].copy()
         result["risk_level"] = y_pred
         result["risk_score"] = features["avg_marks"]  # Optional: numeric score
 
         return result
+
+    # -------------------------
+    # Run Risk Prediction
+    # -------------------------
+    def run(self, performance: pd.DataFrame, subjects: pd.DataFrame) -> pd.DataFrame:
+        # Train model if not trained, then predict
+        if not self.trained:
+            self.fit(performance, subjects)
+
+        return self.predict(performance, subjects)
@@ -1,6 +1,9 @@
 # agents/study_plan_agent.py
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date
+
+from pipeline.profiling import profiled
 
 class StudyPlanAgent:
     """
@@ -8,6 +11,7 @@ class StudyPlanAgent:
     based on weak subject severity.
     """
 
+    @profiled("agent.study_plan.run")
     def run(self, weak_df: pd.DataFrame) -> pd.DataFrame:
         if weak_df.empty:
             return pd.DataFrame()
@@ -29,20 +33,30 @@ class StudyPlanAgent:
 
         # -----------------------------
         # 3️⃣ Generate study schedule
+        # One global stable sort by student then priority (ties keep
+        # input order); day i within each student is a cumulative count
+        # over that order.
         # -----------------------------
-        plans = []
-        today = datetime.today()
-
-        for student_id, group in df.groupby("student_id"):
-            group = group.sort_values("priority_score", ascending=False)
-
-            for i, row in enumerate(group.itertuples(), start=1):
-                plans.append({
-                    "student_id": student_id,
-                    "subject_id": row.subject_id,
-                    "focus_area": "Concept Revision + Practice",
-                    "scheduled_date": (today + timedelta(days=i)).strftime("%Y-%m-%d"),
-                    "priority_score": round(row.priority_score, 2)
-                })
-
-        return pd.DataFrame(plans)
+        student_keys = pd.factorize(df["student_id"], sort=True)[0]
+        order = np.lexsort((
+            -df["priority_score"].to_numpy(dtype=np.float64),
+            student_keys,
+        ))
+        order = order[student_keys[order] >= 0]  # groupby drops missing IDs
+        df = df.iloc[order]
+
+        sorted_keys = student_keys[order]
+        group_start = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        start_pos = np.maximum.accumulate(np.where(group_start, np.arange(len(df)), 0))
+        day_offsets = np.arange(len(df)) - start_pos + 1
+
+        today = np.datetime64(date.today(), "D")
+        scheduled = np.datetime_as_string(today + day_offsets.astype("timedelta64[D]"), unit="D")
+
+        return pd.DataFrame({
+            "student_id": df["student_id"].to_numpy(),
+            "subject_id": df["subject_id"].to_numpy(),
+            "focus_area": "Concept Revision + Practice",
+            "scheduled_date": scheduled.astype(object),
+            "priority_score": df["priority_score"].round(2).to_numpy(),
+        })
@@ -0,0 +1,218 @@
+# agents/study_scheduler_agent.py
+import heapq
+
+import numpy as np
+import pandas as pd
+from datetime import date
+
+from pipeline.profiling import profiled
+
+PLAN_COLUMNS = ["student_id", "subject_id", "focus_area", "scheduled_date",
+                "session_hours", "priority_score", "exam_date"]
+SHORTFALL_COLUMNS = ["student_id", "subject_id", "missed_sessions"]
+
+
+class StudySchedulerAgent:
+    """
+    Capacity-aware study scheduler.
+
+    Each weak subject needs a number of sessions proportional to its
+    priority (100 - avg_score) and credits. Sessions are packed into each
+    student's daily hour budget with an earliest-deadline-first heap, so
+    subjects with the nearest exam are studied first and the highest
+    priority x credits wins among equal deadlines. A subject gets at most
+    one session per day, and no sessions on or after its exam day; sessions
+    that could not fit before the exam are reported in self.shortfall.
+
+    Deadlines only come from exams after today. The committed sample
+    data's exam dates are all past (Jan-Mar 2026), so on it every subject
+    is planned without a deadline and sessions follow priority x credits.
+
+    Cost is O(sessions * log(subjects per student)) over the cohort.
+    """
+
+    def __init__(self, daily_hours=2.0, session_hours=1.0,
+                 sessions_per_credit=2.0, max_days=120):
+        self.daily_hours = daily_hours
+        self.session_hours = session_hours
+        self.sessions_per_credit = sessions_per_credit
+        self.max_days = max_days
+        self.shortfall = pd.DataFrame(columns=SHORTFALL_COLUMNS)
+
+    # -----------------------------
+    # Inputs
+    # -----------------------------
+    @staticmethod
+    def _credits(df: pd.DataFrame, subjects: pd.DataFrame) -> np.ndarray:
+        if "credits" not in subjects.columns:
+            return np.ones(len(df))
+        credits = pd.Series(
+            pd.to_numeric(subjects["credits"], errors="coerce").values,
+            index=subjects["subject_id"].values
+        )
+        return (
+            pd.Series(np.asarray(df["subject_id"])).map(credits)
+            .fillna(1).clip(lower=1).to_numpy(dtype=np.float64)
+        )
+
+    def _deadlines(self, df: pd.DataFrame, performance, today) -> np.ndarray:
+        """
+        Day offset of each (student, subject)'s next exam after today,
+        or max_days + 1 when none is scheduled.
+        """
+        no_exam = np.full(len(df), self.max_days + 1, dtype=np.int64)
+        if performance is None or "exam_date" not in performance.columns:
+            return no_exam
+
+        exams = pd.DataFrame({
+            "student_id": np.asarray(performance["student_id"]),
+            "subject_id": np.asarray(performance["subject_id"]),
+            "exam_date": pd.to_datetime(performance["exam_date"], errors="coerce"),
+        })
+        exams = exams[exams["exam_date"] > pd.Timestamp(today)]
+        if exams.empty:
+            return no_exam
+
+        next_exam = exams.groupby(["student_id", "subject_id"])["exam_date"].min()
+        keys = pd.MultiIndex.from_arrays([np.asarray(df["student_id"]), np.asarray(df["subject_id"])])
+        exam_dates = next_exam.reindex(keys)
+
+        offsets = (exam_dates - pd.Timestamp(today)).dt.days
+        return offsets.fillna(self.max_days + 1).to_numpy(dtype=np.int64)
+
+    def _daily_slots(self, student_ids: np.ndarray, daily_hours) -> np.ndarray:
+        budget = self.daily_hours if daily_hours is None else daily_hours
+        if isinstance(budget, (dict, pd.Series)):
+            hours = pd.Series(student_ids).map(pd.Series(budget)).fillna(self.daily_hours)
+        else:
+            hours = pd.Series(float(budget), index=range(len(student_ids)))
+
+        slots = np.floor(hours.to_numpy(dtype=np.float64) / self.session_hours).astype(np.int64)
+        if (slots < 1).any():
+            raise ValueError("daily_hours must fit at least one study session per day")
+        return slots
+
+    # -----------------------------
+    # Scheduling
+    # -----------------------------
+    @staticmethod
+    def _schedule_student(deadline, weight, sessions, slots, max_days, out_idx, out_day):
+        """
+        EDF heap for one student. Entries are (deadline, -weight, row).
+        Returns the sessions left unscheduled per row.
+        """
+        remaining = list(sessions)
+        heap = [(deadline[i], -weight[i], i) for i in range(len(deadline))]
+        heapq.heapify(heap)
+
+        day = 1
+        while heap and day <= max_days:
+            studied = []
+            while heap and len(studied) < slots:
+                entry = heapq.heappop(heap)
+                if entry[0] <= day:
+                    # Exam day reached: the rest of this subject is missed
+                    continue
+                out_idx.append(entry[2])
+                out_day.append(day)
+                remaining[entry[2]] -= 1
+                studied.append(entry)
+            for entry in studied:
+                if remaining[entry[2]] > 0:
+                    heapq.heappush(heap, entry)
+            day += 1
+
+        return remaining
+
+    @profiled("agent.study_scheduler.run")
+    def run(self, weak_df: pd.DataFrame, subjects: pd.DataFrame,
+            performance: pd.DataFrame = None, daily_hours=None, today=None) -> pd.DataFrame:
+        """
+        daily_hours: scalar budget for everyone, or a dict/Series of
+        student_id -> hours (missing students use the default).
+        today: plan start date (default: date.today()); day 1 is the day after.
+        """
+        if weak_df.empty:
+            # Nothing to schedule: no shortfall carried over from a previous run
+            self.shortfall = pd.DataFrame(columns=SHORTFALL_COLUMNS)
+            return pd.DataFrame(columns=PLAN_COLUMNS)
+
+        df = weak_df.copy()
+        today = today or date.today()
+
+        # -----------------------------
+        # 1️⃣ Priority, credits and session counts
+        # -----------------------------
+        df["avg_score"] = pd.to_numeric(df["avg_score"], errors="coerce").fillna(0)
+        priority = (100 - df["avg_score"]).to_numpy(dtype=np.float64)
+        credits = self._credits(df, subjects)
+        weight = priority * credits
+        sessions = np.maximum(
+            np.ceil(credits * priority / 100 * self.sessions_per_credit), 1
+        ).astype(np.int64)
+
+        # -----------------------------
+        # 2️⃣ Exam deadlines
+        # -----------------------------
+        deadline = self._deadlines(df, performance, today)
+
+        # -----------------------------
+        # 3️⃣ Group rows by student (one sort, offset slices)
+        # -----------------------------
+        student_keys, student_ids = pd.factorize(np.asarray(df["student_id"]), sort=True)
+        order = np.argsort(student_keys, kind="stable")
+        order = order[student_keys[order] >= 0]
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(student_keys[order], minlength=len(student_ids)))])
+        slots = self._daily_slots(np.asarray(student_ids), daily_hours)
+
+        deadline_l = deadline[order].tolist()
+        weight_l = weight[order].tolist()
+        sessions_l = sessions[order].tolist()
+
+        out_idx, out_day = [], []
+        missed = np.zeros(len(order), dtype=np.int64)
+        for s in range(len(student_ids)):
+            lo, hi = bounds[s], bounds[s + 1]
+            if lo == hi:
+                continue
+            start = len(out_idx)
+            missed[lo:hi] = self._schedule_student(
+                deadline_l[lo:hi], weight_l[lo:hi], sessions_l[lo:hi],
+                int(slots[s]), self.max_days, out_idx, out_day
+            )
+            for k in range(start, len(out_idx)):
+                out_idx[k] += lo
+
+        short = order[missed > 0]
+        self.shortfall = pd.DataFrame({
+            "student_id": np.asarray(df["student_id"])[short],
+            "subject_id": np.asarray(df["subject_id"])[short],
+            "missed_sessions": missed[missed > 0],
+        })
+
+        # -----------------------------
+        # 4️⃣ Assemble plan
+        # -----------------------------
+        rows = order[np.asarray(out_idx, dtype=np.int64)]
+        days = np.asarray(out_day, dtype=np.int64)
+        today64 = np.datetime64(today, "D")
+        has_exam = deadline[rows] <= self.max_days
+
+        exam_dates = np.where(
+            has_exam,
+            np.datetime_as_string(today64 + deadline[rows].astype("timedelta64[D]"), unit="D"),
+            None
+        )
+
+        plan = pd.DataFrame({
+            "student_id": np.asarray(df["student_id"])[rows],
+            "subject_id": np.asarray(df["subject_id"])[rows],
+            "focus_area": "Concept Revision + Practice",
+            "scheduled_date": np.datetime_as_string(today64 + days.astype("timedelta64[D]"), unit="D").astype(object),
+            "session_hours": self.session_hours,
+            "priority_score": np.round(priority[rows], 2),
+            "exam_date": exam_dates,
+        })
+
+        # Already ordered by student, then day
+        return plan
@@ -1,39 +1,55 @@
 # agents/weak_subject_agent.py
+import numpy as np
 import pandas as pd
 
+from pipeline.profiling import profiled
+
 class WeakSubjectAgent:
     """
     Identifies weak subjects per student using normalized performance scores.
+
+    Works on string IDs or on the int32 codes from pipeline.id_codes;
+    with codes the per-subject average is an array-indexed bincount.
     """
 
+    @profiled("agent.weak_subject.run")
     def run(self, performance: pd.DataFrame, subjects: pd.DataFrame) -> pd.DataFrame:
-        df = performance.copy()
-
-        # -----------------------------
-        # 1️⃣ Ensure numeric columns
-        # -----------------------------
-        df["marks_obtained"] = pd.to_numeric(
-            df["marks_obtained"], errors="coerce"
-        ).fillna(0)
-
-        df["max_marks"] = pd.to_numeric(
-            df["max_marks"], errors="coerce"
-        ).replace(0, 100).fillna(100)
+        # Only the columns used here, so the full table is never copied
+        df = performance[["student_id", "subject_id"]].copy()
 
         # -----------------------------
-        # 2️⃣ Normalized score
+        # 1️⃣ + 2️⃣ Numeric columns -> normalized score
         # -----------------------------
-        df["normalized_score"] = df["marks_obtained"] / df["max_marks"]
+        df["normalized_score"] = self._normalized_scores(performance)
 
         # -----------------------------
         # 3️⃣ Average score per subject
         # -----------------------------
-        avg_scores = (
-            df.groupby(["student_id", "subject_id"])["normalized_score"]
-            .mean()
-            .reset_index()
-        )
+        if self._is_coded(df):
+            avg_scores = self._coded_means(df)
+        else:
+            avg_scores = (
+                df.groupby(["student_id", "subject_id"], observed=True)["normalized_score"]
+                .mean()
+                .reset_index()
+            )
+
+        return self._weak_from_means(avg_scores)
+
+    @staticmethod
+    def _normalized_scores(performance: pd.DataFrame) -> pd.Series:
+        marks = pd.to_numeric(
+            performance["marks_obtained"], errors="coerce"
+        ).fillna(0)
+
+        max_marks = pd.to_numeric(
+            performance["max_marks"], errors="coerce"
+        ).replace(0, 100).fillna(100)
 
+        return marks / max_marks
+
+    @staticmethod
+    def _weak_from_means(avg_scores: pd.DataFrame) -> pd.DataFrame:
         avg_scores["avg_score"] = (avg_scores["normalized_score"] * 100).round(2)
         avg_scores.drop(columns=["normalized_score"], inplace=True)
 
@@ -43,3 +59,101 @@ class WeakSubjectAgent:
         weak_subjects = avg_scores[avg_scores["avg_score"] < 60]
 
         return weak_subjects
+
+    # -----------------------------
+    # Chunked (out-of-core) mode
+    # -----------------------------
+    def score_sums(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Partial aggregate of one chunk: score_sum / score_count per
+        (student_id, subject_id), indexed by the pair.
+        """
+        scores = self._normalized_scores(chunk)
+        return pd.DataFrame({
+            "student_id": np.asarray(chunk["student_id"]),
+            "subject_id": np.asarray(chunk["subject_id"]),
+            "score_sum": scores.to_numpy(dtype=np.float64),
+            "score_count": 1,
+        }).groupby(["student_id", "subject_id"]).sum()
+
+    @staticmethod
+    def combine_score_sums(partials) -> pd.DataFrame:
+        partials = list(partials)
+        if len(partials) == 1:
+            return partials[0]
+        return pd.concat(partials).groupby(level=["student_id", "subject_id"]).sum()
+
+    def run_from_sums(self, sums: pd.DataFrame) -> pd.DataFrame:
+        """
+        Weak subjects from (combined) score_sums; same rows as run().
+        """
+        avg_scores = pd.DataFrame({
+            "normalized_score": sums["score_sum"] / sums["score_count"]
+        }).reset_index()
+        return self._weak_from_means(avg_scores)
+
+    def run_chunks(self, chunks, subjects: pd.DataFrame) -> pd.DataFrame:
+        """
+        run() over an iterable of performance chunks. Only per-pair sums
+        are kept; chunk partials are merged whenever they outgrow the
+        running total, so memory tracks the number of (student, subject)
+        pairs rather than the number of rows.
+        """
+        total, pending, pending_rows = None, [], 0
+        for chunk in chunks:
+            part = self.score_sums(chunk)
+            pending.append(part)
+            pending_rows += len(part)
+            if total is None or pending_rows > len(total):
+                total = self.combine_score_sums(([total] if total is not None else []) + pending)
+                pending, pending_rows = [], 0
+
+        if total is None:
+            return self.run(pd.DataFrame(columns=["student_id", "subject_id", "marks_obtained",
+                                                  "max_marks"]), subjects)
+        if pending:
+            total = self.combine_score_sums([total] + pending)
+        return self.run_from_sums(total)
+
+    # -----------------------------
+    # Integer-code fast path
+    # -----------------------------
+    @staticmethod
+    def _is_coded(df: pd.DataFrame) -> bool:
+        return (
+            pd.api.types.is_integer_dtype(df["student_id"])
+            and pd.api.types.is_integer_dtype(df["subject_id"])
+        )
+
+    @staticmethod
+    def _coded_means(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Mean normalized score per (student, subject) code pair, in the
+        same (student, subject) order groupby would return.
+        """
+        student = df["student_id"].to_numpy(dtype=np.int64)
+        subject = df["subject_id"].to_numpy(dtype=np.int64)
+        scores = df["normalized_score"].to_numpy(dtype=np.float64)
+
+        if len(df) == 0:
+            return pd.DataFrame({"student_id": [], "subject_id": [], "normalized_score": []})
+
+        n_subjects = int(subject.max()) + 1
+        key = student * n_subjects + subject
+
+        # Dense keys -> direct bincount; sparse keys -> compact them first
+        if key.max() < 4 * len(key):
+            counts = np.bincount(key)
+            sums = np.bincount(key, weights=scores)
+            present = np.flatnonzero(counts)
+            counts, sums = counts[present], sums[present]
+        else:
+            present, inverse = np.unique(key, return_inverse=True)
+            counts = np.bincount(inverse)
+            sums = np.bincount(inverse, weights=scores)
+
+        return pd.DataFrame({
+            "student_id": (present // n_subjects).astype(df["student_id"].dtype),
+            "subject_id": (present % n_subjects).astype(df["subject_id"].dtype),
+            "normalized_score": sums / counts,
+        })
@@ -0,0 +1,299 @@
+# pipeline/api_server.py
+import asyncio
+import json
+import os
+import sys
+import traceback
+from typing import Optional
+from urllib.parse import unquote
+
+import pandas as pd
+
+from agents.advanced_mentorship_insight_agent import AdvancedMentorshipAgent
+from agents.performance_trend_agent import PerformanceTrendAgent
+from agents.risk_agent import MODEL_PATH
+from pipeline.data_loader import CACHE_DIR, DATA_DIR, TABLES, load_data
+from pipeline.id_codes import encode_frames
+from pipeline.profiling import stage
+from pipeline.snapshot import DATA_FILES, SNAPSHOT_DIR, CohortSnapshot
+
+FIELDS = ("risk", "weak", "plan", "mentorship", "trend")
+MAX_BODY = 1 << 20
+MAX_BATCH = 1000
+
+
+class _StudentRecords:
+    """
+    A frame held as plain Python column lists plus student_id -> row
+    positions, so a student's rows become JSON-ready dicts without
+    touching pandas at request time.
+    """
+
+    def __init__(self, frame: pd.DataFrame, drop=()):
+        self.columns = [c for c in frame.columns if c not in drop]
+        self.values = [
+            [None if v != v else v for v in frame[col].tolist()]  # NaN -> null
+            for col in self.columns
+        ]
+        self.positions = (
+            frame.groupby(frame["student_id"].astype(str)).indices if not frame.empty else {}
+        )
+
+    def get(self, student_id: str) -> list:
+        rows = self.positions.get(student_id)
+        if rows is None:
+            return []
+        return [
+            dict(zip(self.columns, row))
+            for row in zip(*([values[i] for i in rows] for values in self.values))
+        ]
+
+
+class StudentAnalyticsService:
+    """
+    Cohort results kept resident for request-time lookups.
+
+    Weak subjects, risk (from the saved / trained AcademicRiskAgent) and
+    plans come from the CohortSnapshot; mentorship text and trends are
+    computed for the whole cohort once at startup. Everything is held as
+    plain Python values indexed by student, so a request is a few dict
+    lookups plus JSON encoding.
+    """
+
+    def __init__(self, students, subjects, performance, paths=DATA_FILES,
+                 snapshot_dir=SNAPSHOT_DIR, model_path=MODEL_PATH):
+        # Coded IDs, as in the app, so both share one snapshot on disk
+        ids, coded_students, coded_subjects, coded_performance = encode_frames(
+            students, subjects, performance
+        )
+        snapshot = CohortSnapshot.load_or_build(
+            coded_students, coded_subjects, coded_performance, paths,
+            snapshot_dir=snapshot_dir, model_path=model_path,
+        )
+        weak_df = ids.decode(snapshot.weak_df)
+        risk_df = ids.decode(snapshot.risk_df)
+        plan_df = ids.decode(snapshot.study_df)
+        named_weak = weak_df
+        if not weak_df.empty:
+            names = dict(zip(subjects["subject_id"].astype(str), subjects["name"]))
+            named_weak = weak_df.assign(name=weak_df["subject_id"].astype(str).map(names))
+
+        trends = PerformanceTrendAgent().fit(performance)
+        subject_trends = trends.subject_state.reset_index()
+
+        self.student_ids = ids.students
+        self.records = {
+            "weak": _StudentRecords(named_weak),
+            "risk": _StudentRecords(risk_df),
+            "plan": _StudentRecords(plan_df),
+            "trend": _StudentRecords(trends.student_trends.reset_index(), drop=("student_id",)),
+            "subject_trends": _StudentRecords(pd.DataFrame({
+                "student_id": subject_trends["student_id"],
+                "subject_id": subject_trends["subject_id"].astype(str),
+                "slope": subject_trends["slope"],
+                "ewma": subject_trends["ewma"].round(2),
+                "exams": subject_trends["n"].astype("int64"),
+            }), drop=("student_id",)),
+        }
+
+        mentorship = AdvancedMentorshipAgent().generate_cohort(
+            risk_df, weak_df, plan_df, subjects=subjects,
+            student_ids=students["student_id"], trends=trends.student_trends,
+        )
+        self.mentorship = dict(zip(mentorship["student_id"].astype(str), mentorship["insights"]))
+
+    @classmethod
+    def from_data(cls, data_dir=DATA_DIR, cache_dir=CACHE_DIR, snapshot_dir=SNAPSHOT_DIR,
+                  model_path=MODEL_PATH):
+        paths = tuple(os.path.join(data_dir, f"{table}.csv") for table in TABLES)
+        with stage("api.startup"):
+            return cls(*load_data(data_dir, cache_dir), paths=paths,
+                       snapshot_dir=snapshot_dir, model_path=model_path)
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def has_student(self, student_id: str) -> bool:
+        return student_id in self.student_ids
+
+    def field(self, student_id: str, field: str):
+        """
+        JSON-ready value of one field for one (known) student.
+        """
+        if field == "mentorship":
+            return self.mentorship.get(student_id, "")
+
+        rows = self.records[field].get(student_id)
+        if field == "trend":
+            trend = rows[0] if rows else {"slope": None, "exams": 0, "within_subject": False,
+                                          "trend": "Stable"}
+            trend["subjects"] = self.records["subject_trends"].get(student_id)
+            return trend
+        if field == "risk":
+            return rows[0] if rows else None
+        return rows
+
+    def student(self, student_id: str, fields=FIELDS) -> dict:
+        return {"student_id": student_id, **{f: self.field(student_id, f) for f in fields}}
+
+
+# -------------------------
+# HTTP (asyncio streams, HTTP/1.1 keep-alive)
+# -------------------------
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+               501: "Not Implemented"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _is_str_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def route(service: StudentAnalyticsService, method: str, path: str, body: bytes):
+    """
+    Returns (status, payload) for one request.
+
+    GET  /health
+    GET  /students/{id}                  all fields
+    GET  /students/{id}/{field}          risk | weak | plan | mentorship | trend
+    POST /students/batch                 {"student_ids": [...], "fields": [...]}
+    """
+    parts = [unquote(p) for p in path.split("?", 1)[0].strip("/").split("/")]
+
+    if parts == ["health"]:
+        return 200, {"status": "ok", "students": len(service.student_ids)}
+
+    if parts == ["students", "batch"]:
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be JSON")
+        if not isinstance(request, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        ids = request.get("student_ids")
+        fields = request.get("fields")
+        if not _is_str_list(ids) or not ids:
+            raise HTTPError(400, "student_ids must be a non-empty list of strings")
+        if len(ids) > MAX_BATCH:
+            raise HTTPError(400, f"at most {MAX_BATCH} student_ids per request")
+        if fields is not None and not _is_str_list(fields):
+            raise HTTPError(400, "fields must be a list of strings")
+        fields = fields or list(FIELDS)
+        unknown_fields = [f for f in fields if f not in FIELDS]
+        if unknown_fields:
+            raise HTTPError(400, f"unknown fields: {', '.join(unknown_fields)}")
+
+        known = service.student_ids.get_indexer(ids) >= 0
+        return 200, {
+            "results": [service.student(sid, fields) for sid, ok in zip(ids, known) if ok],
+            "not_found": [sid for sid, ok in zip(ids, known) if not ok],
+        }
+
+    if len(parts) in (2, 3) and parts[0] == "students":
+        if method != "GET":
+            raise HTTPError(405, "use GET")
+        student_id = parts[1]
+        if not service.has_student(student_id):
+            raise HTTPError(404, f"unknown student {student_id}")
+        if len(parts) == 2:
+            return 200, service.student(student_id)
+        if parts[2] not in FIELDS:
+            raise HTTPError(404, f"unknown field {parts[2]}")
+        return 200, {"student_id": student_id, parts[2]: service.field(student_id, parts[2])}
+
+    raise HTTPError(404, "not found")
+
+
+def _response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, default=str).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def handle_connection(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, path, version = request_line.decode("latin-1").split()
+            except ValueError:
+                writer.write(_response(400, {"error": "malformed request line"}, False))
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            # Bodies are read by Content-Length only; the rest of a chunked
+            # (or otherwise encoded) request cannot be framed, so close after
+            transfer_encoding = headers.get("transfer-encoding", "").lower()
+            if transfer_encoding:
+                if transfer_encoding.rsplit(",", 1)[-1].strip() == "chunked":
+                    writer.write(_response(411, {"error": "chunked bodies are not supported; "
+                                                          "send Content-Length"}, False))
+                else:
+                    writer.write(_response(501, {"error": f"unsupported Transfer-Encoding: "
+                                                          f"{transfer_encoding}"}, False))
+                break
+            try:
+                length = int(headers.get("content-length", 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                writer.write(_response(400, {"error": "invalid Content-Length"}, False))
+                break
+            if length > MAX_BODY:
+                writer.write(_response(413, {"error": "body too large"}, False))
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            with stage("api.request", method=method, path=path.split("?", 1)[0]) as s:
+                try:
+                    status, payload = route(service, method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception:
+                    # A bug in one request must not drop the connection unanswered
+                    traceback.print_exc(file=sys.stderr)
+                    status, payload = 500, {"error": "internal server error"}
+                s.set(status=status)
+
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service: StudentAnalyticsService, host: str = "127.0.0.1", port: int = 8000,
+                ready: Optional[asyncio.Event] = None):
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(service, r, w), host, port, backlog=1024
+    )
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,248 @@
+# pipeline/cohort_cube.py
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from agents.risk_agent import MODEL_PATH
+from agents.weak_subject_agent import WeakSubjectAgent
+from pipeline.id_codes import encode_frames
+from pipeline.profiling import stage
+from pipeline.snapshot import DATA_FILES, SNAPSHOT_DIR, CohortSnapshot, data_fingerprint
+
+CUBE_VERSION = 1
+DIMENSIONS = ["branch", "semester", "subject_id"]
+ALL = "All"
+RISK_LEVELS = ["High", "Medium", "Low"]
+
+# Additive measures stored per cell; rates and means are derived from them
+STUDENT_MEASURES = ["students", "high", "medium", "low", "risk_score_sum", "risk_scored"]
+PAIR_MEASURES = ["enrolled", "weak", "score_sum"]
+
+
+class CohortCube:
+    """
+    Cohort rollups over branch x semester x subject, built once from the
+    agent outputs (risk levels, weak subjects) joined with the students'
+    branch / current semester and the subject table.
+
+    Every combination of a dimension value or "All" is precomputed, so a
+    dashboard filter is an index lookup instead of a pass over the
+    performance data. Per cell:
+
+    - students, high / medium / low: students (with a risk level) in the cell
+    - mean_risk_score, high_share
+    - enrolled, weak: student-subject pairs with marks, and how many are weak
+    - weak_rate, mean_score: share of weak pairs, mean subject score (%)
+
+    In subject cells the student measures count the students taking that
+    subject; in "All" subject cells each student is counted once.
+    """
+
+    def __init__(self, fingerprint, cells: pd.DataFrame):
+        self.version = CUBE_VERSION
+        self.fingerprint = fingerprint
+        self.cells = cells
+
+    # -------------------------
+    # Build
+    # -------------------------
+    @classmethod
+    def build(cls, students, subjects, performance, weak_df, risk_df, fingerprint, ids=None):
+        """
+        Frames may hold string IDs or int32 codes (consistently); pass the
+        IdDictionary as ids when they are coded, so subjects are stored by
+        their real IDs.
+        """
+        # -----------------------------
+        # 1️⃣ One row per student: branch, semester, risk
+        # -----------------------------
+        per_student = pd.DataFrame({
+            "student_id": np.asarray(students["student_id"]),
+            "branch": students["branch"].astype(str).to_numpy(),
+            "semester": students["current_semester"].astype(str).to_numpy(),
+        }).merge(pd.DataFrame({
+            "student_id": np.asarray(risk_df["student_id"]),
+            "risk_level": np.asarray(risk_df["risk_level"], dtype=object),
+            "risk_score": np.asarray(risk_df["risk_score"]),
+        }), on="student_id", how="left")
+        level = per_student.pop("risk_level").to_numpy()
+        score = pd.to_numeric(per_student.pop("risk_score"), errors="coerce")
+        per_student["students"] = pd.notna(level).astype(np.int64)
+        for name in RISK_LEVELS:
+            per_student[name.lower()] = (level == name).astype(np.int64)
+        per_student["risk_score_sum"] = score.fillna(0).to_numpy()
+        per_student["risk_scored"] = score.notna().astype(np.int64).to_numpy()
+
+        # -----------------------------
+        # 2️⃣ One row per (student, subject) with marks
+        # -----------------------------
+        sums = WeakSubjectAgent().score_sums(performance)
+        pairs = sums.index.to_frame(index=False)
+        pairs["avg_score"] = (sums["score_sum"] / sums["score_count"] * 100).round(2).to_numpy()
+        weak_pairs = pd.MultiIndex.from_arrays(
+            [np.asarray(weak_df["student_id"]), np.asarray(weak_df["subject_id"])]
+        )
+        pairs["weak"] = sums.index.isin(weak_pairs).astype(np.int64)
+        pairs["enrolled"] = 1
+        pairs = pairs.rename(columns={"avg_score": "score_sum"}).merge(
+            per_student, on="student_id", how="inner"
+        )
+        pairs["subject_id"] = (
+            ids.decode_subjects(pairs["subject_id"]) if ids is not None else pairs["subject_id"]
+        )
+        pairs["subject_id"] = pairs["subject_id"].astype(str)
+
+        # -----------------------------
+        # 3️⃣ Base cells, then roll branch / semester up to "All"
+        # -----------------------------
+        measures = STUDENT_MEASURES + PAIR_MEASURES
+        by_subject = pairs.groupby(DIMENSIONS, observed=True)[measures].sum()
+        all_subjects = per_student.groupby(["branch", "semester"], observed=True)[STUDENT_MEASURES].sum().join(
+            pairs.groupby(["branch", "semester"], observed=True)[PAIR_MEASURES].sum(), how="left"
+        ).fillna(0)
+        all_subjects["subject_id"] = ALL
+        base = pd.concat([by_subject.reset_index(), all_subjects.reset_index()], ignore_index=True)
+
+        rollups = []
+        for keep_branch in (True, False):
+            for keep_semester in (True, False):
+                keys = [d for d, keep in (("branch", keep_branch), ("semester", keep_semester)) if keep]
+                rolled = base.groupby(keys + ["subject_id"], observed=True)[measures].sum().reset_index()
+                for dim in ("branch", "semester"):
+                    if dim not in keys:
+                        rolled[dim] = ALL
+                rollups.append(rolled)
+
+        cells = pd.concat(rollups, ignore_index=True)
+        counts = [m for m in measures if not m.endswith("_sum")]
+        cells[counts] = cells[counts].astype(np.int64)
+        cells = cls._derive(cells, subjects, ids)
+        return cls(fingerprint, cells.set_index(DIMENSIONS).sort_index())
+
+    @staticmethod
+    def _derive(cells: pd.DataFrame, subjects: pd.DataFrame, ids=None) -> pd.DataFrame:
+        subject_ids = subjects["subject_id"]
+        if ids is not None:
+            subject_ids = ids.decode_subjects(subject_ids)
+        names = dict(zip(np.asarray(subject_ids).astype(str), subjects["name"]))
+        cells["subject"] = cells["subject_id"].map(names).fillna(cells["subject_id"])
+        cells.loc[cells["subject_id"] == ALL, "subject"] = "All subjects"
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cells["high_share"] = cells["high"] / cells["students"]
+            cells["mean_risk_score"] = cells["risk_score_sum"] / cells["risk_scored"]
+            cells["weak_rate"] = cells["weak"] / cells["enrolled"]
+            cells["mean_score"] = cells["score_sum"] / cells["enrolled"]
+        return cells
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def query(self, branch=None, semester=None, subject=None) -> pd.DataFrame:
+        """
+        Cells for one slice. Per dimension: None -> the "All" rollup,
+        "*" -> one row per value, anything else -> that value.
+
+            cube.query(branch="CE", semester=3)            # one cell
+            cube.query(branch="*", semester=3)             # every branch, sem 3
+            cube.query(branch="CE", subject="*")           # every subject in CE
+        """
+        key, broken_out = [], []
+        for dim, value in zip(DIMENSIONS, (branch, semester, subject)):
+            if value is None:
+                key.append(ALL)
+            elif value == "*":
+                key.append(slice(None))
+                broken_out.append(dim)
+            else:
+                key.append(str(value))
+
+        try:
+            if broken_out:
+                rows = self.cells.loc[tuple(key), :]
+            else:
+                rows = self.cells.loc[[tuple(key)]]
+        except KeyError:
+            return self.cells.iloc[0:0].reset_index()
+
+        for dim in broken_out:
+            rows = rows[rows.index.get_level_values(dim) != ALL]
+        return rows.reset_index()
+
+    def cell(self, branch=None, semester=None, subject=None) -> dict:
+        """
+        One cell as a dict (empty if the combination has no students).
+        """
+        rows = self.query(branch, semester, subject)
+        return rows.iloc[0].to_dict() if not rows.empty else {}
+
+    def values(self, dim: str) -> list:
+        """
+        Values of one dimension, without "All".
+        """
+        level = self.cells.index.get_level_values(dim).unique()
+        # Numeric values (semesters) in numeric order
+        return sorted((v for v in level if v != ALL),
+                      key=lambda v: (not v.isdigit(), int(v) if v.isdigit() else 0, v))
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    @staticmethod
+    def path_for(fingerprint, snapshot_dir=SNAPSHOT_DIR) -> str:
+        return os.path.join(snapshot_dir, f"cube_v{CUBE_VERSION}_{fingerprint[:16]}.pkl")
+
+    def save(self, snapshot_dir=SNAPSHOT_DIR) -> str:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        path = self.path_for(self.fingerprint, snapshot_dir)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as fh:
+            pickle.dump(
+                {"version": self.version, "fingerprint": self.fingerprint, "cells": self.cells},
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, fingerprint, snapshot_dir=SNAPSHOT_DIR):
+        """
+        Returns the stored cube for this fingerprint, or None if it is
+        missing or was written by a different cube version.
+        """
+        path = cls.path_for(fingerprint, snapshot_dir)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "rb") as fh:
+            payload = pickle.load(fh)
+
+        if payload.get("version") != CUBE_VERSION or payload.get("fingerprint") != fingerprint:
+            return None
+        return cls(fingerprint, payload["cells"])
+
+    @classmethod
+    def load_or_build(cls, students, subjects, performance, paths=DATA_FILES,
+                      snapshot_dir=SNAPSHOT_DIR, model_path=MODEL_PATH):
+        """
+        Cube for these (string-ID) frames, rebuilt only when the data
+        changes. Agent outputs come from the shared CohortSnapshot.
+        """
+        with stage("cube.load_or_build") as s:
+            fingerprint = data_fingerprint(paths)
+            cube = cls.load(fingerprint, snapshot_dir)
+            s.set(cache_hit=cube is not None)
+            if cube is None:
+                # Coded IDs, as in the app, so both share one snapshot on disk
+                ids, students, subjects, performance = encode_frames(students, subjects, performance)
+                snapshot = CohortSnapshot.load_or_build(
+                    students, subjects, performance, paths, snapshot_dir, model_path=model_path
+                )
+                with stage("cube.build", rows=len(performance)):
+                    cube = cls.build(students, subjects, performance, snapshot.weak_df,
+                                     snapshot.risk_df, fingerprint, ids=ids)
+                cube.save(snapshot_dir)
+        return cube
@@ -0,0 +1,209 @@
+# pipeline/compute.py
+import os
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from agents.risk_agent import AcademicRiskAgent
+from agents.weak_subject_agent import WeakSubjectAgent
+from pipeline.data_loader import CACHE_DIR, DATA_DIR, cache_is_fresh, ingest, load_data
+
+DEFAULT_BACKEND = "pandas"
+SUBJECT_COLUMNS = ["name", "difficulty_factor"]
+
+
+def _plain_ids(df: pd.DataFrame) -> pd.DataFrame:
+    # Both backends hand back plain string IDs so results compare directly
+    for col in ("student_id", "subject_id"):
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype(object)
+    return df.reset_index(drop=True)
+
+
+def _ids_like(df: pd.DataFrame, performance: pd.DataFrame) -> pd.DataFrame:
+    # Caller's frames: IDs come back in the caller's dtype (int32 codes,
+    # categoricals or strings), as the agents return them
+    for col in ("student_id", "subject_id"):
+        if col in df.columns:
+            df[col] = df[col].astype(performance[col].dtype)
+    return df.reset_index(drop=True)
+
+
+class PandasBackend:
+    """
+    Reference backend: the agents' own pandas code.
+
+    Every method takes the performance / subjects frames to work on
+    (string IDs or int32 codes); called without them it reads the
+    columnar cache under data_dir / cache_dir and returns string IDs.
+    threads is accepted for a common signature; pandas uses one core.
+    """
+
+    name = "pandas"
+
+    def __init__(self, data_dir: str = DATA_DIR, cache_dir: str = CACHE_DIR,
+                 threads: Optional[int] = None):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self._tables = None
+
+    def _load(self):
+        if self._tables is None:
+            self._tables = load_data(self.data_dir, self.cache_dir)
+        return self._tables
+
+    def _frames(self, performance, subjects):
+        if performance is None:
+            _, subjects, performance = self._load()
+            return performance, subjects, _plain_ids
+        return performance, subjects, lambda df: _ids_like(df, performance)
+
+    def weak_subjects(self, performance: pd.DataFrame = None, subjects: pd.DataFrame = None,
+                      with_subjects: bool = False) -> pd.DataFrame:
+        performance, subjects, finish = self._frames(performance, subjects)
+        weak_df = WeakSubjectAgent().run(performance, subjects)
+        if with_subjects:
+            columns = ["subject_id"] + [c for c in SUBJECT_COLUMNS if c in subjects.columns]
+            weak_df = weak_df.merge(subjects[columns], on="subject_id", how="left")
+        return finish(weak_df)
+
+    def risk_features(self, performance: pd.DataFrame = None,
+                      subjects: pd.DataFrame = None) -> pd.DataFrame:
+        performance, subjects, finish = self._frames(performance, subjects)
+        return finish(AcademicRiskAgent().prepare_features(performance.copy(), subjects.copy()))
+
+
+class DuckDBBackend:
+    """
+    The same aggregations as SQL, run by an embedded DuckDB using all
+    cores (or threads). The frames passed in are scanned in place; without
+    them the columnar cache's Parquet files are read. Only aggregated
+    rows are materialized in pandas; the final rounding / filtering and
+    divisions are done there with the agents' own helpers, so results
+    match PandasBackend exactly for string IDs. On int32 codes the pandas
+    fast path sums with np.bincount, so averages of non-integer values
+    (avg_weighted_marks) can differ in the last bit.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, data_dir: str = DATA_DIR, cache_dir: str = CACHE_DIR,
+                 threads: Optional[int] = None):
+        import duckdb
+
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self.conn = duckdb.connect()
+        self.conn.execute("SET threads = ?", [int(threads or os.cpu_count() or 1)])
+
+    def _frames(self, performance, subjects):
+        """
+        Exposes the inputs as the views performance / subjects and returns
+        the function that finishes the ID columns of a result.
+        """
+        for table in ("performance", "subjects"):
+            # A registered frame would shadow the Parquet view of the same name
+            self.conn.unregister(table)
+        if performance is None:
+            if not cache_is_fresh(self.data_dir, self.cache_dir):
+                ingest(self.data_dir, self.cache_dir)
+            for table in ("performance", "subjects"):
+                path = os.path.join(self.cache_dir, f"{table}.parquet")
+                self.conn.read_parquet(path).create_view(table, replace=True)
+            return _plain_ids
+
+        self.conn.register("performance", performance)
+        self.conn.register("subjects", subjects)
+        return lambda df: _ids_like(df, performance)
+
+    def _query(self, sql: str) -> pd.DataFrame:
+        return self.conn.execute(sql).df()
+
+    def weak_subjects(self, performance: pd.DataFrame = None, subjects: pd.DataFrame = None,
+                      with_subjects: bool = False) -> pd.DataFrame:
+        finish = self._frames(performance, subjects)
+        # Rows with a missing ID are left out, as groupby does
+        sums = self._query("""
+            SELECT student_id, subject_id,
+                   fsum(COALESCE(marks_obtained, 0)::DOUBLE
+                        / CASE WHEN max_marks IS NULL OR max_marks = 0 THEN 100
+                               ELSE max_marks END) AS score_sum,
+                   COUNT(*) AS score_count
+            FROM performance
+            WHERE student_id IS NOT NULL AND subject_id IS NOT NULL
+            GROUP BY ALL
+            ORDER BY student_id, subject_id
+        """)
+        weak_df = WeakSubjectAgent().run_from_sums(sums.set_index(["student_id", "subject_id"]))
+        weak_df = finish(weak_df)
+
+        if with_subjects:
+            subjects = self._query("SELECT * FROM subjects")
+            columns = ["subject_id"] + [c for c in SUBJECT_COLUMNS if c in subjects.columns]
+            weak_df = weak_df.merge(finish(subjects[columns].copy()), on="subject_id", how="left")
+        return weak_df
+
+    def risk_features(self, performance: pd.DataFrame = None,
+                      subjects: pd.DataFrame = None) -> pd.DataFrame:
+        finish = self._frames(performance, subjects)
+        subject_columns = self._query("DESCRIBE subjects")["column_name"].tolist()
+        if "difficulty_factor" in subject_columns:
+            difficulty = "COALESCE(TRY_CAST(s.difficulty_factor AS DOUBLE), 1)"
+        else:
+            difficulty = "1.0"
+
+        sums = self._query(f"""
+            SELECT p.student_id,
+                   COUNT(*) AS rows,
+                   fsum(COALESCE(TRY_CAST(p.marks_obtained AS DOUBLE), 0)) AS marks_sum,
+                   fsum(COALESCE(TRY_CAST(p.marks_obtained AS DOUBLE), 0) * d.difficulty) AS weighted_sum,
+                   COUNT(d.difficulty) AS weighted_count,
+                   fsum(COALESCE(TRY_CAST(p.attendance AS DOUBLE), 0)) AS attendance_sum,
+                   COUNT(p.exam_type) AS exams_taken
+            FROM performance AS p
+            LEFT JOIN (
+                SELECT subject_id, {difficulty} AS difficulty FROM subjects AS s
+            ) AS d ON p.subject_id = d.subject_id
+            WHERE p.student_id IS NOT NULL
+            GROUP BY ALL
+            ORDER BY p.student_id
+        """)
+
+        rows = sums["rows"].to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            features = pd.DataFrame({
+                "student_id": sums["student_id"],
+                "avg_marks": sums["marks_sum"].to_numpy() / rows,
+                "avg_weighted_marks": (
+                    sums["weighted_sum"].to_numpy() / sums["weighted_count"].to_numpy(dtype=np.float64)
+                ),
+                "avg_attendance": sums["attendance_sum"].to_numpy() / rows,
+                "exams_taken": sums["exams_taken"].astype(np.int64),
+            })
+        value_cols = features.columns.drop("student_id")
+        features[value_cols] = features[value_cols].fillna(0)
+        return finish(features)
+
+
+# -------------------------
+# Registry (lazy, like services.llm_backend)
+# -------------------------
+BACKENDS: Dict[str, Callable[..., object]] = {
+    "pandas": PandasBackend,
+    "duckdb": DuckDBBackend,
+}
+
+
+def get_backend(name: Optional[str] = None, **kwargs):
+    """
+    COMPUTE_BACKEND=pandas|duckdb picks the default. DuckDB is optional;
+    asking for it without the package installed raises ImportError.
+    """
+    name = (name or os.getenv("COMPUTE_BACKEND", DEFAULT_BACKEND)).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown compute backend: {name} (choose from {', '.join(BACKENDS)})")
+    try:
+        return BACKENDS[name](**kwargs)
+    except ModuleNotFoundError as e:
+        raise ImportError(f"The {name} compute backend needs the '{e.name}' package") from e
@@ -0,0 +1,175 @@
+# pipeline/data_loader.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from pipeline.profiling import stage
+
+DATA_DIR = "data"
+CACHE_DIR = os.path.join("data", "cache")
+CACHE_VERSION = 1
+TABLES = ("students", "subjects", "performance")
+
+# Column typing applied once at ingest time
+CATEGORY_COLUMNS = {
+    "students": ["student_id", "branch"],
+    "subjects": ["subject_id", "branch"],
+    "performance": ["student_id", "subject_id", "exam_type"],
+}
+INT_COLUMNS = {
+    "students": {"current_semester": 0},
+    "subjects": {"semester": 0, "credits": 0},
+    "performance": {"marks_obtained": 0, "max_marks": 100, "attendance": 0},
+}
+FLOAT_COLUMNS = {
+    "subjects": {"difficulty_factor": 1.0},
+}
+DATE_COLUMNS = {
+    "performance": ["exam_date"],
+}
+
+
+def _small_int(series: pd.Series) -> pd.Series:
+    """
+    Downcast to the smallest integer dtype that holds the values,
+    keeping float64 if any value is fractional.
+    """
+    values = series.to_numpy(dtype="float64")
+    if not np.all(np.mod(values, 1) == 0):
+        return series.astype("float64")
+    return pd.to_numeric(series.astype("int64"), downcast="integer")
+
+
+# -------------------------
+# CSV parsing (ingest only)
+# -------------------------
+def read_csv_table(path: str, table: str) -> pd.DataFrame:
+    """
+    Parse one raw CSV the way the app always has: everything as text,
+    stripped, then numeric columns coerced with their defaults.
+    """
+    return clean_table(pd.read_csv(path, dtype=str), table)
+
+
+def clean_table(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Strip and coerce a raw (all-text) frame or chunk of one table.
+    """
+    df.columns = df.columns.str.strip()
+    df = df.apply(lambda x: x.str.strip())
+
+    for col, default in INT_COLUMNS.get(table, {}).items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(default)
+    for col, default in FLOAT_COLUMNS.get(table, {}).items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(default)
+
+    # Columns the agents rely on even when absent from the file
+    if table == "performance":
+        if "max_marks" not in df.columns:
+            df["max_marks"] = 100
+        if "attendance" not in df.columns:
+            df["attendance"] = 0
+
+    return df
+
+
+def to_columnar(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    df = df.copy()
+    for col in CATEGORY_COLUMNS.get(table, []):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in INT_COLUMNS.get(table, {}):
+        if col in df.columns:
+            df[col] = _small_int(df[col])
+    for col in DATE_COLUMNS.get(table, []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+# -------------------------
+# Cache manifest
+# -------------------------
+def _source_stamps(data_dir: str) -> dict:
+    stamps = {}
+    for table in TABLES:
+        st = os.stat(os.path.join(data_dir, f"{table}.csv"))
+        stamps[table] = [st.st_size, st.st_mtime_ns]
+    return stamps
+
+
+def _manifest_path(cache_dir: str) -> str:
+    return os.path.join(cache_dir, "manifest.json")
+
+
+def cache_is_fresh(data_dir: str = DATA_DIR, cache_dir: str = CACHE_DIR) -> bool:
+    path = _manifest_path(cache_dir)
+    if not os.path.exists(path):
+        return False
+
+    with open(path) as fh:
+        manifest = json.load(fh)
+
+    return (
+        manifest.get("version") == CACHE_VERSION
+        and manifest.get("sources") == _source_stamps(data_dir)
+        and all(os.path.exists(os.path.join(cache_dir, f"{t}.parquet")) for t in TABLES)
+    )
+
+
+def ingest(data_dir: str = DATA_DIR, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Convert the three CSVs into typed Parquet files under cache_dir.
+    Returns {table: row_count}.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+
+    counts = {}
+    for table in TABLES:
+        df = to_columnar(read_csv_table(os.path.join(data_dir, f"{table}.csv"), table), table)
+        tmp_path = os.path.join(cache_dir, f"{table}.parquet.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(cache_dir, f"{table}.parquet"))
+        counts[table] = len(df)
+
+    with open(_manifest_path(cache_dir), "w") as fh:
+        json.dump(
+            {"version": CACHE_VERSION, "sources": _source_stamps(data_dir), "rows": counts},
+            fh,
+            indent=2
+        )
+    return counts
+
+
+# -------------------------
+# Fast load
+# -------------------------
+def load_data(data_dir: str = DATA_DIR, cache_dir: str = CACHE_DIR):
+    """
+    Returns (students, subjects, performance) from the columnar cache,
+    ingesting first if the CSVs changed since the last ingest.
+    """
+    with stage("load_data") as s:
+        fresh = cache_is_fresh(data_dir, cache_dir)
+        if not fresh:
+            with stage("ingest"):
+                ingest(data_dir, cache_dir)
+
+        tables = tuple(
+            pd.read_parquet(os.path.join(cache_dir, f"{table}.parquet"))
+            for table in TABLES
+        )
+        s.set(rows=len(tables[2]), cache_hit=fresh)
+    return tables
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m pipeline.data_loader [data_dir] [cache_dir]
+    rows = ingest(*sys.argv[1:3])
+    print("Columnar cache written:", rows)
@@ -0,0 +1,103 @@
+# pipeline/feature_store.py
+import numpy as np
+import pandas as pd
+
+SUM_COLUMNS = [
+    "rows",
+    "marks_sum",
+    "weighted_sum",
+    "weighted_count",
+    "attendance_sum",
+    "exam_count",
+]
+
+
+class RiskFeatureStore:
+    """
+    Running per-student sums and counts behind AcademicRiskAgent features.
+
+    Appending a batch of performance rows only updates the students in
+    that batch; features() divides the sums out into the columns of
+    AcademicRiskAgent.prepare_features. Counts are exact; sums are added
+    chunk by chunk, so an average can differ from the one-shot mean in
+    its last bit (non-integer values such as weighted marks).
+    """
+
+    def __init__(self, subjects: pd.DataFrame):
+        if "difficulty_factor" in subjects.columns:
+            difficulty = pd.to_numeric(subjects["difficulty_factor"], errors="coerce").fillna(1)
+            self.difficulty = pd.Series(difficulty.values, index=subjects["subject_id"].values)
+        else:
+            self.difficulty = None
+
+        self.sums = pd.DataFrame(columns=SUM_COLUMNS, dtype="float64")
+        self.sums.index.name = "student_id"
+
+    # -------------------------
+    # Batch aggregation
+    # -------------------------
+    def _partial_sums(self, batch: pd.DataFrame) -> pd.DataFrame:
+        # float64 so small integer dtypes from the columnar cache cannot overflow
+        marks = pd.to_numeric(batch["marks_obtained"], errors="coerce").fillna(0).astype("float64")
+        attendance = pd.to_numeric(batch["attendance"], errors="coerce").fillna(0).astype("float64")
+
+        if self.difficulty is not None:
+            # Unknown subjects give NaN, which mean() skipped in the full path
+            difficulty = batch["subject_id"].map(self.difficulty)
+        else:
+            difficulty = pd.Series(1.0, index=batch.index)
+        weighted = marks * difficulty
+
+        parts = pd.DataFrame({
+            "student_id": np.asarray(batch["student_id"]),
+            "rows": 1.0,
+            "marks_sum": marks.values,
+            "weighted_sum": weighted.fillna(0).values,
+            "weighted_count": weighted.notna().astype("float64").values,
+            "attendance_sum": attendance.values,
+            "exam_count": batch["exam_type"].notna().astype("float64").values,
+        })
+        return parts.groupby("student_id").sum()
+
+    def append(self, batch: pd.DataFrame) -> pd.Index:
+        """
+        Fold new performance rows into the store.
+        Returns the student_ids whose features changed.
+        """
+        if batch.empty:
+            return pd.Index([], name="student_id")
+
+        partial = self._partial_sums(batch)
+        touched = partial.index
+
+        existing = touched.intersection(self.sums.index)
+        if len(existing):
+            self.sums.loc[existing, SUM_COLUMNS] += partial.loc[existing, SUM_COLUMNS]
+
+        new = touched.difference(self.sums.index)
+        if len(new):
+            self.sums = pd.concat([self.sums, partial.loc[new]]) if len(self.sums) else partial.loc[new]
+            self.sums = self.sums.sort_index()
+            self.sums.index.name = "student_id"
+
+        return touched
+
+    # -------------------------
+    # Features
+    # -------------------------
+    def features(self, student_ids=None) -> pd.DataFrame:
+        """
+        Same columns as AcademicRiskAgent.prepare_features.
+        """
+        sums = self.sums if student_ids is None else self.sums.loc[student_ids]
+
+        features = pd.DataFrame({
+            "student_id": sums.index.values,
+            "avg_marks": (sums["marks_sum"] / sums["rows"]).values,
+            "avg_weighted_marks": (sums["weighted_sum"] / sums["weighted_count"]).values,
+            "avg_attendance": (sums["attendance_sum"] / sums["rows"]).values,
+            "exams_taken": sums["exam_count"].astype("int64").values,
+        })
+
+        # Students with no weighted rows match the full path's fillna(0)
+        return features.fillna(0)
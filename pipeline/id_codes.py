@@ -0,0 +1,116 @@
+# pipeline/id_codes.py
+import numpy as np
+import pandas as pd
+
+CODE_DTYPE = np.int32
+ID_COLUMNS = {"student_id": "students", "subject_id": "subjects"}
+
+
+def is_coded(df: pd.DataFrame, columns=("student_id",)) -> bool:
+    """
+    True when the given ID columns already hold integer codes.
+    """
+    return all(
+        col in df.columns and pd.api.types.is_integer_dtype(df[col])
+        for col in columns
+    )
+
+
+class IdDictionary:
+    """
+    Maps student and subject IDs (e.g. S00001, SUB001) to dense int32 codes.
+
+    Codes follow the order of the master tables, so a student's code is also
+    its row in students.csv. IDs that only appear in performance data are
+    appended after them.
+    """
+
+    def __init__(self, student_ids, subject_ids):
+        self.students = pd.Index(pd.unique(np.asarray(student_ids, dtype=object)), name="student_id")
+        self.subjects = pd.Index(pd.unique(np.asarray(subject_ids, dtype=object)), name="subject_id")
+
+    @classmethod
+    def from_frames(cls, students, subjects, performance) -> "IdDictionary":
+        return cls(
+            np.concatenate([np.asarray(students["student_id"], dtype=object),
+                            np.asarray(performance["student_id"], dtype=object)]),
+            np.concatenate([np.asarray(subjects["subject_id"], dtype=object),
+                            np.asarray(performance["subject_id"], dtype=object)]),
+        )
+
+    @property
+    def n_students(self) -> int:
+        return len(self.students)
+
+    @property
+    def n_subjects(self) -> int:
+        return len(self.subjects)
+
+    # -------------------------
+    # Encode
+    # -------------------------
+    @staticmethod
+    def _encode(index: pd.Index, values) -> np.ndarray:
+        if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+            # Map the (few) categories once, then index by the category codes
+            lookup = np.append(index.get_indexer(values.cat.categories), -1)
+            return lookup[values.cat.codes.to_numpy()].astype(CODE_DTYPE)
+        return index.get_indexer(np.asarray(values, dtype=object)).astype(CODE_DTYPE)
+
+    def encode_students(self, values) -> np.ndarray:
+        return self._encode(self.students, values)
+
+    def encode_subjects(self, values) -> np.ndarray:
+        return self._encode(self.subjects, values)
+
+    def student_code(self, student_id) -> int:
+        return int(self.students.get_loc(student_id))
+
+    def subject_code(self, subject_id) -> int:
+        return int(self.subjects.get_loc(subject_id))
+
+    # -------------------------
+    # Decode (display only)
+    # -------------------------
+    @staticmethod
+    def _decode(index: pd.Index, codes) -> np.ndarray:
+        # -1 (an ID _encode did not know) decodes to NaN, not the last ID
+        return index.take(np.asarray(codes), allow_fill=True, fill_value=np.nan).values
+
+    def decode_students(self, codes) -> np.ndarray:
+        return self._decode(self.students, codes)
+
+    def decode_subjects(self, codes) -> np.ndarray:
+        return self._decode(self.subjects, codes)
+
+    # -------------------------
+    # Frames
+    # -------------------------
+    def encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Copy of df with student_id / subject_id replaced by int32 codes.
+        """
+        df = df.copy()
+        for col, kind in ID_COLUMNS.items():
+            if col in df.columns and not pd.api.types.is_integer_dtype(df[col]):
+                df[col] = self._encode(getattr(self, kind), df[col])
+        return df
+
+    def decode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Copy of df with coded ID columns turned back into strings;
+        unknown codes (-1) become NaN.
+        """
+        df = df.copy()
+        for col, kind in ID_COLUMNS.items():
+            if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+                df[col] = self._decode(getattr(self, kind), df[col])
+        return df
+
+
+def encode_frames(students, subjects, performance):
+    """
+    Returns (ids, students, subjects, performance) with every ID column coded.
+    """
+    ids = IdDictionary.from_frames(students, subjects, performance)
+    return ids, ids.encode(students), ids.encode(subjects), ids.encode(performance)
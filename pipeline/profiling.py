@@ -0,0 +1,198 @@
+# pipeline/profiling.py
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import pandas as pd
+
+# PROFILE=1 turns recording on at startup; PROFILE_LOG=<path> also appends
+# every finished stage as one JSON line
+ENV_FLAG = "PROFILE"
+ENV_LOG = "PROFILE_LOG"
+
+
+class _NullStage:
+    """
+    Shared no-op stage used while profiling is off.
+    """
+
+    enabled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    enabled = True
+
+    __slots__ = ("profiler", "name", "fields", "start", "wall")
+
+    def __init__(self, profiler, name, fields):
+        self.profiler = profiler
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        record = {
+            "stage": self.name,
+            "run": self.profiler.current_run(),
+            "started": round(self.wall, 3),
+            "duration_ms": round(duration * 1000, 3),
+            "ok": exc_type is None,
+        }
+        record.update(self.fields)
+        self.profiler.record(record)
+        return False
+
+    def set(self, **fields):
+        """
+        Attach rows processed, cache hits, token counts, ...
+        """
+        self.fields.update(fields)
+
+
+class Profiler:
+    """
+    Per-stage timing for the pipeline and UI.
+
+        with stage("weak_subject.run") as s:
+            weak_df = WeakSubjectAgent().run(performance, subjects)
+            s.set(rows=len(weak_df))
+
+    While disabled, stage() hands back one shared no-op object, so the
+    cost is a single attribute check per call. Recent records are kept
+    in memory (max_records) for the debug panel; log_path streams them
+    to a JSON-lines file as well.
+
+    `enabled` is the process-wide default. new_run(enabled=...) overrides
+    it for the calling thread only, so concurrent Streamlit sessions (one
+    script thread each) switch profiling on and off independently, and
+    each reads back only its own run's records.
+    """
+
+    def __init__(self, enabled: bool = False, log_path: Optional[str] = None,
+                 max_records: int = 5000):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._runs = 0
+
+    def stage(self, name: str, **fields):
+        if not getattr(self._local, "enabled", self.enabled):
+            return _NULL_STAGE
+        return _Stage(self, name, fields)
+
+    def is_enabled(self) -> bool:
+        """
+        Whether stages are recorded in the calling thread.
+        """
+        return getattr(self._local, "enabled", self.enabled)
+
+    # -------------------------
+    # Runs (one per Streamlit rerun / batch)
+    # -------------------------
+    def new_run(self, enabled: Optional[bool] = None) -> int:
+        """
+        Start a run in the calling thread; enabled (if given) switches
+        recording for this thread only.
+        """
+        if enabled is not None:
+            self._local.enabled = enabled
+        with self._lock:
+            self._runs += 1
+            run = self._local.run = self._runs
+        return run
+
+    def current_run(self) -> int:
+        return getattr(self._local, "run", 0)
+
+    # -------------------------
+    # Storage / export
+    # -------------------------
+    def record(self, record: dict):
+        with self._lock:
+            self.records.append(record)
+            if self.log_path:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(record, default=str) + "\n")
+
+    def run_records(self, run: Optional[int] = None) -> list:
+        run = self.current_run() if run is None else run
+        with self._lock:
+            return [r for r in self.records if r["run"] == run]
+
+    def summary(self, run: Optional[int] = None) -> pd.DataFrame:
+        """
+        Stage table for one run (default: the current one), slowest first.
+        """
+        records = self.run_records(run)
+        if not records:
+            return pd.DataFrame(columns=["stage", "duration_ms"])
+        df = pd.DataFrame(records).drop(columns=["run", "started"])
+        return df.sort_values("duration_ms", ascending=False, kind="stable").reset_index(drop=True)
+
+    def export_jsonl(self, path: str) -> int:
+        """
+        Write every record still in memory to path; returns the count.
+        """
+        with self._lock:
+            records = list(self.records)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            for record in records:
+                fh.write(json.dumps(record, default=str) + "\n")
+        return len(records)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+PROFILER = Profiler(
+    enabled=os.getenv(ENV_FLAG, "").lower() in ("1", "true", "yes"),
+    log_path=os.getenv(ENV_LOG) or None,
+)
+
+
+def stage(name: str, **fields):
+    """
+    Module-level shortcut for PROFILER.stage().
+    """
+    return PROFILER.stage(name, **fields)
+
+
+def profiled(name: str):
+    """
+    Decorator form of stage(): each call of the wrapped function is one
+    stage, so agents and LLM clients are timed from every entry point
+    (app, batch runner, API server).
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with PROFILER.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
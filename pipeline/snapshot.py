@@ -0,0 +1,205 @@
+# pipeline/snapshot.py
+import hashlib
+import os
+import pickle
+from datetime import date
+
+from agents.risk_agent import MODEL_PATH, AcademicRiskAgent
+from agents.study_plan_agent import StudyPlanAgent
+from agents.study_scheduler_agent import StudySchedulerAgent
+from pipeline.compute import get_backend
+from pipeline.profiling import stage
+
+SNAPSHOT_VERSION = 3
+STUDY_PLANNERS = ("simple", "scheduler")
+SNAPSHOT_DIR = os.path.join("data", "snapshots")
+DATA_FILES = (
+    os.path.join("data", "students.csv"),
+    os.path.join("data", "subjects.csv"),
+    os.path.join("data", "performance.csv"),
+)
+
+
+def data_fingerprint(paths=DATA_FILES) -> str:
+    """
+    SHA-256 over the raw bytes of the input files.
+    Any edit to the data produces a new fingerprint.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def file_stamps(paths=DATA_FILES) -> tuple:
+    """
+    Cheap (path, size, mtime) tuple used as a cache key by the UI
+    so the content hash is only recomputed when a file is touched.
+    """
+    stamps = []
+    for path in paths:
+        st = os.stat(path)
+        stamps.append((path, st.st_size, st.st_mtime_ns))
+    return tuple(stamps)
+
+
+def resolve_planner(planner=None) -> str:
+    """
+    STUDY_PLANNER=simple|scheduler picks the default study planner:
+    simple is StudyPlanAgent (one subject per day by priority),
+    scheduler is StudySchedulerAgent (sessions packed into a daily hour
+    budget before each exam).
+    """
+    planner = (planner or os.getenv("STUDY_PLANNER", "simple")).strip().lower()
+    if planner not in STUDY_PLANNERS:
+        raise ValueError(f"Unknown study planner: {planner} (choose from {', '.join(STUDY_PLANNERS)})")
+    return planner
+
+
+def build_study_plan(weak_df, subjects, performance, planner=None):
+    if resolve_planner(planner) == "scheduler":
+        return StudySchedulerAgent().run(weak_df, subjects, performance)
+    return StudyPlanAgent().run(weak_df)
+
+
+class CohortSnapshot:
+    """
+    Precomputed weak subjects, risk and study plans for the whole cohort,
+    with a student_id index for constant-time per-student lookups.
+    """
+
+    def __init__(self, fingerprint, weak_df, risk_df, study_df, built_on=None, planner="simple"):
+        self.version = SNAPSHOT_VERSION
+        self.fingerprint = fingerprint
+        self.planner = planner
+        # Study plan dates are relative to the build day
+        self.built_on = built_on or date.today().isoformat()
+        self.weak_df = weak_df.reset_index(drop=True)
+        self.risk_df = risk_df.reset_index(drop=True)
+        self.study_df = study_df.reset_index(drop=True)
+        self._build_index()
+
+    # -------------------------
+    # Index
+    # -------------------------
+    def _build_index(self):
+        self.index = {
+            name: (frame.groupby("student_id", observed=True).indices if not frame.empty else {})
+            for name, frame in (
+                ("weak", self.weak_df),
+                ("risk", self.risk_df),
+                ("plan", self.study_df),
+            )
+        }
+
+    def _rows(self, name, frame, student_id):
+        positions = self.index[name].get(student_id)
+        if positions is None:
+            return frame.iloc[0:0]
+        return frame.iloc[positions]
+
+    def lookup(self, student_id):
+        """
+        Returns (student_weak, student_risk, student_plan) for one student.
+        """
+        return (
+            self._rows("weak", self.weak_df, student_id),
+            self._rows("risk", self.risk_df, student_id),
+            self._rows("plan", self.study_df, student_id),
+        )
+
+    # -------------------------
+    # Build
+    # -------------------------
+    @classmethod
+    def build(cls, students, subjects, performance, fingerprint, planner=None, model_path=MODEL_PATH):
+        planner = resolve_planner(planner)
+        # Aggregations run on the COMPUTE_BACKEND engine (pandas by default)
+        backend = get_backend()
+        with stage("weak_subject.run", rows=len(performance), backend=backend.name):
+            weak_df = backend.weak_subjects(performance, subjects)
+        with stage("risk.load_or_fit", rows=len(performance)):
+            risk_agent = AcademicRiskAgent.load_or_fit(performance, subjects, model_path)
+        with stage("risk.predict", backend=backend.name) as s:
+            risk_df = risk_agent.predict_features(backend.risk_features(performance, subjects))
+            s.set(rows=len(risk_df))
+        with stage("study_plan.run", planner=planner) as s:
+            study_df = build_study_plan(weak_df, subjects, performance, planner)
+            s.set(rows=len(study_df))
+        return cls(fingerprint, weak_df, risk_df, study_df, planner=planner)
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    @staticmethod
+    def path_for(fingerprint, snapshot_dir=SNAPSHOT_DIR, planner="simple") -> str:
+        return os.path.join(
+            snapshot_dir, f"cohort_v{SNAPSHOT_VERSION}_{planner}_{fingerprint[:16]}.pkl"
+        )
+
+    def save(self, snapshot_dir=SNAPSHOT_DIR) -> str:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        path = self.path_for(self.fingerprint, snapshot_dir, self.planner)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as fh:
+            pickle.dump(
+                {
+                    "version": self.version,
+                    "fingerprint": self.fingerprint,
+                    "built_on": self.built_on,
+                    "planner": self.planner,
+                    "weak": self.weak_df,
+                    "risk": self.risk_df,
+                    "plan": self.study_df,
+                },
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, fingerprint, snapshot_dir=SNAPSHOT_DIR, planner=None):
+        """
+        Returns the stored snapshot for this fingerprint, or None if it
+        is missing, was written by a different snapshot version, or was
+        built on an earlier day (its plan dates would be stale).
+        """
+        planner = resolve_planner(planner)
+        path = cls.path_for(fingerprint, snapshot_dir, planner)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "rb") as fh:
+            payload = pickle.load(fh)
+
+        if payload.get("version") != SNAPSHOT_VERSION or payload.get("fingerprint") != fingerprint:
+            return None
+        if payload.get("built_on") != date.today().isoformat():
+            return None
+
+        return cls(
+            fingerprint, payload["weak"], payload["risk"], payload["plan"],
+            built_on=payload["built_on"], planner=payload["planner"],
+        )
+
+    @classmethod
+    def load_or_build(cls, students, subjects, performance, paths=DATA_FILES,
+                      snapshot_dir=SNAPSHOT_DIR, planner=None, model_path=MODEL_PATH):
+        """
+        planner: "simple" or "scheduler" (default: STUDY_PLANNER). Each
+        planner has its own snapshot on disk. model_path is the risk
+        model used (or trained) when the snapshot has to be built.
+        """
+        planner = resolve_planner(planner)
+        with stage("snapshot.load_or_build", planner=planner) as s:
+            fingerprint = data_fingerprint(paths)
+            snapshot = cls.load(fingerprint, snapshot_dir, planner)
+            s.set(cache_hit=snapshot is not None)
+            if snapshot is None:
+                snapshot = cls.build(students, subjects, performance, fingerprint, planner, model_path)
+                snapshot.save(snapshot_dir)
+        return snapshot
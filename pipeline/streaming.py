@@ -0,0 +1,61 @@
+# pipeline/streaming.py
+import os
+
+import pandas as pd
+
+from agents.weak_subject_agent import WeakSubjectAgent
+from pipeline.data_loader import CATEGORY_COLUMNS, DATA_DIR, clean_table
+from pipeline.feature_store import RiskFeatureStore
+
+CHUNK_ROWS = 500_000
+PERFORMANCE_CSV = os.path.join(DATA_DIR, "performance.csv")
+
+
+def iter_chunks(path: str = PERFORMANCE_CSV, table: str = "performance",
+                chunk_rows: int = CHUNK_ROWS):
+    """
+    Yield a table in chunks of at most chunk_rows rows.
+
+    CSV chunks are cleaned exactly like a full read_csv_table; Parquet
+    files (e.g. the columnar cache) are read one record batch at a time.
+    ID columns come back as plain strings (missing stays NaN) so partial
+    aggregates from different chunks line up.
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunk_rows):
+            chunk = batch.to_pandas()
+            for col in CATEGORY_COLUMNS.get(table, []):
+                if col in chunk.columns:
+                    # Decoded through the categories; astype(str) would turn NaN into "nan"
+                    chunk[col] = chunk[col].astype(object)
+            yield chunk
+        return
+
+    for chunk in pd.read_csv(path, dtype=str, chunksize=chunk_rows):
+        yield clean_table(chunk, table)
+
+
+def stream_weak_and_features(subjects: pd.DataFrame, path: str = PERFORMANCE_CSV,
+                             chunk_rows: int = CHUNK_ROWS):
+    """
+    One pass over the performance data, holding at most one chunk plus
+    the per-(student, subject) and per-student sums.
+
+    Returns (weak_df, risk_features): the same rows as
+    WeakSubjectAgent.run and AcademicRiskAgent.prepare_features on the
+    fully loaded table (averages to the last bit, see RiskFeatureStore).
+    Score the features with AcademicRiskAgent.predict_features.
+    """
+    store = RiskFeatureStore(subjects)
+
+    def chunks():
+        # Each chunk feeds the feature store on its way to the weak agent
+        for chunk in iter_chunks(path, "performance", chunk_rows):
+            store.append(chunk)
+            yield chunk
+
+    weak_df = WeakSubjectAgent().run_chunks(chunks(), subjects).reset_index(drop=True)
+    return weak_df, store.features()
@@ -0,0 +1,213 @@
+# benchmark.py
+"""
+Stage benchmarks for the agent pipeline at several data scales.
+
+    python scripts/benchmark.py                              # 5k, 50k, 500k students
+    python scripts/benchmark.py --sizes 5000 --repeats 5 --output data/bench/new.json \
+        --baseline data/bench/old.json --threshold 0.25
+
+Datasets are generated once per size under data/bench/<size>/ and reused.
+Every stage gets --warmup untimed runs and --repeats timed runs (median
+is reported), then one extra run under tracemalloc for peak memory.
+With --baseline, any stage whose median is more than --threshold slower
+than the baseline fails the run (exit code 1).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.advanced_mentorship_insight_agent import AdvancedMentorshipAgent
+from agents.risk_agent import AcademicRiskAgent
+from agents.study_plan_agent import StudyPlanAgent
+from agents.weak_subject_agent import WeakSubjectAgent
+from generate_data import generate
+from pipeline.compute import BACKENDS, get_backend
+from pipeline.data_loader import ingest, load_data
+
+BENCH_DIR = os.path.join("data", "bench")
+DEFAULT_SIZES = (5000, 50000, 500000)
+
+
+# -------------------------
+# Datasets
+# -------------------------
+def dataset(n_students: int, seed: int = 42) -> str:
+    data_dir = os.path.join(BENCH_DIR, str(n_students))
+    if not os.path.exists(os.path.join(data_dir, "performance.csv")):
+        print(f"Generating {n_students} students -> {data_dir}")
+        generate(n_students=n_students, out=data_dir, seed=seed)
+    return data_dir
+
+
+# -------------------------
+# Measurement
+# -------------------------
+def measure(fn, warmup: int, repeats: int) -> dict:
+    for _ in range(warmup):
+        fn()
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    # Separate run: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "max_s": max(times),
+        "peak_mb": round(peak / 2 ** 20, 2),
+        "repeats": repeats,
+    }
+
+
+def stages(data_dir: str, sample: int):
+    """
+    (name, callable) pairs; inputs for each stage come from the one before.
+    """
+    cache_dir = os.path.join(data_dir, "cache")
+    students, subjects, performance = load_data(data_dir, cache_dir)
+    weak_df = WeakSubjectAgent().run(performance, subjects)
+    risk_agent = AcademicRiskAgent().fit(performance, subjects)
+    risk_df = risk_agent.predict(performance, subjects)
+    plan_df = StudyPlanAgent().run(weak_df)
+
+    weak_named = weak_df.merge(subjects, on="subject_id", how="left")
+    mentor = AdvancedMentorshipAgent()
+    sample_ids = risk_df["student_id"].drop_duplicates().head(sample).tolist()
+    frames = {"risk": risk_df, "weak": weak_named, "plan": plan_df}
+    by_student = {}
+    for name, frame in frames.items():
+        picked = frame[frame["student_id"].isin(sample_ids)]
+        groups = dict(tuple(picked.groupby("student_id", observed=True)))
+        by_student[name] = {sid: groups.get(sid, frame.iloc[:0]) for sid in sample_ids}
+
+    def per_student():
+        for sid in sample_ids:
+            mentor.generate_mentorship(
+                None,
+                by_student["risk"][sid],
+                by_student["weak"][sid],
+                by_student["plan"][sid],
+            )
+
+    compute_stages = []
+    for backend_name in BACKENDS:
+        try:
+            backend = get_backend(backend_name, data_dir=data_dir, cache_dir=cache_dir)
+        except ImportError:
+            continue  # optional engine not installed
+        compute_stages += [
+            (f"compute.{backend_name}.weak_subjects", backend.weak_subjects),
+            (f"compute.{backend_name}.risk_features", backend.risk_features),
+        ]
+
+    return [
+        ("ingest", lambda: ingest(data_dir, cache_dir)),
+        ("load_data", lambda: load_data(data_dir, cache_dir)),
+        ("weak_subject.run", lambda: WeakSubjectAgent().run(performance, subjects)),
+        ("risk.fit", lambda: AcademicRiskAgent().fit(performance, subjects)),
+        ("risk.predict", lambda: risk_agent.predict(performance, subjects)),
+        ("study_plan.run", lambda: StudyPlanAgent().run(weak_df)),
+        (f"mentorship.generate_mentorship x{len(sample_ids)}", per_student),
+        ("mentorship.generate_cohort",
+         lambda: mentor.generate_cohort(risk_df, weak_df, plan_df, subjects=subjects)),
+    ] + compute_stages
+
+
+def run(sizes, warmup, repeats, sample, only=None) -> dict:
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "warmup": warmup,
+        "repeats": repeats,
+        "results": {},
+    }
+    for size in sizes:
+        data_dir = dataset(size)
+        results["results"][str(size)] = size_results = {}
+        for name, fn in stages(data_dir, sample):
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            stats = measure(fn, warmup, repeats)
+            size_results[name] = stats
+            print(f"{size:>8} {name:<42} {stats['median_s']:>9.4f} s  {stats['peak_mb']:>9.1f} MB")
+    return results
+
+
+# -------------------------
+# Regression check
+# -------------------------
+def compare(current: dict, baseline: dict, threshold: float):
+    """
+    Stages whose median time grew by more than threshold (0.2 = 20%).
+    Stages missing from either run are ignored.
+    """
+    regressions = []
+    for size, stages_now in current["results"].items():
+        for name, stats in stages_now.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before or before["median_s"] <= 0:
+                continue
+            change = stats["median_s"] / before["median_s"] - 1
+            if change > threshold:
+                regressions.append((size, name, before["median_s"], stats["median_s"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipeline")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated student counts")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--sample", type=int, default=200,
+                        help="students timed through generate_mentorship")
+    parser.add_argument("--stages", default=None, help="comma-separated stage name prefixes")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = [s.strip() for s in args.stages.split(",")] if args.stages else None
+    results = run(sizes, args.warmup, args.repeats, args.sample, only)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+    print("Results written to", args.output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold)
+        for size, name, before, now, change in regressions:
+            print(f"REGRESSION {size} {name}: {before:.4f} s -> {now:.4f} s (+{change:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# check_import_budget.py
+"""
+Import-time budget for cold starts.
+
+    python scripts/check_import_budget.py                    # all targets, 3 fresh processes each
+    python scripts/check_import_budget.py --targets app --budget-ms 800 --top 15
+
+Each target's startup imports run in fresh interpreters with
+-X importtime. A target fails (exit code 1) when its median import time
+exceeds the budget, or when a module that should load only on first use
+(sklearn, LLM SDKs, ...) is already in sys.modules after startup.
+
+The "app" and "dashboard" targets are read from the top-level project
+imports of ui/app.py and ui/pages/cohort_dashboard.py (Streamlit itself
+is left out), so they track the pages as they change.
+
+The test suite always checks the lazy modules; the millisecond budget
+runs there only with IMPORT_BUDGET=1, as it depends on the machine.
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+APP_PATH = os.path.join(PROJECT_ROOT, "ui", "app.py")
+DASHBOARD_PATH = os.path.join(PROJECT_ROOT, "ui", "pages", "cohort_dashboard.py")
+PROJECT_PACKAGES = ("agents", "pipeline", "services")
+
+# Loaded on first use of their feature, never at startup
+LAZY_MODULES = (
+    "sklearn", "scipy", "joblib", "duckdb", "torch", "transformers",
+    "google", "requests", "httpx", "dotenv",
+)
+DEFAULT_BUDGET_MS = 1500.0
+
+
+def app_imports(path: str = APP_PATH) -> list:
+    """
+    Project modules a Streamlit page (default ui/app.py) imports at module level.
+    """
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module]
+        elif isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        else:
+            continue
+        modules += [n for n in names if n.split(".")[0] in PROJECT_PACKAGES and n not in modules]
+    return modules
+
+
+TARGETS = {
+    "app": app_imports,
+    "dashboard": lambda: app_imports(DASHBOARD_PATH),
+    "api": lambda: ["pipeline.api_server"],
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = (time.perf_counter() - start) * 1000
+lazy = sorted({{m.split(".")[0] for m in sys.modules}} & set({lazy!r}))
+print(json.dumps({{"elapsed_ms": elapsed, "lazy_loaded": lazy}}))
+"""
+
+
+# -------------------------
+# Measurement
+# -------------------------
+def probe(modules: list) -> tuple:
+    """
+    One fresh interpreter: (result dict, -X importtime rows).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         PROBE.format(modules=modules, lazy=list(LAZY_MODULES))],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return json.loads(proc.stdout.strip().splitlines()[-1]), rows
+
+
+def top_imports(rows: list, n: int) -> list:
+    """
+    Slowest project modules and their direct imports, by cumulative time.
+    Rows arrive children-first; interpreter startup rows are skipped.
+    """
+    top, children = [], []
+    for name, _, cumulative in rows:
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if depth == 1:
+            children.append((name, cumulative))
+        elif depth == 0:
+            if name.split(".")[0] in PROJECT_PACKAGES:
+                top += [(name, cumulative)] + children
+            children = []
+    return sorted(top, key=lambda r: r[1], reverse=True)[:n]
+
+
+def check(target: str, budget_ms: float, repeats: int, top: int) -> bool:
+    modules = TARGETS[target]()
+    results, rows = [], []
+    for _ in range(repeats):
+        result, rows = probe(modules)
+        results.append(result)
+
+    median = statistics.median(r["elapsed_ms"] for r in results)
+    lazy = sorted({m for r in results for m in r["lazy_loaded"]})
+    ok = median <= budget_ms and not lazy
+
+    print(f"[{'ok' if ok else 'FAIL'}] {target}: {median:.0f} ms median "
+          f"(budget {budget_ms:.0f} ms, {repeats} runs) - {', '.join(modules)}")
+    if lazy:
+        print(f"    loaded at startup but should be lazy: {', '.join(lazy)}")
+    for name, cumulative in top_imports(rows, top):
+        print(f"    {cumulative / 1000:8.1f} ms  {name}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when startup imports exceed their budget")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"comma-separated: {', '.join(TARGETS)}")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+
+    results = [check(t, args.budget_ms, args.repeats, args.top) for t in targets]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,40 @@
 # generate_data.py
-import pandas as pd
-import random
-from faker import Faker
-from datetime import datetime, timedelta
-import os
-
-# -------------------------
-# Setup
-# -------------------------
-fake = Faker()
+"""
+Synthetic students / subjects / performance tables.
 
-# Create data folder if it doesn't exist
-data_folder = "data"
-if not os.path.exists(data_folder):
-    os.makedirs(data_folder)
+    python scripts/generate_data.py                       # 5k students -> data/
+    python scripts/generate_data.py --students 1000000 --exams-per-subject 10 \
+        --workers 8 --format csv,parquet --out data/large
+    python scripts/generate_data.py --seed 7 --start-date 2026-01-01   # reproducible
 
-# -------------------------
-# 1. Students Table
-# -------------------------
-num_students = 5000
-students = pd.DataFrame({
-    "student_id": [f"S{i:05}" for i in range(1, num_students + 1)],
-    "name": [fake.name() for _ in range(num_students)],  # ✅ Proper names
-    "current_semester": [random.randint(1, 8) for _ in range(num_students)],
-    "branch": [random.choice(["CE", "IT", "ME", "EE", "EXTC"]) for _ in range(num_students)]
-})
-
-# Strip spaces just in case
-students.columns = students.columns.str.strip()
-students["student_id"] = students["student_id"].astype(str).str.strip()
-students["name"] = students["name"].astype(str).str.strip()
+Rows are generated with NumPy in shards of --shard-size students, one
+process per shard. Each shard is written as soon as it is built, so memory
+stays bounded by the shard size. CSV shards are then concatenated into a
+single file; Parquet shards are kept as a dataset directory
+(<out>/parquet/<table>/part-NNNNN.parquet).
+Seeds come from one SeedSequence, so output is identical for any --workers.
+With --seed and --start-date (exam dates follow it; default today) two
+runs write identical files. Names come from built-in pools; --faker
+samples them from Faker instead, which depends on its installed version.
+"""
+import argparse
+import importlib.util
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
 
-# Save students CSV
-students.to_csv(os.path.join(data_folder, "students.csv"), index=False)
+import numpy as np
+import pandas as pd
 
 # -------------------------
-# 2. Subjects Table
+# Setup
 # -------------------------
-subjects = pd.DataFrame({
-    "subject_id": [f"SUB{i:03}" for i in range(1, 11)],
+BRANCHES = np.array(["CE", "IT", "ME", "EE", "EXTC"])
+EXAM_TYPES = np.array(["IA1", "IA2", "EndSem", "Lab"])
+
+BASE_SUBJECTS = pd.DataFrame({
+    "subject_id": [f"SUB{i:03}" for i in range(1, 11)],  # re-padded in make_subjects
     "name": [
         "Applied Maths I", "Physics I", "Chemistry I",
         "Applied Maths II", "Physics II", "Engineering Mechanics",
@@ -50,44 +46,220 @@ subjects = pd.DataFrame({
     "difficulty_factor": [0.8, 0.7, 0.6, 0.8, 0.7, 0.7, 0.6, 0.7, 0.5, 0.5]
 })
 
-# Strip spaces
-subjects.columns = subjects.columns.str.strip()
-subjects["subject_id"] = subjects["subject_id"].astype(str).str.strip()
+# Default name pools (Faker is opt-in)
+FIRST_NAMES = np.array([
+    "Aarav", "Aditi", "Alex", "Ananya", "Arjun", "Chris", "Diya", "Emma", "Ishaan", "Kabir",
+    "Kavya", "Liam", "Maya", "Meera", "Neha", "Noah", "Olivia", "Priya", "Rahul", "Riya",
+    "Rohan", "Sara", "Sneha", "Tanvi", "Vihaan", "Zara"
+])
+LAST_NAMES = np.array([
+    "Brown", "Desai", "Garcia", "Gupta", "Iyer", "Jain", "Johnson", "Joshi", "Khan", "Kumar",
+    "Mehta", "Miller", "Nair", "Patel", "Rao", "Reddy", "Shah", "Sharma", "Singh", "Smith",
+    "Verma", "Williams"
+])
+
+
+def name_pools(seed: int, use_faker: bool = False, size: int = 500):
+    """
+    First/last name pools: the built-in lists, or (use_faker) sampled once
+    from Faker, so names stay realistic without one Faker call per student.
+    """
+    if not use_faker:
+        return FIRST_NAMES, LAST_NAMES
+    from faker import Faker
+    fake = Faker()
+    fake.seed_instance(seed)
+    first = np.unique([fake.first_name() for _ in range(size)])
+    last = np.unique([fake.last_name() for _ in range(size)])
+    return first, last
+
+
+def make_ids(prefix: str, start: int, stop: int, width: int) -> np.ndarray:
+    numbers = np.arange(start, stop).astype(str)
+    return np.char.add(prefix, np.char.zfill(numbers, width))
+
+
+# -------------------------
+# 1. Subjects Table
+# -------------------------
+def make_subjects(n_subjects: int, rng: np.random.Generator) -> pd.DataFrame:
+    # One ID width for every subject, so IDs sort and compare consistently
+    width = max(3, len(str(n_subjects)))
+    base = BASE_SUBJECTS.head(n_subjects).assign(
+        subject_id=make_ids("SUB", 1, min(n_subjects, len(BASE_SUBJECTS)) + 1, width)
+    )
+    if n_subjects <= len(BASE_SUBJECTS):
+        return base
+
+    extra = n_subjects - len(BASE_SUBJECTS)
+    start = len(BASE_SUBJECTS) + 1
+    more = pd.DataFrame({
+        "subject_id": make_ids("SUB", start, start + extra, width),
+        "name": [f"Elective {i}" for i in range(1, extra + 1)],
+        "semester": rng.integers(1, 9, extra),
+        "branch": rng.choice(BRANCHES, extra),
+        "credits": rng.integers(2, 5, extra),
+        "difficulty_factor": rng.choice([0.5, 0.6, 0.7, 0.8], extra),
+    })
+    return pd.concat([base, more], ignore_index=True)
 
-# Save subjects CSV
-subjects.to_csv(os.path.join(data_folder, "subjects.csv"), index=False)
 
 # -------------------------
-# 3. Student Performance Table
+# 2./3. Students + Performance (one shard)
 # -------------------------
-performance_records = []
-
-for student in students.itertuples(index=False):
-    for subject in subjects.itertuples(index=False):
-        performance_records.append({
-            "student_id": student.student_id,
-            "subject_id": subject.subject_id,
-            "exam_type": random.choice(["IA1", "IA2", "EndSem", "Lab"]),
-            "marks_obtained": random.randint(30, 90),
-            "max_marks": 100,
-            "attendance": random.randint(60, 100),
-            "exam_date": (datetime.today() + timedelta(days=random.randint(1, 60))).strftime("%Y-%m-%d")
-        })
-
-performance = pd.DataFrame(performance_records)
-
-# Strip spaces
-performance.columns = performance.columns.str.strip()
-performance["student_id"] = performance["student_id"].astype(str).str.strip()
-performance["subject_id"] = performance["subject_id"].astype(str).str.strip()
-
-# Save performance CSV
-performance.to_csv(os.path.join(data_folder, "performance.csv"), index=False)
+def make_shard(args):
+    """
+    Students [start, stop) and all of their exam rows, written to
+    <parts_dir>/<table>/part-NNNNN.<ext>. Returns the row counts.
+    """
+    (shard, start, stop, seed_seq, subject_ids, exams, id_width,
+     first_names, last_names, today, parts_dir, formats) = args
+    rng = np.random.default_rng(seed_seq)
+    n = stop - start
+
+    students = pd.DataFrame({
+        "student_id": make_ids("S", start + 1, stop + 1, id_width),
+        "name": np.char.add(np.char.add(rng.choice(first_names, n), " "), rng.choice(last_names, n)),
+        "current_semester": rng.integers(1, 9, n),
+        "branch": rng.choice(BRANCHES, n),
+    })
+
+    # Student-major, subject-minor row order (as before), exams innermost
+    per_student = len(subject_ids) * exams
+    rows = n * per_student
+    days = rng.integers(1, 61, rows)
+    performance = pd.DataFrame({
+        "student_id": np.repeat(students["student_id"].to_numpy(), per_student),
+        "subject_id": np.tile(np.repeat(subject_ids, exams), n),
+        "exam_type": rng.choice(EXAM_TYPES, rows),
+        "marks_obtained": rng.integers(30, 91, rows),
+        "max_marks": 100,
+        "attendance": rng.integers(60, 101, rows),
+        "exam_date": np.datetime_as_string(np.datetime64(today, "D") + days, unit="D"),
+    })
+
+    for table, df in (("students", students), ("performance", performance)):
+        if "csv" in formats:
+            df.to_csv(part_path(parts_dir, "csv", table, shard), index=False, header=False)
+        if "parquet" in formats:
+            df.to_parquet(part_path(parts_dir, "parquet", table, shard), index=False)
+
+    return len(students), len(performance)
+
+
+def part_path(root: str, fmt: str, table: str, shard: int) -> str:
+    folder = os.path.join(root, fmt, table)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"part-{shard:05}.{fmt}")
+
+
+def concat_csv(parts_dir: str, table: str, columns, out_path: str):
+    """
+    Stream CSV shards into one file under a single header.
+    """
+    folder = os.path.join(parts_dir, "csv", table)
+    with open(out_path, "w", encoding="utf-8", newline="") as out:
+        out.write(",".join(columns) + "\n")
+        for name in sorted(os.listdir(folder)):
+            with open(os.path.join(folder, name), encoding="utf-8") as part:
+                shutil.copyfileobj(part, out, length=1 << 20)
+
 
 # -------------------------
-# Done
+# Driver
 # -------------------------
-print("CSV files generated successfully in the 'data/' folder!")
-print("Students:", students.shape)
-print("Subjects:", subjects.shape)
-print("Performance records:", performance.shape)
+def generate(n_students=5000, n_subjects=10, exams=1, out="data", shard_size=100_000,
+             workers=None, formats=("csv",), seed=None, start_date=None, use_faker=False):
+    """
+    start_date: first day exam dates are drawn after (default today).
+    """
+    formats = set(formats)
+    if "parquet" in formats and importlib.util.find_spec("pyarrow") is None:
+        raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)")
+    if use_faker and importlib.util.find_spec("faker") is None:
+        raise SystemExit("--faker needs Faker (pip install faker)")
+
+    os.makedirs(out, exist_ok=True)
+    root = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(root.spawn(1)[0])
+
+    subjects = make_subjects(n_subjects, rng)
+    first_names, last_names = name_pools(int(root.generate_state(1)[0]), use_faker)
+
+    bounds = list(range(0, n_students, shard_size)) + [n_students]
+    shard_seeds = root.spawn(len(bounds) - 1)
+    id_width = max(5, len(str(n_students)))
+    parts_dir = os.path.join(out, ".parts")
+    shutil.rmtree(parts_dir, ignore_errors=True)
+
+    tasks = [
+        (i, bounds[i], bounds[i + 1], shard_seeds[i], subjects["subject_id"].to_numpy(), exams,
+         id_width, first_names, last_names, start_date or date.today(), parts_dir, formats)
+        for i in range(len(bounds) - 1)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        counts = [make_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            counts = list(pool.map(make_shard, tasks))
+
+    student_columns = ["student_id", "name", "current_semester", "branch"]
+    performance_columns = ["student_id", "subject_id", "exam_type", "marks_obtained",
+                           "max_marks", "attendance", "exam_date"]
+
+    if "csv" in formats:
+        subjects.to_csv(os.path.join(out, "subjects.csv"), index=False)
+        concat_csv(parts_dir, "students", student_columns, os.path.join(out, "students.csv"))
+        concat_csv(parts_dir, "performance", performance_columns, os.path.join(out, "performance.csv"))
+    if "parquet" in formats:
+        parquet_dir = os.path.join(out, "parquet")
+        shutil.rmtree(parquet_dir, ignore_errors=True)
+        shutil.move(os.path.join(parts_dir, "parquet"), parquet_dir)
+        subjects.to_parquet(os.path.join(parquet_dir, "subjects.parquet"), index=False)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+
+    return {
+        "students": sum(c[0] for c in counts),
+        "subjects": len(subjects),
+        "performance": sum(c[1] for c in counts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic student data")
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--subjects", type=int, default=10)
+    parser.add_argument("--exams-per-subject", type=int, default=1)
+    parser.add_argument("--out", default="data")
+    parser.add_argument("--shard-size", type=int, default=100_000, help="students per shard")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--format", default="csv", help="comma-separated: csv, parquet")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None,
+                        help="exam dates follow this day, YYYY-MM-DD (default: today)")
+    parser.add_argument("--faker", action="store_true", help="sample names from Faker")
+    args = parser.parse_args()
+
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    unknown = set(formats) - {"csv", "parquet"}
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+
+    counts = generate(
+        n_students=args.students, n_subjects=args.subjects, exams=args.exams_per_subject,
+        out=args.out, shard_size=args.shard_size, workers=args.workers,
+        formats=formats, seed=args.seed, start_date=args.start_date, use_faker=args.faker,
+    )
+
+    # -------------------------
+    # Done
+    # -------------------------
+    print(f"Files generated successfully in the '{args.out}/' folder ({', '.join(formats)})!")
+    print("Students:", counts["students"])
+    print("Subjects:", counts["subjects"])
+    print("Performance records:", counts["performance"])
+
+
+if __name__ == "__main__":
+    main()
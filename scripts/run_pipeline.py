@@ -0,0 +1,297 @@
+# run_pipeline.py
+"""
+Headless cohort run: weak subjects, risk, study plans and mentorship for
+every student, without the Streamlit app.
+
+    python scripts/run_pipeline.py                     # all cores, outputs next to the inputs in data/
+    python scripts/run_pipeline.py --workers 8 --shard-size 20000
+    python scripts/run_pipeline.py --fresh             # ignore earlier checkpoints
+    python scripts/run_pipeline.py --planner scheduler # capacity-aware study plans
+    python scripts/run_pipeline.py --backend duckdb    # SQL aggregations (needs duckdb)
+    python scripts/run_pipeline.py --stream            # performance.csv in chunks
+
+The risk model is loaded (or trained once) up front; students are then
+split into shards that run in a process pool. Each finished shard is
+checkpointed under <out>/.checkpoints/<run key>/, so an interrupted run
+resumes where it stopped. The key covers the input data, shard size,
+study planner and day (plan dates are relative to today). Weak subjects
+and risk features are aggregated by the compute backend (--backend or
+COMPUTE_BACKEND).
+
+--stream never loads performance.csv whole: weak subjects and risk
+features come from one chunked pass (pipeline/streaming.py) and are
+scored with the saved risk model, which an earlier run must have
+trained. Without the rows there are no trends or exam deadlines, so
+mentorship skips trends and scheduler plans ignore exam dates.
+
+PROFILE=1 records stage timings (shards, compute backend, agents) from
+every worker process as JSON lines in PROFILE_LOG, by default
+data/bench/stage_timings.jsonl.
+
+Outputs (in --out-dir, data/ by default; git ignores them there):
+
+    study_plan.csv, weak_subjects.csv, risk_scores.csv, mentorship.csv
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from agents.advanced_mentorship_insight_agent import AdvancedMentorshipAgent
+from agents.performance_trend_agent import PerformanceTrendAgent
+from agents.risk_agent import MODEL_PATH, AcademicRiskAgent, compiled_path
+from pipeline.compute import BACKENDS, get_backend
+from pipeline.data_loader import CACHE_DIR, DATA_DIR, TABLES, load_data, read_csv_table
+from pipeline.profiling import ENV_LOG, PROFILER, stage
+from pipeline.snapshot import STUDY_PLANNERS, build_study_plan, data_fingerprint, resolve_planner
+from pipeline.streaming import CHUNK_ROWS, stream_weak_and_features
+
+OUTPUT_DIR = DATA_DIR
+PROFILE_LOG = os.path.join(DATA_DIR, "bench", "stage_timings.jsonl")
+OUTPUTS = {
+    "plan": "study_plan.csv",
+    "weak": "weak_subjects.csv",
+    "risk": "risk_scores.csv",
+    "mentorship": "mentorship.csv",
+}
+DONE_MARKER = "_SUCCESS"
+
+
+# -------------------------
+# Worker side
+# -------------------------
+_subjects = None
+_risk_agent = None
+_planner = None
+_backend = None
+
+
+def _init_worker(subjects, risk_agent, planner, backend, threads=None):
+    # Sent once per process instead of once per shard; the backend (and
+    # its DuckDB connection) is created in the worker from its name
+    global _subjects, _risk_agent, _planner, _backend
+    _subjects, _risk_agent, _planner = subjects, risk_agent, planner
+    _backend = get_backend(backend, threads=threads)
+
+
+def run_shard(shard, student_ids, performance, checkpoint_dir):
+    """
+    All agents for one shard of students; results land in
+    checkpoint_dir/shard-NNNNN/ and a marker file is written last.
+    """
+    start = time.perf_counter()
+    with stage("runner.shard", shard=shard, students=len(student_ids), rows=len(performance)):
+        with stage("compute.weak_subjects", backend=_backend.name):
+            weak_df = _backend.weak_subjects(performance, _subjects)
+        with stage("compute.risk_features", backend=_backend.name):
+            features = _backend.risk_features(performance, _subjects)
+        risk_df = _risk_agent.predict_features(features)
+        plan_df = build_study_plan(weak_df, _subjects, performance, _planner)
+        trends = PerformanceTrendAgent().fit(performance).student_trends
+        mentorship_df = AdvancedMentorshipAgent().generate_cohort(
+            risk_df, weak_df, plan_df, subjects=_subjects, student_ids=student_ids, trends=trends
+        )
+
+    shard_dir = os.path.join(checkpoint_dir, f"shard-{shard:05}")
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    os.makedirs(shard_dir)
+    for name, df in (("weak", weak_df), ("risk", risk_df), ("plan", plan_df),
+                     ("mentorship", mentorship_df)):
+        df.to_parquet(os.path.join(shard_dir, f"{name}.parquet"), index=False)
+    open(os.path.join(shard_dir, DONE_MARKER), "w").close()
+
+    return shard, len(student_ids), time.perf_counter() - start
+
+
+# -------------------------
+# Driver side
+# -------------------------
+def run_key(data_dir: str, shard_size: int, planner: str) -> str:
+    paths = [os.path.join(data_dir, f"{table}.csv") for table in TABLES]
+    return f"{data_fingerprint(paths)[:16]}_{shard_size}_{planner}_{date.today().isoformat()}"
+
+
+def make_shards(students: pd.DataFrame, performance: pd.DataFrame, shard_size: int):
+    """
+    (shard, student_ids, performance rows) per block of shard_size
+    students, in students-table order.
+    """
+    student_ids = pd.Index(np.asarray(students["student_id"]))
+    position = student_ids.get_indexer(np.asarray(performance["student_id"]))
+    performance = performance[position >= 0]
+    shard_of_row = position[position >= 0] // shard_size
+
+    order = np.argsort(shard_of_row, kind="stable")
+    bounds = np.searchsorted(shard_of_row[order], np.arange((len(student_ids) - 1) // shard_size + 2))
+
+    for shard in range(len(bounds) - 1):
+        rows = performance.iloc[order[bounds[shard]:bounds[shard + 1]]]
+        yield shard, student_ids[shard * shard_size:(shard + 1) * shard_size], rows
+
+
+def is_done(checkpoint_dir: str, shard: int) -> bool:
+    return os.path.exists(os.path.join(checkpoint_dir, f"shard-{shard:05}", DONE_MARKER))
+
+
+def merge_outputs(checkpoint_dir: str, n_shards: int, out_dir: str):
+    """
+    Concatenate shard results in shard order into the CSV outputs,
+    one shard in memory at a time.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    for name, filename in OUTPUTS.items():
+        path = os.path.join(out_dir, filename)
+        tmp_path = path + ".tmp"
+        header = True
+        with open(tmp_path, "w", encoding="utf-8", newline="") as fh:
+            for shard in range(n_shards):
+                df = pd.read_parquet(os.path.join(checkpoint_dir, f"shard-{shard:05}", f"{name}.parquet"))
+                if df.empty and not len(df.columns):
+                    continue
+                df.to_csv(fh, index=False, header=header)
+                header = False
+        os.replace(tmp_path, path)
+
+
+def load_saved_model(path: str) -> AcademicRiskAgent:
+    """
+    The saved risk model as is: compiled export first, then the joblib
+    model. Staleness is not checked, as that needs the full table.
+    """
+    for loader, source in ((AcademicRiskAgent.load_compiled, compiled_path(path)),
+                           (AcademicRiskAgent.load, path)):
+        if os.path.exists(source):
+            try:
+                return loader(path)
+            except (ValueError, KeyError):
+                continue
+    raise SystemExit(f"No usable risk model at {path}; run once without --stream to train it")
+
+
+def run_streaming(data_dir: str, out_dir: str, model_path: str, planner: str, chunk_rows: int):
+    """
+    Whole cohort from one chunked pass over performance.csv; only the
+    per-(student, subject) and per-student sums are held in memory.
+    """
+    students = read_csv_table(os.path.join(data_dir, "students.csv"), "students")
+    subjects = read_csv_table(os.path.join(data_dir, "subjects.csv"), "subjects")
+    risk_agent = load_saved_model(model_path)
+
+    with stage("runner.stream", chunk_rows=chunk_rows):
+        weak_df, features = stream_weak_and_features(
+            subjects, os.path.join(data_dir, "performance.csv"), chunk_rows
+        )
+    frames = {
+        "weak": weak_df,
+        "risk": risk_agent.predict_features(features),
+        "plan": build_study_plan(weak_df, subjects, None, planner),
+    }
+    frames["mentorship"] = AdvancedMentorshipAgent().generate_cohort(
+        frames["risk"], weak_df, frames["plan"], subjects=subjects, student_ids=students["student_id"]
+    )
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, filename in OUTPUTS.items():
+        path = os.path.join(out_dir, filename)
+        frames[name].to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+
+
+def progress(done: int, total: int, students: int, started: float):
+    elapsed = time.perf_counter() - started
+    eta = elapsed / done * (total - done) if done else 0
+    print(f"[{done}/{total} shards] {students} students, {elapsed:.1f}s elapsed, ~{eta:.0f}s left",
+          file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the agent pipeline for the whole cohort")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--out-dir", default=OUTPUT_DIR)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--shard-size", type=int, default=5000, help="students per shard")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--planner", choices=STUDY_PLANNERS, default=None,
+                        help="study planner (default: STUDY_PLANNER or simple)")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=None,
+                        help="compute backend (default: COMPUTE_BACKEND or pandas)")
+    parser.add_argument("--fresh", action="store_true", help="discard checkpoints of this run")
+    parser.add_argument("--keep-checkpoints", action="store_true")
+    parser.add_argument("--stream", action="store_true",
+                        help="read performance.csv in chunks instead of loading it whole")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per chunk with --stream")
+    args = parser.parse_args()
+    planner = resolve_planner(args.planner)
+    if PROFILER.enabled and not PROFILER.log_path:
+        # Pool workers record in their own processes; the log collects every stage
+        PROFILER.log_path = os.environ[ENV_LOG] = PROFILE_LOG
+
+    if args.stream:
+        started = time.perf_counter()
+        run_streaming(args.data_dir, args.out_dir, args.model_path, planner, args.chunk_rows)
+        print(f"Cohort outputs written to '{args.out_dir}/' in {time.perf_counter() - started:.1f}s "
+              "(streamed): " + ", ".join(OUTPUTS.values()))
+        if PROFILER.enabled:
+            print(f"Stage timings appended to '{PROFILER.log_path}'")
+        return
+    # Resolved (and checked for its optional package) before any work starts
+    backend = get_backend(args.backend).name
+
+    started = time.perf_counter()
+    students, subjects, performance = load_data(args.data_dir, args.cache_dir)
+    risk_agent = AcademicRiskAgent.load_or_fit(performance, subjects, args.model_path)
+
+    checkpoint_dir = os.path.join(args.out_dir, ".checkpoints", run_key(args.data_dir, args.shard_size, planner))
+    if args.fresh:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    shards = list(make_shards(students, performance, args.shard_size))
+    pending = [s for s in shards if not is_done(checkpoint_dir, s[0])]
+    total, done, processed = len(shards), len(shards) - len(pending), 0
+    print(f"{len(students)} students in {total} shards; {done} already checkpointed",
+          file=sys.stderr, flush=True)
+
+    workers = args.workers or os.cpu_count() or 1
+    if pending and (workers == 1 or len(pending) == 1):
+        _init_worker(subjects, risk_agent, planner, backend)
+        for shard, ids, rows in pending:
+            _, count, _ = run_shard(shard, ids, rows, checkpoint_dir)
+            done, processed = done + 1, processed + count
+            progress(done, total, processed, started)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_worker,
+                                 # One DuckDB thread per worker process
+                                 initargs=(subjects, risk_agent, planner, backend, 1)) as pool:
+            futures = [pool.submit(run_shard, shard, ids, rows, checkpoint_dir)
+                       for shard, ids, rows in pending]
+            for future in as_completed(futures):
+                _, count, _ = future.result()
+                done, processed = done + 1, processed + count
+                progress(done, total, processed, started)
+
+    merge_outputs(checkpoint_dir, total, args.out_dir)
+    if not args.keep_checkpoints:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        if not os.listdir(os.path.dirname(checkpoint_dir)):
+            os.rmdir(os.path.dirname(checkpoint_dir))
+
+    print(f"Cohort outputs written to '{args.out_dir}/' in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(OUTPUTS.values()))
+    if PROFILER.enabled:
+        print(f"Stage timings appended to '{PROFILER.log_path}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# serve_api.py
+"""
+JSON API over the cohort analytics, with data and the risk model resident.
+
+    python scripts/serve_api.py --port 8000
+    curl localhost:8000/students/S00001/risk
+    curl -X POST localhost:8000/students/batch -d '{"student_ids": ["S00001", "S00002"]}'
+
+See pipeline/api_server.py for the routes. PROFILE=1 with
+PROFILE_LOG=<path> records startup, agent and per-request stage timings.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from agents.risk_agent import MODEL_PATH
+from pipeline.api_server import StudentAnalyticsService, serve
+from pipeline.data_loader import CACHE_DIR, DATA_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve per-student analytics over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    service = StudentAnalyticsService.from_data(args.data_dir, args.cache_dir,
+                                                model_path=args.model_path)
+    print(f"Loaded {len(service.student_ids)} students in {time.perf_counter() - started:.1f}s; "
+          f"listening on http://{args.host}:{args.port}")
+
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
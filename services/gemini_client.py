@@ -1,10 +1,26 @@
 import os
-from dotenv import load_dotenv
 
-# Load .env once (safe even if already loaded)
-load_dotenv()
 
-API_KEY = os.getenv("GEMINI_API_KEY")
+def get_api_key() -> str:
+    """
+    Resolve GEMINI_API_KEY on first use: environment, after loading .env.
+    Raises RuntimeError if it is not set.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        # Load .env once (safe even if already loaded)
+        from dotenv import load_dotenv
 
-if not API_KEY:
-    raise RuntimeError("❌ GEMINI_API_KEY not found. Check your .env file")
+        load_dotenv()
+        api_key = os.getenv("GEMINI_API_KEY")
+
+    if not api_key:
+        raise RuntimeError("❌ GEMINI_API_KEY not found. Check your .env file")
+    return api_key
+
+
+def __getattr__(name):
+    # API_KEY stays importable, but is only looked up when accessed
+    if name == "API_KEY":
+        return get_api_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
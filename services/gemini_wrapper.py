@@ -1,5 +1,6 @@
 # services/gemini_wrapper.py
-from google import genai
+from pipeline.profiling import profiled
+from services.llm_cache import get_default_cache
 
 class GeminiMentor:
     """
@@ -7,9 +8,14 @@ class GeminiMentor:
     Generates concise, actionable academic mentorship using service account auth.
     """
 
-    def __init__(self):
+    name = "gemini"
+
+    def __init__(self, cache=None):
         self.model = "gemini-1.5-flash"
+        # Shared disk cache by default; cache=False disables it
+        self.cache = get_default_cache() if cache is None else cache
 
+    @profiled("llm.gemini.enhance")
     def enhance(self, structured_insight: str) -> str:
         """
         Enhance local mentorship insights using Gemini.
@@ -24,17 +30,41 @@ Be concise, professional, and actionable.
 Insight:
 {structured_insight}
 """
+        params = {"temperature": 0.3, "max_output_tokens": 300}
         try:
-            response = genai.chat.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_output_tokens=300
-            )
-            return response.choices[0].message.content.strip()
+            if self.cache:
+                return self.cache.get_or_generate(
+                    "gemini", self.model, prompt,
+                    lambda: self._generate(prompt, params), params=params
+                )
+            return self._generate(prompt, params)
 
         except Exception:
             return (
                 f"Gemini mentor unavailable (API or quota issue).\n\n"
                 f"Using local insights instead.\n\n{structured_insight}"
             )
+
+    def generate(self, prompt: str) -> str:
+        """
+        Raw generation for the backend chain; errors propagate so the
+        chain can fall through to the next backend.
+        """
+        params = {"temperature": 0.3, "max_output_tokens": 300}
+        if self.cache:
+            return self.cache.get_or_generate(
+                "gemini", self.model, prompt,
+                lambda: self._generate(prompt, params), params=params
+            )
+        return self._generate(prompt, params)
+
+    def _generate(self, prompt: str, params: dict) -> str:
+        # SDK is imported on the first uncached request
+        from google import genai
+
+        response = genai.chat.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            **params
+        )
+        return response.choices[0].message.content.strip()
@@ -1,30 +1,43 @@
 # services/hf_wrapper.py
 import os
-import streamlit as st
 import requests
 from typing import Optional
 
+from pipeline.profiling import profiled
+from services.llm_cache import get_default_cache
+
 # -------------------------
-# Hugging Face API Key
+# API Config
 # -------------------------
-# Try to get HF_API_KEY from environment variables
-HF_API_KEY: Optional[str] = os.getenv("HF_API_KEY")
-
-# If not found, try accessing via Streamlit secrets
-if not HF_API_KEY:
-    HF_API_KEY = st.secrets.get("HF_API_KEY", None)
+API_URL = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct"
 
-# If still not set, raise an error
-if not HF_API_KEY:
-    raise ValueError(
-        "HF_API_KEY not set. Please configure it in .env locally or Streamlit Secrets."
-    )
 
 # -------------------------
-# API Config
+# Hugging Face API Key
 # -------------------------
-API_URL = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct"
-HEADERS = {"Authorization": f"Bearer {HF_API_KEY}"}
+def resolve_api_key() -> str:
+    """
+    Resolve HF_API_KEY on first use: environment first, then Streamlit
+    secrets. Raises ValueError if neither has it.
+    """
+    # Try to get HF_API_KEY from environment variables
+    api_key: Optional[str] = os.getenv("HF_API_KEY")
+
+    # If not found, try accessing via Streamlit secrets
+    if not api_key:
+        try:
+            import streamlit as st
+            api_key = st.secrets.get("HF_API_KEY", None)
+        except Exception:
+            api_key = None
+
+    # If still not set, raise an error
+    if not api_key:
+        raise ValueError(
+            "HF_API_KEY not set. Please configure it in .env locally or Streamlit Secrets."
+        )
+    return api_key
+
 
 # -------------------------
 # HF Generator Class
@@ -32,11 +45,19 @@ HEADERS = {"Authorization": f"Bearer {HF_API_KEY}"}
 class HFGenerator:
     """Wrapper for Hugging Face Inference API (Generative Layer)."""
 
-    def __init__(self):
+    name = "hf"
+
+    def __init__(self, cache=None, timeout=60):
         self.api_url = API_URL
-        self.headers = HEADERS
+        self.headers = {"Authorization": f"Bearer {resolve_api_key()}"}
+        self.timeout = timeout
+        # Keep-alive connection pool reused across prompts
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Shared disk cache by default; cache=False disables it
+        self.cache = get_default_cache() if cache is None else cache
 
-    @st.cache_data(show_spinner=False)
+    @profiled("llm.hf.enhance")
     def enhance(self, prompt: str, max_tokens: int = 300, temperature: float = 0.3) -> str:
         """
         Generate text from Hugging Face Mistral-7B-Instruct model.
@@ -49,6 +70,15 @@ class HFGenerator:
         Returns:
             str: Generated text.
         """
+        if self.cache:
+            return self.cache.get_or_generate(
+                "hf", self.api_url, prompt,
+                lambda: self._generate(prompt, max_tokens, temperature),
+                params={"max_tokens": max_tokens, "temperature": temperature},
+            )
+        return self._generate(prompt, max_tokens, temperature)
+
+    def _generate(self, prompt: str, max_tokens: int, temperature: float) -> str:
         payload = {
             "inputs": prompt,
             "parameters": {
@@ -58,7 +88,7 @@ class HFGenerator:
         }
 
         try:
-            response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=60)
+            response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
         except requests.RequestException as e:
             raise RuntimeError(f"Failed to reach Hugging Face API: {e}")
 
@@ -74,3 +104,6 @@ class HFGenerator:
             return output[0]["generated_text"].strip()
 
         return str(output)  # fallback
+
+    def generate(self, prompt: str) -> str:
+        return self.enhance(prompt)
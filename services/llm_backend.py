@@ -0,0 +1,175 @@
+# services/llm_backend.py
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Protocol, runtime_checkable
+
+DEFAULT_CHAIN = "ollama,hf,deterministic"
+
+
+@runtime_checkable
+class LLMBackend(Protocol):
+    """
+    Common interface for text generators in services/.
+    Backends may also provide stream(prompt) -> Iterator[str].
+    """
+
+    name: str
+
+    def generate(self, prompt: str) -> str:
+        ...
+
+
+# -------------------------
+# Backend registry (lazy)
+# -------------------------
+def _ollama(config: dict):
+    from services.ollama_wrapper import OllamaGenerator
+    return OllamaGenerator(
+        model=config.get("ollama_model", "deepseek-r1:8b"),
+        base_url=config.get("ollama_url", "http://localhost:11434"),
+        timeout=(config.get("connect_timeout", 3.05), config.get("read_timeout", 120)),
+    )
+
+
+def _hf(config: dict):
+    from services.hf_wrapper import HFGenerator
+    return HFGenerator(
+        timeout=(config.get("connect_timeout", 3.05), config.get("read_timeout", 120))
+    )
+
+
+def _gemini(config: dict):
+    from services.gemini_wrapper import GeminiMentor
+    return GeminiMentor()
+
+
+BACKEND_FACTORIES: Dict[str, Callable[[dict], LLMBackend]] = {
+    "ollama": _ollama,
+    "hf": _hf,
+    "gemini": _gemini,
+}
+
+
+def config_from_env() -> dict:
+    """
+    LLM_BACKENDS: comma-separated chain, e.g. "ollama,hf,deterministic"
+    LLM_CONNECT_TIMEOUT / LLM_READ_TIMEOUT: seconds per request
+    LLM_COOLDOWN: seconds a failed backend is skipped before being retried
+    OLLAMA_URL / OLLAMA_MODEL: local Ollama server settings
+    """
+    return {
+        "backends": [b.strip() for b in os.getenv("LLM_BACKENDS", DEFAULT_CHAIN).split(",") if b.strip()],
+        "connect_timeout": float(os.getenv("LLM_CONNECT_TIMEOUT", "3.05")),
+        "read_timeout": float(os.getenv("LLM_READ_TIMEOUT", "120")),
+        "cooldown": float(os.getenv("LLM_COOLDOWN", "60")),
+        "ollama_url": os.getenv("OLLAMA_URL", "http://localhost:11434"),
+        "ollama_model": os.getenv("OLLAMA_MODEL", "deepseek-r1:8b"),
+    }
+
+
+# -------------------------
+# Fallback chain
+# -------------------------
+class BackendUnavailable(RuntimeError):
+    pass
+
+
+class FallbackChain:
+    """
+    Tries each configured backend in order and returns the first success.
+
+    Backends are only constructed when first needed, so a missing API key
+    costs nothing until that provider is actually reached. A backend that
+    fails to build or to answer is skipped for `cooldown` seconds, so one
+    dead provider does not stall every request. "deterministic" ends the
+    chain by returning the caller's fallback text (e.g. the
+    AdvancedMentorshipAgent insights).
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = config or config_from_env()
+        self.order: List[str] = list(self.config.get("backends", DEFAULT_CHAIN.split(",")))
+        self.cooldown = self.config.get("cooldown", 60)
+        self._backends: Dict[str, LLMBackend] = {}
+        self._down_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.last_backend: Optional[str] = None
+
+        unknown = [n for n in self.order if n != "deterministic" and n not in BACKEND_FACTORIES]
+        if unknown:
+            raise ValueError(f"Unknown LLM backend(s): {', '.join(unknown)}")
+
+    def _backend(self, name: str) -> LLMBackend:
+        with self._lock:
+            if self._down_until.get(name, 0) > time.monotonic():
+                raise BackendUnavailable(f"{name} is cooling down after a failure")
+            if name not in self._backends:
+                self._backends[name] = BACKEND_FACTORIES[name](self.config)
+            return self._backends[name]
+
+    def _mark_down(self, name: str):
+        with self._lock:
+            self._down_until[name] = time.monotonic() + self.cooldown
+
+    def generate(self, prompt: str, fallback: Optional[str] = None) -> str:
+        errors = []
+        for name in self.order:
+            if name == "deterministic":
+                if fallback is not None:
+                    self.last_backend = name
+                    return fallback
+                continue
+            try:
+                text = self._backend(name).generate(prompt)
+            except Exception as e:  # any provider failure falls through
+                if not isinstance(e, BackendUnavailable):
+                    self._mark_down(name)
+                errors.append(f"{name}: {e}")
+                continue
+            self.last_backend = name
+            return text
+
+        raise RuntimeError("All LLM backends failed: " + "; ".join(errors))
+
+    def stream(self, prompt: str, fallback: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream from the first backend that produces output. A backend that
+        fails before its first token falls through; backends without
+        stream() yield their whole answer at once.
+        """
+        errors = []
+        for name in self.order:
+            if name == "deterministic":
+                if fallback is not None:
+                    self.last_backend = name
+                    yield fallback
+                    return
+                continue
+
+            started = False
+            try:
+                backend = self._backend(name)
+                if hasattr(backend, "stream"):
+                    for token in backend.stream(prompt):
+                        started = True
+                        self.last_backend = name
+                        yield token
+                else:
+                    text = backend.generate(prompt)
+                    started = True
+                    self.last_backend = name
+                    yield text
+                return
+            except Exception as e:
+                if not isinstance(e, BackendUnavailable):
+                    self._mark_down(name)
+                if started:
+                    raise
+                errors.append(f"{name}: {e}")
+
+        raise RuntimeError("All LLM backends failed: " + "; ".join(errors))
+
+
+def build_chain(config: Optional[dict] = None) -> FallbackChain:
+    return FallbackChain(config)
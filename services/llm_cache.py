@@ -0,0 +1,172 @@
+# services/llm_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+CACHE_PATH = os.path.join("data", "llm_cache.sqlite")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Whitespace-insensitive form of a prompt: unified newlines, no trailing
+    spaces, no leading/trailing blank lines.
+    """
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def cache_key(backend: str, model: str, prompt: str, params: Optional[dict] = None) -> str:
+    payload = json.dumps(
+        {
+            "backend": backend,
+            "model": model,
+            "prompt": normalize_prompt(prompt),
+            "params": params or {},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Disk-backed (SQLite) response cache shared by every generator backend.
+
+    Entries are keyed by a hash of the normalized prompt, model and
+    generation parameters. Expired entries (ttl_seconds) count as misses;
+    beyond max_entries the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = 10000,
+                 ttl_seconds: Optional[float] = 30 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    backend TEXT,
+                    model TEXT,
+                    response TEXT,
+                    created REAL,
+                    accessed REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    # -------------------------
+    # Lookup / store
+    # -------------------------
+    def get(self, backend: str, model: str, prompt: str, params: Optional[dict] = None) -> Optional[str]:
+        key = cache_key(backend, model, prompt, params)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, backend: str, model: str, prompt: str, response: str,
+            params: Optional[dict] = None):
+        key = cache_key(backend, model, prompt, params)
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, backend, model, response, now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        if self.ttl_seconds is not None:
+            conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed ASC LIMIT ?
+                )
+                """,
+                (count - self.max_entries,),
+            )
+
+    def get_or_generate(self, backend: str, model: str, prompt: str, generate,
+                        params: Optional[dict] = None) -> str:
+        cached = self.get(backend, model, prompt, params)
+        if cached is not None:
+            return cached
+
+        response = generate()
+        self.put(backend, model, prompt, response, params)
+        return response
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+    def stats(self) -> dict:
+        with self._lock, self._connect() as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+
+_default_cache: Optional[LLMCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> LLMCache:
+    """
+    Process-wide cache instance shared by all generators.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
@@ -1,18 +1,43 @@
+import asyncio
+import json
+import os
+import random
+
 import requests
 
+from pipeline.profiling import profiled
+from services.llm_cache import get_default_cache
+
 class OllamaGenerator:
-    def __init__(self, model="deepseek-r1:8b"):
+    name = "ollama"
+
+    def __init__(self, model="deepseek-r1:8b", base_url="http://localhost:11434", cache=None,
+                 timeout=300):
         self.model = model
-        self.url = "http://localhost:11434/api/generate"
+        self.url = f"{base_url.rstrip('/')}/api/generate"
+        # Seconds, or a (connect, read) tuple so a dead server fails fast
+        self.timeout = timeout
+        # Keep-alive connection pool reused across prompts
+        self.session = requests.Session()
+        # Shared disk cache by default; cache=False disables it
+        self.cache = get_default_cache() if cache is None else cache
 
+    @profiled("llm.ollama.enhance")
     def enhance(self, prompt: str) -> str:
+        if self.cache:
+            return self.cache.get_or_generate(
+                "ollama", self.model, prompt, lambda: self._generate(prompt)
+            )
+        return self._generate(prompt)
+
+    def _generate(self, prompt: str) -> str:
         payload = {
             "model": self.model,
             "prompt": prompt,
             "stream": False
         }
 
-        response = requests.post(self.url, json=payload, timeout=300)
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
 
         if response.status_code != 200:
             raise RuntimeError(response.text)
@@ -21,3 +46,179 @@ class OllamaGenerator:
 
         # 🔑 THIS IS THE IMPORTANT LINE
         return data.get("response", "").strip()
+
+    # -------------------------
+    # Streaming
+    # -------------------------
+    def generate(self, prompt: str) -> str:
+        return self.enhance(prompt)
+
+    def stream(self, prompt: str, cancel=None, timeout=None):
+        """
+        Yield response tokens as the server emits NDJSON chunks.
+
+        cancel: optional threading.Event; when set the request is dropped
+        and the generator stops. Closing the generator early (e.g. a
+        Streamlit rerun) also closes the connection.
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True
+        }
+
+        if self.cache:
+            cached = self.cache.get("ollama", self.model, prompt)
+            if cached is not None:
+                yield cached
+                return
+
+        response = self.session.post(
+            self.url, json=payload, stream=True, timeout=timeout or self.timeout
+        )
+        parts = []
+        try:
+            if response.status_code != 200:
+                raise RuntimeError(response.text)
+
+            # chunk_size=None hands lines over as soon as they arrive
+            for line in response.iter_lines(chunk_size=None):
+                if cancel is not None and cancel.is_set():
+                    return
+                if not line:
+                    continue
+
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    parts.append(chunk["response"])
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    # Only complete generations are cached
+                    if self.cache:
+                        self.cache.put("ollama", self.model, prompt, "".join(parts).strip())
+                    return
+        finally:
+            response.close()
+
+    # -------------------------
+    # Async batch generation
+    # -------------------------
+    @staticmethod
+    def _completed(out_path: str) -> dict:
+        """
+        Results already written by an earlier (possibly interrupted) run.
+        """
+        done = {}
+        if out_path and os.path.exists(out_path):
+            with open(out_path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from an interrupted write
+                    done[record["key"]] = record["response"]
+        return done
+
+    async def _generate_one(self, client, key, prompt, retries, backoff, timeout):
+        import httpx
+
+        payload = {"model": self.model, "prompt": prompt, "stream": False}
+        for attempt in range(retries + 1):
+            try:
+                response = await client.post(self.url, json=payload, timeout=timeout)
+                if response.status_code == 200:
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        data = None
+                    if not isinstance(data, dict):
+                        # A malformed body will not improve on retry
+                        raise RuntimeError(f"{key}: invalid JSON response: {response.text[:200]}")
+                    return data.get("response", "").strip()
+                # Client errors other than rate limiting will not succeed on retry
+                if response.status_code < 500 and response.status_code != 429:
+                    raise RuntimeError(f"{key}: {response.status_code} {response.text}")
+                error = RuntimeError(f"{key}: {response.status_code} {response.text}")
+            except httpx.HTTPError as e:
+                # Transport, timeout and body decoding errors; kept per prompt
+                error = e
+
+            if attempt < retries:
+                await asyncio.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+
+        raise RuntimeError(f"{key}: failed after {retries + 1} attempts: {error}")
+
+    async def enhance_batch_async(self, prompts, out_path=None, concurrency=4,
+                                  retries=3, backoff=1.0, timeout=300):
+        """
+        Generate many prompts with bounded concurrency over one pooled client.
+
+        prompts: {key: prompt} (or a list, keyed by position).
+        out_path: JSONL file; each result is appended as soon as it finishes
+        and keys already present are skipped, so an interrupted batch resumes.
+
+        Returns (results, errors) as {key: text} and {key: message}.
+        """
+        import httpx
+
+        if not isinstance(prompts, dict):
+            prompts = {str(i): p for i, p in enumerate(prompts)}
+
+        results = self._completed(out_path)
+        pending = [(k, p) for k, p in prompts.items() if k not in results]
+        errors = {}
+
+        if self.cache:
+            uncached = []
+            for key, prompt in pending:
+                cached = self.cache.get("ollama", self.model, prompt)
+                if cached is None:
+                    uncached.append((key, prompt))
+                else:
+                    results[key] = cached
+            cached_keys = [k for k, _ in pending if k in results]
+            pending = uncached
+        else:
+            cached_keys = []
+
+        if out_path:
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        out_file = open(out_path, "a", encoding="utf-8") if out_path else None
+        if out_file:
+            for key in cached_keys:
+                out_file.write(json.dumps({"key": key, "response": results[key]}) + "\n")
+            out_file.flush()
+
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async def worker(client, key, prompt):
+            async with semaphore:
+                try:
+                    text = await self._generate_one(client, key, prompt, retries, backoff, timeout)
+                except RuntimeError as e:
+                    errors[key] = str(e)
+                    return
+            results[key] = text
+            if self.cache:
+                self.cache.put("ollama", self.model, prompt, text)
+            if out_file:
+                out_file.write(json.dumps({"key": key, "response": text}) + "\n")
+                out_file.flush()
+
+        try:
+            async with httpx.AsyncClient(limits=limits) as client:
+                await asyncio.gather(*(worker(client, k, p) for k, p in pending))
+        finally:
+            if out_file:
+                out_file.close()
+
+        return results, errors
+
+    def enhance_batch(self, prompts, out_path=None, **kwargs):
+        """
+        Blocking wrapper around enhance_batch_async.
+        """
+        return asyncio.run(self.enhance_batch_async(prompts, out_path, **kwargs))
@@ -0,0 +1,131 @@
+# services/prompt_builder.py
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+
+import pandas as pd
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap tokenizer-free estimate: words plus punctuation marks.
+    Tracks BPE token counts closely enough for budgeting.
+    """
+    return len(_TOKEN_RE.findall(text))
+
+
+@dataclass
+class CompiledContext:
+    text: str
+    tokens: int
+    dropped: int = 0  # lines left out to stay within the budget
+
+
+# -------------------------
+# Analytics -> compact text
+# -------------------------
+def _subject_names(subjects: Optional[pd.DataFrame]) -> dict:
+    if subjects is None or "name" not in subjects.columns:
+        return {}
+    return dict(zip(subjects["subject_id"].astype(str), subjects["name"].astype(str)))
+
+
+def _risk_line(student_risk: pd.DataFrame) -> str:
+    if student_risk is None or student_risk.empty:
+        return "Risk: unknown"
+    row = student_risk.iloc[0]
+    return f"Risk: {row['risk_level']} (avg marks {float(row['risk_score']):.1f})"
+
+
+def _weak_lines(student_weak: pd.DataFrame, names: dict) -> List[str]:
+    if student_weak is None or student_weak.empty:
+        return ["Weak subjects: none"]
+    weak = student_weak.assign(
+        subject=student_weak["subject_id"].astype(str).map(lambda s: names.get(s, s)),
+        avg=pd.to_numeric(student_weak["avg_score"], errors="coerce").fillna(0),
+    ).sort_values(["avg", "subject"])
+    return ["Weak subjects (avg %, worst first):"] + [
+        f"- {r.subject} {r.avg:.0f}" for r in weak.itertuples()
+    ]
+
+
+def _plan_lines(student_plan: pd.DataFrame, names: dict, today: date) -> List[str]:
+    if student_plan is None or student_plan.empty:
+        return []
+    plan = student_plan.assign(
+        subject=student_plan["subject_id"].astype(str).map(lambda s: names.get(s, s)),
+        day=(pd.to_datetime(student_plan["scheduled_date"]) - pd.Timestamp(today)).dt.days,
+    ).sort_values(["day", "subject"])
+    # Relative days keep the prompt (and its cache key) stable across dates
+    return ["Study plan:"] + [f"- Day {r.day}: {r.subject}" for r in plan.itertuples()]
+
+
+def compile_student_context(student_weak: pd.DataFrame, student_plan: pd.DataFrame,
+                            student_risk: pd.DataFrame, subjects: Optional[pd.DataFrame] = None,
+                            budget: int = 300, today: Optional[date] = None) -> CompiledContext:
+    """
+    Render one student's agent outputs as short, deterministic lines.
+    Plan lines are dropped first, then the mildest weak subjects, until
+    the text, including the "(+N lines omitted)" note, fits `budget`
+    estimated tokens.
+    """
+    names = _subject_names(subjects)
+    head = [_risk_line(student_risk)]
+    weak = _weak_lines(student_weak, names)
+    plan = _plan_lines(student_plan, names, today or date.today())
+
+    dropped = 0
+    while True:
+        # The omission note counts against the budget too
+        text = "\n".join(head + weak + plan)
+        if dropped:
+            text += f"\n(+{dropped} lines omitted)"
+        if estimate_tokens(text) <= budget:
+            break
+        if plan:
+            plan.pop()
+            # The header goes with the last entry; it is not counted as a line
+            if len(plan) == 1:
+                plan = []
+        elif len(weak) > 2:
+            weak.pop()
+        else:
+            break
+        dropped += 1
+
+    return CompiledContext(text=text, tokens=estimate_tokens(text), dropped=dropped)
+
+
+# -------------------------
+# Prompt templates
+# -------------------------
+ROADMAP_TEMPLATE = """You are an expert academic mentor.
+Create a concise, actionable roadmap for this student.
+
+{context}
+
+Output:
+1. Step-by-step actions
+2. Weekly goals
+3. Motivation tips
+4. Focus areas for weak subjects
+Under 300 words."""
+
+MENTOR_TEMPLATE = """You are an expert academic mentor.
+Rewrite the advice below as clear, actionable bullet points, motivational
+but concise, maximum 400 words.
+
+{context}"""
+
+
+def roadmap_prompt(context: CompiledContext) -> str:
+    return ROADMAP_TEMPLATE.format(context=context.text)
+
+
+def mentor_prompt(insights: str) -> str:
+    # The mentor rewrites the deterministic insights, which already carry
+    # the student's analytics; adding the compiled context would repeat them
+    return MENTOR_TEMPLATE.format(context=insights.strip())
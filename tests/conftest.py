@@ -0,0 +1,34 @@
+# tests/conftest.py
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# Tests import the app packages (agents, pipeline, services) from the repo root
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def load_script(name: str):
+    """
+    A module from scripts/ (not a package), loaded from its file.
+    """
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, "scripts", f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def generated_dir(tmp_path_factory):
+    """
+    A small seeded cohort from scripts/generate_data.py: students.csv,
+    subjects.csv and performance.csv (120 students, 10 subjects, 3 exams each).
+    """
+    out = tmp_path_factory.mktemp("data")
+    load_script("generate_data").generate(
+        n_students=120, n_subjects=10, exams=3, out=str(out), workers=1, seed=7
+    )
+    return str(out)
@@ -0,0 +1,186 @@
+# tests/test_api_server.py
+import asyncio
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from pipeline.api_server import FIELDS, HTTPError, StudentAnalyticsService, handle_connection, route
+
+
+class FakeService:
+    """
+    StudentAnalyticsService stand-in: S1 and S2 have canned fields;
+    looking up "S-BROKEN" raises, as a bug in a lookup would.
+    """
+
+    student_ids = pd.Index(["S1", "S2", "S-BROKEN"])
+
+    def has_student(self, student_id):
+        return student_id in self.student_ids
+
+    def field(self, student_id, field):
+        if student_id == "S-BROKEN":
+            raise KeyError(field)
+        return f"{field} of {student_id}"
+
+    def student(self, student_id, fields=FIELDS):
+        return {"student_id": student_id, **{f: self.field(student_id, f) for f in fields}}
+
+
+def _batch(body):
+    return route(FakeService(), "POST", "/students/batch", json.dumps(body).encode())
+
+
+# -------------------------
+# Routes
+# -------------------------
+def test_student_routes():
+    service = FakeService()
+    assert route(service, "GET", "/health", b"") == (200, {"status": "ok", "students": 3})
+    assert route(service, "GET", "/students/S1", b"")[1]["trend"] == "trend of S1"
+    assert route(service, "GET", "/students/S2/risk?x=1", b"") == (
+        200, {"student_id": "S2", "risk": "risk of S2"}
+    )
+
+    for method, path, status in [("GET", "/students/S9", 404), ("GET", "/students/S1/grades", 404),
+                                 ("POST", "/students/S1", 405), ("GET", "/students/batch", 405),
+                                 ("GET", "/nowhere", 404)]:
+        with pytest.raises(HTTPError) as err:
+            route(service, method, path, b"")
+        assert err.value.status == status
+
+
+def test_batch_returns_results_and_unknown_ids():
+    status, payload = _batch({"student_ids": ["S2", "S9"], "fields": ["risk"]})
+    assert status == 200
+    assert payload == {"results": [{"student_id": "S2", "risk": "risk of S2"}], "not_found": ["S9"]}
+    # No fields (or an empty list) means all of them
+    assert set(_batch({"student_ids": ["S1"]})[1]["results"][0]) == {"student_id", *FIELDS}
+    assert set(_batch({"student_ids": ["S1"], "fields": []})[1]["results"][0]) == {"student_id", *FIELDS}
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2], None, "S1", {},
+    {"student_ids": []},
+    {"student_ids": "S1"},
+    {"student_ids": [1, 2]},
+    {"student_ids": ["S1"], "fields": "risk"},
+    {"student_ids": ["S1"], "fields": [None]},
+    {"student_ids": ["S1"], "fields": ["grades"]},
+    {"student_ids": ["S1"] * 1001},
+])
+def test_batch_rejects_malformed_bodies(body):
+    with pytest.raises(HTTPError) as err:
+        _batch(body)
+    assert err.value.status == 400
+
+
+def test_batch_rejects_non_json():
+    with pytest.raises(HTTPError) as err:
+        route(FakeService(), "POST", "/students/batch", b"{not json")
+    assert err.value.status == 400
+
+
+def test_real_service_on_a_generated_cohort(generated_dir, tmp_path):
+    pytest.importorskip("sklearn")
+    # Cache, snapshot and model all under tmp_path, never in the repo's data/ or models/
+    service = StudentAnalyticsService.from_data(
+        generated_dir, str(tmp_path / "cache"), snapshot_dir=str(tmp_path / "snapshots"),
+        model_path=str(tmp_path / "risk.joblib"),
+    )
+    student_id = pd.read_csv(os.path.join(generated_dir, "students.csv"))["student_id"].iloc[0]
+
+    status, payload = route(service, "GET", f"/students/{student_id}", b"")
+    assert status == 200
+    assert set(payload) == {"student_id", *FIELDS}
+    assert payload["risk"]["risk_level"] in ("High", "Medium", "Low")
+    assert payload["weak"] and all(row["student_id"] == student_id for row in payload["weak"])
+    assert payload["mentorship"].startswith("Academic Risk Level:")
+    # JSON-ready all the way down
+    json.dumps(payload)
+
+    with pytest.raises(HTTPError) as err:
+        route(service, "GET", "/students/S99999", b"")
+    assert err.value.status == 404
+
+    status, payload = route(service, "POST", "/students/batch",
+                            json.dumps({"student_ids": [student_id, "S99999"], "fields": ["risk"]}).encode())
+    assert [r["student_id"] for r in payload["results"]] == [student_id]
+    assert payload["not_found"] == ["S99999"]
+
+
+# -------------------------
+# Connection handling
+# -------------------------
+def _exchange(*requests):
+    """
+    Sends raw requests over one connection; returns (status, payload)
+    for each response until the server closes it.
+    """
+    async def run():
+        server = await asyncio.start_server(
+            lambda r, w: handle_connection(FakeService(), r, w), "127.0.0.1", 0
+        )
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(b"".join(requests))
+            await writer.drain()
+
+            responses = []
+            while True:
+                status_line = await reader.readline()
+                if not status_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers["content-length"]))
+                responses.append((int(status_line.split()[1]), json.loads(body)))
+            writer.close()
+            return responses
+
+    return asyncio.run(asyncio.wait_for(run(), timeout=10))
+
+
+def _post(body: bytes, length=None, connection="keep-alive") -> bytes:
+    length = len(body) if length is None else length
+    return (f"POST /students/batch HTTP/1.1\r\nContent-Length: {length}\r\n"
+            f"Connection: {connection}\r\n\r\n").encode() + body
+
+
+def test_keep_alive_serves_several_requests():
+    responses = _exchange(
+        b"GET /health HTTP/1.1\r\n\r\n",
+        _post(b"[1, 2]"),
+        _post(b'{"student_ids": ["S1"], "fields": ["risk"]}', connection="close"),
+    )
+    assert [status for status, _ in responses] == [200, 400, 200]
+    assert responses[1][1] == {"error": "body must be a JSON object"}
+    assert responses[2][1]["results"] == [{"student_id": "S1", "risk": "risk of S1"}]
+
+
+def test_bad_content_length_is_answered():
+    assert _exchange(_post(b"{}", length="ten")) == [(400, {"error": "invalid Content-Length"})]
+    assert _exchange(_post(b"{}", length=-5)) == [(400, {"error": "invalid Content-Length"})]
+
+
+def test_errors_in_a_lookup_return_500_and_keep_the_connection(capsys):
+    responses = _exchange(
+        b"GET /students/S-BROKEN HTTP/1.1\r\n\r\n",
+        b"GET /students/S1/risk HTTP/1.1\r\nConnection: close\r\n\r\n",
+    )
+    assert responses == [(500, {"error": "internal server error"}),
+                         (200, {"student_id": "S1", "risk": "risk of S1"})]
+    assert "KeyError" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("encoding, status", [("chunked", 411), ("gzip, chunked", 411), ("gzip", 501)])
+def test_transfer_encoded_bodies_are_refused(encoding, status):
+    request = (f"POST /students/batch HTTP/1.1\r\nTransfer-Encoding: {encoding}\r\n\r\n"
+               "7\r\n{\"a\": 1}\r\n0\r\n\r\n").encode()
+    responses = _exchange(request, b"GET /health HTTP/1.1\r\n\r\n")
+    # Answered once, then closed: the unread body cannot be taken for a next request
+    assert [s for s, _ in responses] == [status]
@@ -0,0 +1,102 @@
+# tests/test_cohort_cube.py
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.weak_subject_agent import WeakSubjectAgent
+from pipeline.cohort_cube import CohortCube
+from pipeline.data_loader import read_csv_table
+from pipeline.snapshot import data_fingerprint
+
+TABLES = ("students", "subjects", "performance")
+
+
+def _tables(data_dir):
+    return [read_csv_table(os.path.join(data_dir, f"{table}.csv"), table) for table in TABLES]
+
+
+@pytest.fixture(scope="module")
+def cohort(generated_dir):
+    students, subjects, performance = _tables(generated_dir)
+    weak = WeakSubjectAgent().run(performance, subjects)
+    # Fixed levels stand in for the model; every 5th student has none
+    risk = pd.DataFrame({
+        "student_id": students["student_id"],
+        "risk_level": np.resize(["High", "Medium", "Low"], len(students)),
+        "risk_score": np.arange(len(students)) % 50 + 30.0,
+    }).iloc[np.arange(len(students)) % 5 != 0]
+    cube = CohortCube.build(students, subjects, performance, weak, risk, "test")
+    return students, performance, weak, risk, cube
+
+
+def _expected(students, performance, weak, risk, branch, semester, subject=None):
+    """
+    The cell computed straight from the rows, without the cube.
+    """
+    members = students[(students["branch"] == branch)
+                       & (students["current_semester"].astype(str) == semester)]
+    pairs = performance[performance["student_id"].isin(members["student_id"])].assign(
+        score=lambda df: df["marks_obtained"].astype(float) / df["max_marks"].astype(float)
+    ).groupby(["student_id", "subject_id"], observed=True)["score"].mean().mul(100).round(2).reset_index()
+    if subject is not None:
+        pairs = pairs[pairs["subject_id"] == subject]
+        members = members[members["student_id"].isin(pairs["student_id"])]
+    scored = risk[risk["student_id"].isin(members["student_id"])]
+    weak_keys = set(zip(weak["student_id"], weak["subject_id"]))
+    return {
+        "students": len(scored),
+        "high": int((scored["risk_level"] == "High").sum()),
+        "mean_risk_score": scored["risk_score"].mean(),
+        "enrolled": len(pairs),
+        "weak": sum(key in weak_keys for key in zip(pairs["student_id"], pairs["subject_id"])),
+        "mean_score": pairs["score"].mean(),
+    }
+
+
+def test_cells_match_a_direct_computation(cohort):
+    students, performance, weak, risk, cube = cohort
+    combos = students[["branch", "current_semester"]].astype(str).drop_duplicates().head(4)
+    assert len(combos) == 4
+
+    for branch, semester in combos.itertuples(index=False):
+        for subject in (None, "SUB003"):
+            cell = cube.cell(branch=branch, semester=semester, subject=subject)
+            expected = _expected(students, performance, weak, risk, branch, semester, subject)
+            got = {key: cell[key] for key in expected}
+            assert got == pytest.approx(expected, rel=1e-9), (branch, semester, subject)
+
+
+def test_all_rollup_counts_every_scored_student_once(cohort):
+    students, performance, weak, risk, cube = cohort
+    cell = cube.cell()
+    assert cell["students"] == len(risk)
+    assert cell["enrolled"] == performance[["student_id", "subject_id"]].drop_duplicates().shape[0]
+    assert cell["weak"] == len(weak)
+
+
+def test_cube_is_rebuilt_when_the_data_changes(generated_dir, tmp_path):
+    pytest.importorskip("sklearn")
+    data_dir = tmp_path / "data"
+    shutil.copytree(generated_dir, data_dir)
+    paths = [str(data_dir / f"{table}.csv") for table in TABLES]
+    kwargs = dict(paths=paths, snapshot_dir=str(tmp_path / "snapshots"),
+                  model_path=str(tmp_path / "risk.joblib"))
+
+    first = CohortCube.load_or_build(*_tables(data_dir), **kwargs)
+    assert first.fingerprint == data_fingerprint(paths)
+    assert os.path.exists(CohortCube.path_for(first.fingerprint, kwargs["snapshot_dir"]))
+    # Unchanged data: the stored cube is loaded, not rebuilt
+    again = CohortCube.load_or_build(*_tables(data_dir), **kwargs)
+    pd.testing.assert_frame_equal(again.cells, first.cells)
+
+    # One more exam row changes the fingerprint and the affected cells
+    performance = pd.read_csv(paths[2], dtype=str)
+    extra = performance.iloc[[0]].assign(marks_obtained="5")
+    pd.concat([performance, extra]).to_csv(paths[2], index=False)
+
+    rebuilt = CohortCube.load_or_build(*_tables(data_dir), **kwargs)
+    assert rebuilt.fingerprint == data_fingerprint(paths) != first.fingerprint
+    assert rebuilt.cell()["score_sum"] != first.cell()["score_sum"]
@@ -0,0 +1,51 @@
+# tests/test_compiled_forest.py
+import numpy as np
+import pytest
+
+sklearn = pytest.importorskip("sklearn")
+from sklearn.ensemble import RandomForestClassifier
+
+import agents.compiled_forest as compiled_forest
+from agents.compiled_forest import CompiledForest
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (600, 5))
+    y = np.digitize(X[:, 0] + rng.normal(0, 15, len(X)), [40, 70])
+    return RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+
+
+@pytest.fixture
+def rows():
+    return np.random.default_rng(1).uniform(0, 100, (1000, 5))
+
+
+def _sklearn_version():
+    return tuple(int(p) for p in sklearn.__version__.split(".")[:2])
+
+
+@pytest.mark.parametrize("block_rows", [1, 64, 1024, 4096])
+def test_matches_sklearn_across_row_blocks(forest, rows, block_rows, monkeypatch):
+    monkeypatch.setattr(compiled_forest, "BLOCK_ROWS", block_rows)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    assert np.array_equal(compiled.predict_proba(rows), forest.predict_proba(rows))
+    assert np.array_equal(compiled.predict(rows), forest.predict(rows))
+    # Global node ids are each tree's own ids shifted by its root
+    assert np.array_equal(compiled.leaves(rows), forest.apply(rows).T + compiled.roots[:, np.newaxis])
+
+
+# prepare_features fills NaN, so this only guards direct use of the forest
+@pytest.mark.skipif(_sklearn_version() < (1, 4), reason="sklearn < 1.4 rejects NaN input")
+def test_missing_values_follow_the_learned_direction(forest, rows):
+    rows[::17, 2] = np.nan
+    compiled = CompiledForest.from_sklearn(forest)
+    assert np.array_equal(compiled.predict_proba(rows), forest.predict_proba(rows))
+
+
+def test_no_rows(forest):
+    compiled = CompiledForest.from_sklearn(forest)
+    assert compiled.predict_proba(np.empty((0, 5))).shape == (0, len(forest.classes_))
+    assert compiled.predict(np.empty((0, 5))).shape == (0,)
@@ -0,0 +1,64 @@
+# tests/test_compute.py
+
+import pandas as pd
+import pytest
+
+from pipeline.compute import DuckDBBackend, PandasBackend, get_backend
+from pipeline.data_loader import load_data
+from pipeline.id_codes import encode_frames
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(scope="module")
+def backends(generated_dir, tmp_path_factory):
+    cache_dir = str(tmp_path_factory.mktemp("cache"))
+    return (PandasBackend(generated_dir, cache_dir),
+            DuckDBBackend(generated_dir, cache_dir, threads=2))
+
+
+def test_duckdb_matches_pandas_on_the_columnar_cache(backends):
+    pandas_backend, duckdb_backend = backends
+    assert duckdb_backend.weak_subjects().equals(pandas_backend.weak_subjects())
+    assert duckdb_backend.weak_subjects(with_subjects=True).equals(
+        pandas_backend.weak_subjects(with_subjects=True)
+    )
+    assert duckdb_backend.risk_features().equals(pandas_backend.risk_features())
+
+
+def test_duckdb_matches_pandas_on_passed_frames(backends):
+    pandas_backend, duckdb_backend = backends
+    _, subjects, performance = load_data(pandas_backend.data_dir, pandas_backend.cache_dir)
+    # A shard, as the batch runner passes them
+    shard = performance[performance["student_id"].isin(performance["student_id"].unique()[:40])]
+
+    for frame in (performance, shard):
+        weak = duckdb_backend.weak_subjects(frame, subjects)
+        assert weak.equals(pandas_backend.weak_subjects(frame, subjects))
+        assert weak["student_id"].dtype == frame["student_id"].dtype
+        assert duckdb_backend.risk_features(frame, subjects).equals(
+            pandas_backend.risk_features(frame, subjects)
+        )
+
+
+def test_duckdb_matches_pandas_on_coded_ids(backends):
+    pandas_backend, duckdb_backend = backends
+    _, _, subjects, performance = encode_frames(*load_data(pandas_backend.data_dir, pandas_backend.cache_dir))
+
+    assert duckdb_backend.weak_subjects(performance, subjects).equals(
+        pandas_backend.weak_subjects(performance, subjects)
+    )
+    # The coded pandas path sums with np.bincount: same values up to the last bit
+    pd.testing.assert_frame_equal(
+        duckdb_backend.risk_features(performance, subjects),
+        pandas_backend.risk_features(performance, subjects),
+        check_exact=False, rtol=1e-12,
+    )
+
+
+def test_get_backend(monkeypatch, generated_dir):
+    monkeypatch.setenv("COMPUTE_BACKEND", "duckdb")
+    assert get_backend(data_dir=generated_dir).name == "duckdb"
+    assert get_backend("pandas").name == "pandas"
+    with pytest.raises(ValueError):
+        get_backend("spark")
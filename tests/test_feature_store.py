@@ -0,0 +1,46 @@
+# tests/test_feature_store.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from agents.risk_agent import AcademicRiskAgent
+from pipeline.data_loader import read_csv_table
+from pipeline.feature_store import RiskFeatureStore
+
+
+@pytest.fixture(scope="module")
+def tables(generated_dir):
+    return (read_csv_table(os.path.join(generated_dir, "subjects.csv"), "subjects"),
+            read_csv_table(os.path.join(generated_dir, "performance.csv"), "performance"))
+
+
+def _one_shot(performance, subjects):
+    features = AcademicRiskAgent().prepare_features(performance.copy(), subjects.copy())
+    return features.sort_values("student_id").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("n_chunks", [1, 3, 17])
+def test_chunked_appends_match_prepare_features(tables, n_chunks):
+    subjects, performance = tables
+    # Shuffled so a student's rows are spread across chunks
+    shuffled = performance.sample(frac=1, random_state=0)
+
+    store = RiskFeatureStore(subjects)
+    for chunk in np.array_split(np.arange(len(shuffled)), n_chunks):
+        store.append(shuffled.iloc[chunk])
+
+    assert_frame_equal(store.features(), _one_shot(performance, subjects), check_exact=False, rtol=1e-12)
+
+
+def test_append_returns_the_touched_students(tables):
+    subjects, performance = tables
+    store = RiskFeatureStore(subjects)
+    first = performance[performance["student_id"].isin(["S00001", "S00002"])]
+
+    assert sorted(store.append(first)) == ["S00001", "S00002"]
+    assert len(store.append(performance.iloc[:0])) == 0
+    assert_frame_equal(store.features(["S00002"]), _one_shot(first, subjects).iloc[[1]].reset_index(drop=True),
+                       check_exact=False, rtol=1e-12)
@@ -0,0 +1,43 @@
+# tests/test_generate_data.py
+import os
+import subprocess
+import sys
+from datetime import date
+
+import numpy as np
+
+from conftest import PROJECT_ROOT, load_script
+
+generate_data = load_script("generate_data")
+FILES = ("students.csv", "subjects.csv", "performance.csv")
+
+
+def _files(out):
+    return {name: (out / name).read_bytes() for name in FILES}
+
+
+def _run(out):
+    generate_data.generate(n_students=250, n_subjects=14, exams=2, out=str(out), shard_size=60,
+                           workers=1, seed=11, start_date=date(2026, 1, 1))
+    return _files(out)
+
+
+def test_same_seed_and_start_date_write_identical_files(tmp_path):
+    first = _run(tmp_path / "a")
+    assert _run(tmp_path / "b") == first
+
+    # Same through the CLI with a process pool: shards are seeded on their own
+    subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, "scripts", "generate_data.py"),
+         "--students", "250", "--subjects", "14", "--exams-per-subject", "2", "--shard-size", "60",
+         "--workers", "3", "--seed", "11", "--start-date", "2026-01-01", "--out", str(tmp_path / "c")],
+        check=True, capture_output=True,
+    )
+    assert _files(tmp_path / "c") == first
+
+
+def test_subject_ids_share_one_width():
+    ids = generate_data.make_subjects(1200, np.random.default_rng(0))["subject_id"]
+    assert ids.str.len().nunique() == 1
+    assert ids.iloc[[0, 9, 10]].tolist() == ["SUB0001", "SUB0010", "SUB0011"]
+    assert generate_data.make_subjects(12, np.random.default_rng(0))["subject_id"].iloc[0] == "SUB001"
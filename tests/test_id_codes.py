@@ -0,0 +1,21 @@
+# tests/test_id_codes.py
+import numpy as np
+import pandas as pd
+
+from pipeline.id_codes import IdDictionary
+
+
+def test_codes_round_trip_and_unknown_ids_decode_to_nan():
+    ids = IdDictionary(["S1", "S2", "S3"], ["SUB001", "SUB002"])
+    codes = ids.encode_students(["S3", "S9", "S1"])
+    assert codes.tolist() == [2, -1, 0]
+
+    # -1 must not wrap around to the last ID
+    assert pd.isna(ids.decode_students(codes)).tolist() == [False, True, False]
+    assert ids.decode_students(codes)[[0, 2]].tolist() == ["S3", "S1"]
+    assert pd.isna(ids.decode_subjects(np.array([-1], dtype=np.int32))).all()
+
+    frame = ids.encode(pd.DataFrame({"student_id": ["S2", "S9"], "subject_id": ["SUB002", "SUB404"]}))
+    decoded = ids.decode(frame)
+    assert decoded["student_id"].tolist()[0] == "S2" and pd.isna(decoded["student_id"].iloc[1])
+    assert decoded["subject_id"].tolist()[0] == "SUB002" and pd.isna(decoded["subject_id"].iloc[1])
@@ -0,0 +1,29 @@
+# tests/test_import_budget.py
+import os
+
+import pytest
+
+from conftest import load_script
+
+check_import_budget = load_script("check_import_budget")
+TARGETS = sorted(check_import_budget.TARGETS)
+
+
+def test_targets_read_the_page_imports():
+    app = check_import_budget.TARGETS["app"]()
+    assert app and all(m.split(".")[0] in check_import_budget.PROJECT_PACKAGES for m in app)
+    assert "pipeline.cohort_cube" in check_import_budget.TARGETS["dashboard"]()
+
+
+@pytest.mark.parametrize("target", TARGETS)
+def test_startup_leaves_heavy_modules_unloaded(target):
+    # Deterministic half of the gate: sklearn, duckdb, LLM SDKs, ... load on first use
+    result, _ = check_import_budget.probe(check_import_budget.TARGETS[target]())
+    assert result["lazy_loaded"] == []
+
+
+@pytest.mark.skipif(os.getenv("IMPORT_BUDGET") != "1", reason="wall-clock budget; set IMPORT_BUDGET=1")
+@pytest.mark.parametrize("target", TARGETS)
+def test_startup_imports_within_budget(target):
+    # Same gate as scripts/check_import_budget.py: median time and no lazy module at startup
+    assert check_import_budget.check(target, check_import_budget.DEFAULT_BUDGET_MS, repeats=3, top=0)
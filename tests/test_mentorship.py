@@ -0,0 +1,66 @@
+# tests/test_mentorship.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.advanced_mentorship_insight_agent import AdvancedMentorshipAgent
+from agents.performance_trend_agent import PerformanceTrendAgent
+from agents.risk_agent import AcademicRiskAgent
+from agents.study_plan_agent import StudyPlanAgent
+from agents.weak_subject_agent import WeakSubjectAgent
+from pipeline.data_loader import read_csv_table
+
+
+@pytest.fixture(scope="module")
+def cohort(generated_dir):
+    students, subjects, performance = (
+        read_csv_table(os.path.join(generated_dir, f"{table}.csv"), table)
+        for table in ("students", "subjects", "performance")
+    )
+    weak = WeakSubjectAgent().run(performance, subjects)
+    # Every 11th student has no weak subjects (and so no plan)
+    weak = weak[~weak["student_id"].isin(students["student_id"].iloc[::11])]
+    plan = StudyPlanAgent().run(weak)
+    # Fixed levels stand in for the model; every 7th student has none
+    features = AcademicRiskAgent().prepare_features(performance.copy(), subjects.copy())
+    risk = pd.DataFrame({"student_id": features["student_id"],
+                         "risk_level": np.resize(["High", "Medium", "Low"], len(features)),
+                         "risk_score": features["avg_marks"]})
+    risk = risk[np.arange(len(risk)) % 7 != 0]
+    # One student with no marks at all
+    ids = pd.concat([students["student_id"], pd.Series(["S-NEW"])], ignore_index=True)
+    return ids, subjects, performance, weak, plan, risk
+
+
+def _per_student(agent, sid, subjects, weak, plan, risk, trend):
+    student_weak = weak[weak["student_id"] == sid]
+    if not student_weak.empty:
+        student_weak = student_weak.merge(subjects, on="subject_id", how="left")
+    return agent.generate_mentorship(
+        student_info=None,
+        student_risk=risk[risk["student_id"] == sid],
+        student_weak=student_weak,
+        student_plan=plan[plan["student_id"] == sid],
+        student_trend=trend(sid),
+    )
+
+
+@pytest.mark.parametrize("with_trends", [False, True])
+def test_cohort_text_matches_per_student(cohort, with_trends):
+    ids, subjects, performance, weak, plan, risk = cohort
+    agent = AdvancedMentorshipAgent()
+    trends = PerformanceTrendAgent().fit(performance) if with_trends else None
+
+    result = agent.generate_cohort(risk, weak, plan, subjects=subjects, student_ids=ids,
+                                   trends=trends.student_trends if with_trends else None)
+
+    assert result["student_id"].tolist() == ids.tolist()
+    expected = [
+        _per_student(agent, sid, subjects, weak, plan, risk,
+                     trends.student_trend if with_trends else (lambda _: None))
+        for sid in ids
+    ]
+    mismatches = [sid for sid, got, want in zip(ids, result["insights"], expected) if got != want]
+    assert not mismatches, f"{len(mismatches)} students differ, e.g. {mismatches[:3]}"
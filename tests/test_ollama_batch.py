@@ -0,0 +1,105 @@
+# tests/test_ollama_batch.py
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from services.ollama_wrapper import OllamaGenerator
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    """
+    /api/generate stand-in. The prompt picks the behaviour:
+    "flaky ..." fails with 503 on its first attempt, "down ..." always
+    fails with 500, "garbled ..." answers 200 with a non-JSON body,
+    "list ..." with a JSON list and "gzip ..." with a body that claims
+    gzip encoding but is not; anything else is echoed upper-cased.
+    """
+
+    attempts = Counter()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["prompt"]
+        self.attempts[prompt] += 1
+
+        if prompt.startswith("down") or (prompt.startswith("flaky") and self.attempts[prompt] == 1):
+            self._reply(503 if prompt.startswith("flaky") else 500, b"overloaded")
+        elif prompt.startswith("garbled"):
+            self._reply(200, b"<html>not json</html>")
+        elif prompt.startswith("list"):
+            self._reply(200, b"[1, 2]")
+        elif prompt.startswith("gzip"):
+            self._reply(200, b"not gzip", {"Content-Encoding": "gzip"})
+        else:
+            self._reply(200, json.dumps({"response": f" {prompt.upper()} ", "done": True}).encode())
+
+    def _reply(self, status, payload, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama():
+    FakeOllama.attempts = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield OllamaGenerator(base_url=f"http://127.0.0.1:{server.server_port}", cache=False)
+    server.shutdown()
+    server.server_close()
+
+
+def test_batch_generates_and_retries(ollama):
+    results, errors = ollama.enhance_batch(
+        {"a": "hello", "b": "flaky one"}, concurrency=2, retries=2, backoff=0
+    )
+    assert results == {"a": "HELLO", "b": "FLAKY ONE"}
+    assert errors == {}
+    assert FakeOllama.attempts["flaky one"] == 2
+
+
+def test_failures_are_per_prompt(ollama):
+    results, errors = ollama.enhance_batch(
+        {"ok": "fine", "down": "down now", "garbled": "garbled reply", "list": "list reply"},
+        retries=1, backoff=0,
+    )
+    assert results == {"ok": "FINE"}
+    assert set(errors) == {"down", "garbled", "list"}
+    assert "invalid JSON" in errors["garbled"]
+    assert FakeOllama.attempts["down now"] == 2
+    # A malformed 200 body is not retried
+    assert FakeOllama.attempts["garbled reply"] == 1
+
+
+def test_decoding_errors_stay_with_their_prompt(ollama):
+    results, errors = ollama.enhance_batch(
+        {"ok": "fine", "gzip": "gzip reply"}, concurrency=2, retries=1, backoff=0
+    )
+    assert results == {"ok": "FINE"}
+    assert set(errors) == {"gzip"}
+    assert "failed after 2 attempts" in errors["gzip"]
+
+
+def test_batch_resumes_from_output_file(ollama, tmp_path):
+    out_path = str(tmp_path / "batch.jsonl")
+    ollama.enhance_batch(["first", "down"], out_path=out_path, retries=0, backoff=0)
+
+    results, errors = ollama.enhance_batch(["first", "second"], out_path=out_path, backoff=0)
+    assert results == {"0": "FIRST", "1": "SECOND"}
+    assert errors == {}
+    # "first" came from the file, not from a second request
+    assert FakeOllama.attempts["first"] == 1
+    with open(out_path, encoding="utf-8") as fh:
+        assert [json.loads(line)["key"] for line in fh] == ["0", "1"]
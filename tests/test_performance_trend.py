@@ -0,0 +1,52 @@
+# tests/test_performance_trend.py
+import os
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from agents.performance_trend_agent import PerformanceTrendAgent
+from pipeline.data_loader import read_csv_table
+
+
+@pytest.fixture(scope="module")
+def performance(generated_dir):
+    return read_csv_table(os.path.join(generated_dir, "performance.csv"), "performance")
+
+
+def _split(performance):
+    dates = pd.to_datetime(performance["exam_date"])
+    cutoff = dates.quantile(0.6)
+    return performance[dates < cutoff], performance[dates >= cutoff]
+
+
+def test_update_equals_fit_on_all_rows(performance):
+    old, new = _split(performance)
+    updated = PerformanceTrendAgent().fit(old)
+    updated.update(new)
+    full = PerformanceTrendAgent().fit(pd.concat([old, new]))
+
+    # Same state up to summation order in the sums
+    assert_frame_equal(updated.subject_state, full.subject_state, check_exact=False, rtol=1e-9)
+    assert_frame_equal(updated.student_trends, full.student_trends, check_exact=False, rtol=1e-9)
+
+
+def test_update_in_several_batches(performance):
+    dates = pd.to_datetime(performance["exam_date"]).sort_values()
+    agent = PerformanceTrendAgent().fit(performance.iloc[:0])
+    for _, batch in performance.groupby(pd.cut(dates.reindex(performance.index), 4), observed=True):
+        agent.update(batch)
+
+    full = PerformanceTrendAgent().fit(performance)
+    assert_frame_equal(agent.subject_state, full.subject_state, check_exact=False, rtol=1e-9)
+
+
+def test_update_rejects_exams_older_than_seen_ones(performance):
+    old, new = _split(performance)
+    agent = PerformanceTrendAgent().fit(new)
+    before = agent.subject_state.copy()
+
+    with pytest.raises(ValueError, match="older"):
+        agent.update(old)
+    # Nothing was folded in
+    assert_frame_equal(agent.subject_state, before)
@@ -0,0 +1,79 @@
+# tests/test_profiling.py
+import threading
+
+import pandas as pd
+
+import pipeline.profiling as profiling
+from agents.study_plan_agent import StudyPlanAgent
+from pipeline.profiling import Profiler
+
+
+def _session(profiler, enabled, name, out):
+    # One Streamlit script run: pick the switch, record a stage, read back
+    profiler.new_run(enabled=enabled)
+    with profiler.stage(name) as s:
+        s.set(rows=1)
+    out[name] = (profiler.is_enabled(), [r["stage"] for r in profiler.run_records()])
+
+
+def test_sessions_switch_profiling_independently():
+    profiler = Profiler(enabled=False)
+    out, barrier = {}, threading.Barrier(2)
+
+    def run(enabled, name):
+        barrier.wait()
+        _session(profiler, enabled, name, out)
+
+    threads = [threading.Thread(target=run, args=(True, "on")),
+               threading.Thread(target=run, args=(False, "off"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert out["on"] == (True, ["on"])
+    assert out["off"] == (False, [])
+    assert not profiler.enabled  # the process default is untouched
+    assert [r["stage"] for r in profiler.records] == ["on"]
+
+
+def test_runs_only_see_their_own_records():
+    profiler = Profiler(enabled=True)
+    out = {}
+    for name in ("first", "second"):
+        t = threading.Thread(target=_session, args=(profiler, None, name, out))
+        t.start()
+        t.join()
+
+    assert out["first"] == (True, ["first"])
+    assert out["second"] == (True, ["second"])
+    assert len(profiler.records) == 2
+
+
+def test_disabled_stage_is_shared_noop():
+    profiler = Profiler(enabled=False)
+    assert profiler.stage("a") is profiler.stage("b")
+    with profiler.stage("a") as s:
+        s.set(rows=3)
+    assert not profiler.records
+
+
+def test_profiled_records_one_stage_per_call(monkeypatch):
+    profiler = Profiler(enabled=True)
+    monkeypatch.setattr(profiling, "PROFILER", profiler)
+
+    @profiling.profiled("demo.double")
+    def double(x):
+        return 2 * x
+
+    assert double(2) == 4 and double.__name__ == "double"
+    assert [r["stage"] for r in profiler.records] == ["demo.double"]
+
+
+def test_agents_are_profiled_from_any_caller(monkeypatch):
+    profiler = Profiler(enabled=True)
+    monkeypatch.setattr(profiling, "PROFILER", profiler)
+    weak = pd.DataFrame({"student_id": ["S1"], "subject_id": ["A"], "avg_score": [30.0]})
+
+    StudyPlanAgent().run(weak)
+    assert [r["stage"] for r in profiler.records] == ["agent.study_plan.run"]
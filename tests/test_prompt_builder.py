@@ -0,0 +1,51 @@
+# tests/test_prompt_builder.py
+from datetime import date
+
+import pandas as pd
+
+from services.prompt_builder import compile_student_context, estimate_tokens
+
+
+def _student(n_subjects=30):
+    ids = [f"SUB{i:03}" for i in range(n_subjects)]
+    weak = pd.DataFrame({"student_id": "S1", "subject_id": ids, "avg_score": range(n_subjects)})
+    plan = pd.DataFrame({
+        "student_id": "S1",
+        "subject_id": ids,
+        "scheduled_date": pd.date_range("2026-01-02", periods=n_subjects).astype(str),
+    })
+    risk = pd.DataFrame({"student_id": ["S1"], "risk_level": ["High"], "risk_score": [40.0]})
+    return weak, plan, risk
+
+
+def test_context_fits_budget_including_omission_note():
+    weak, plan, risk = _student()
+    # Smallest possible context: risk line plus the worst weak subject
+    floor = estimate_tokens("\n".join(compile_student_context(
+        weak, plan, risk, budget=0, today=date(2026, 1, 1)).text.splitlines()))
+
+    for budget in range(floor, 400):
+        context = compile_student_context(weak, plan, risk, budget=budget, today=date(2026, 1, 1))
+        assert context.tokens <= budget
+        assert context.tokens == estimate_tokens(context.text)
+        if context.dropped:
+            assert context.text.endswith(f"(+{context.dropped} lines omitted)")
+
+
+def test_small_student_is_not_truncated():
+    weak, plan, risk = _student(n_subjects=2)
+    context = compile_student_context(weak, plan, risk, today=date(2026, 1, 1))
+    assert context.dropped == 0
+    assert "omitted" not in context.text
+    assert "- Day 1: SUB000" in context.text
+
+
+def test_dropped_counts_omitted_entries_only():
+    weak, plan, risk = _student(n_subjects=4)
+    full = compile_student_context(weak, plan, risk, budget=10_000, today=date(2026, 1, 1))
+    # Risk line plus the worst weak subject: every plan entry and 3 weak entries go
+    context = compile_student_context(weak, plan, risk, budget=0, today=date(2026, 1, 1))
+    assert "Study plan:" not in context.text
+    assert context.dropped == 4 + 3
+    # The plan header goes and the omission note comes, so the two cancel out
+    assert len(full.text.splitlines()) - len(context.text.splitlines()) == context.dropped
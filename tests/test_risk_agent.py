@@ -0,0 +1,66 @@
+# tests/test_risk_agent.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.risk_agent import AcademicRiskAgent, training_fingerprint
+from pipeline.id_codes import encode_frames
+
+
+@pytest.fixture(scope="module")
+def cohort():
+    rng = np.random.default_rng(7)
+    n_students, n_subjects, exams = 300, 6, 4
+    students = pd.DataFrame({
+        "student_id": [f"S{i:05}" for i in range(n_students)],
+        "name": "x",
+        "current_semester": rng.integers(1, 9, n_students),
+        "branch": rng.choice(["CE", "IT", "ME"], n_students),
+    })
+    subjects = pd.DataFrame({
+        "subject_id": [f"SUB{i:03}" for i in range(n_subjects)],
+        "name": [f"Subject {i}" for i in range(n_subjects)],
+        "credits": 4,
+        "difficulty_factor": rng.uniform(0.6, 1.0, n_subjects).round(2),
+    })
+    rows = n_students * n_subjects * exams
+    performance = pd.DataFrame({
+        "student_id": np.repeat(students["student_id"], n_subjects * exams).to_numpy(),
+        "subject_id": np.tile(np.repeat(subjects["subject_id"], exams), n_students),
+        "exam_type": np.tile(["IA1", "IA2", "Lab", "EndSem"], n_students * n_subjects),
+        "marks_obtained": rng.integers(20, 100, rows).astype(float),
+        "max_marks": 100.0,
+        "attendance": rng.integers(40, 100, rows).astype(float),
+    })
+    return students, subjects, performance
+
+
+def test_fingerprint_ignores_id_encoding(cohort):
+    students, subjects, performance = cohort
+    _, _, coded_subjects, coded_performance = encode_frames(students, subjects, performance)
+    assert training_fingerprint(performance, subjects) == training_fingerprint(
+        coded_performance, coded_subjects
+    )
+
+    changed = performance.copy()
+    changed.loc[0, "subject_id"] = "SUB001"
+    assert training_fingerprint(changed, subjects) != training_fingerprint(performance, subjects)
+
+
+def test_saved_model_is_shared_between_string_and_coded_ids(cohort, tmp_path):
+    students, subjects, performance = cohort
+    path = str(tmp_path / "risk.joblib")
+    _, _, coded_subjects, coded_performance = encode_frames(students, subjects, performance)
+
+    AcademicRiskAgent.load_or_fit(coded_performance, coded_subjects, path)
+    agent = AcademicRiskAgent.load_or_fit(performance, subjects, path)
+    # Loaded from the compiled export, not retrained
+    assert agent.model is None
+
+
+def test_predict_on_no_marks_returns_empty_scores(cohort, tmp_path):
+    students, subjects, performance = cohort
+    agent = AcademicRiskAgent.load_or_fit(performance, subjects, str(tmp_path / "risk.joblib"))
+    scores = agent.predict(performance.iloc[:0], subjects)
+    assert scores.empty
+    assert list(scores.columns) == ["student_id", "risk_level", "risk_score"]
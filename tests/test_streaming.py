@@ -0,0 +1,89 @@
+# tests/test_streaming.py
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from agents.risk_agent import AcademicRiskAgent
+from agents.weak_subject_agent import WeakSubjectAgent
+from pipeline.data_loader import read_csv_table
+from pipeline.streaming import iter_chunks, stream_weak_and_features
+
+from conftest import PROJECT_ROOT
+
+
+def _tables(data_dir):
+    return (read_csv_table(os.path.join(data_dir, "subjects.csv"), "subjects"),
+            read_csv_table(os.path.join(data_dir, "performance.csv"), "performance"))
+
+
+def _in_memory(performance, subjects):
+    weak = WeakSubjectAgent().run(performance, subjects).reset_index(drop=True)
+    features = AcademicRiskAgent().prepare_features(performance, subjects)
+    return weak, features.sort_values("student_id").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("chunk_rows", [25, 100, 10_000])
+def test_streaming_matches_the_full_table(generated_dir, chunk_rows):
+    subjects, performance = _tables(generated_dir)
+    weak, features = _in_memory(performance, subjects)
+
+    streamed_weak, streamed_features = stream_weak_and_features(
+        subjects, os.path.join(generated_dir, "performance.csv"), chunk_rows
+    )
+
+    assert_frame_equal(streamed_weak, weak)
+    # Chunked sums may differ from one-shot means in the last bits only
+    assert_frame_equal(streamed_features, features, check_exact=False, rtol=1e-12)
+
+
+def test_parquet_chunks_keep_missing_ids(tmp_path):
+    ids = pd.Categorical(["S1", None, "S2", "S1"])
+    pd.DataFrame({"student_id": ids, "subject_id": pd.Categorical(["A", "B", None, "A"]),
+                  "marks_obtained": [50, 60, 70, 80]}).to_parquet(tmp_path / "perf.parquet")
+
+    chunks = list(iter_chunks(str(tmp_path / "perf.parquet"), chunk_rows=2))
+    student_ids = pd.concat([c["student_id"] for c in chunks], ignore_index=True)
+
+    assert student_ids.tolist()[::2] == ["S1", "S2"]
+    assert student_ids.isna().tolist() == [False, True, False, False]
+    assert "nan" not in student_ids.tolist()
+
+
+def test_runner_stream_mode_matches_the_sharded_run(generated_dir, tmp_path):
+    pytest.importorskip("sklearn")
+    script = os.path.join(PROJECT_ROOT, "scripts", "run_pipeline.py")
+    common = ["--data-dir", generated_dir, "--cache-dir", str(tmp_path / "cache"),
+              "--model-path", str(tmp_path / "model.joblib")]
+
+    # The sharded run trains the model that the streamed run scores with
+    for out, extra in (("sharded", ["--workers", "1"]), ("streamed", ["--stream", "--chunk-rows", "50"])):
+        subprocess.run([sys.executable, script, *common, "--out-dir", str(tmp_path / out), *extra],
+                       check=True, capture_output=True, cwd=tmp_path)
+
+    for filename in ("weak_subjects.csv", "risk_scores.csv", "study_plan.csv"):
+        sharded, streamed = (
+            pd.read_csv(tmp_path / out / filename).sort_values(["student_id"], kind="stable")
+            .reset_index(drop=True)
+            for out in ("sharded", "streamed")
+        )
+        assert_frame_equal(streamed, sharded)
+
+    mentorship = pd.read_csv(tmp_path / "streamed" / "mentorship.csv")
+    assert np.array_equal(np.sort(mentorship["student_id"].unique()),
+                          np.sort(pd.read_csv(os.path.join(generated_dir, "students.csv"))["student_id"]))
+
+
+def test_runner_stream_mode_needs_a_saved_model(generated_dir, tmp_path):
+    script = os.path.join(PROJECT_ROOT, "scripts", "run_pipeline.py")
+    result = subprocess.run(
+        [sys.executable, script, "--stream", "--data-dir", generated_dir,
+         "--model-path", str(tmp_path / "missing.joblib"), "--out-dir", str(tmp_path / "out")],
+        capture_output=True, text=True, cwd=tmp_path,
+    )
+    assert result.returncode != 0
+    assert "run once without --stream" in result.stderr
@@ -0,0 +1,62 @@
+# tests/test_study_scheduler.py
+from datetime import date
+
+import pandas as pd
+
+from agents.study_scheduler_agent import StudySchedulerAgent
+
+TODAY = date(2026, 5, 1)
+
+
+def _inputs():
+    weak = pd.DataFrame({
+        "student_id": ["S1", "S1", "S1", "S2", "S2"],
+        "subject_id": ["A", "B", "C", "D", "E"],
+        "avg_score": [20, 50, 40, 90, 10],
+    })
+    subjects = pd.DataFrame({"subject_id": list("ABCDE"), "credits": [4, 2, 1, 1, 1]})
+    performance = pd.DataFrame({
+        "student_id": ["S1", "S1", "S1", "S1"],
+        "subject_id": ["A", "B", "B", "C"],
+        # C's only exam is already past; B's next exam is the earlier one
+        "exam_date": ["2026-05-04", "2026-05-20", "2026-05-11", "2026-04-01"],
+    })
+    return weak, subjects, performance
+
+
+def test_packs_sessions_earliest_deadline_first():
+    weak, subjects, performance = _inputs()
+    agent = StudySchedulerAgent(daily_hours=2, session_hours=1)
+    plan = agent.run(weak, subjects, performance, daily_hours={"S2": 1}, today=TODAY)
+
+    sessions = list(zip(plan["student_id"], plan["subject_id"], plan["scheduled_date"]))
+    assert sessions == [
+        # Two slots a day; A (exam on the 4th) before B (the 11th), C has no exam left
+        ("S1", "A", "2026-05-02"), ("S1", "B", "2026-05-02"),
+        ("S1", "A", "2026-05-03"), ("S1", "B", "2026-05-03"),
+        ("S1", "C", "2026-05-04"), ("S1", "C", "2026-05-05"),
+        # One slot a day, no exams: higher priority x credits first
+        ("S2", "E", "2026-05-02"), ("S2", "E", "2026-05-03"), ("S2", "D", "2026-05-04"),
+    ]
+    exam_dates = plan.drop_duplicates("subject_id").set_index("subject_id")["exam_date"]
+    assert exam_dates.to_dict() == {"A": "2026-05-04", "B": "2026-05-11", "C": None, "D": None, "E": None}
+
+
+def test_reports_sessions_that_miss_the_exam():
+    weak, subjects, performance = _inputs()
+    agent = StudySchedulerAgent(daily_hours=2, session_hours=1)
+    agent.run(weak, subjects, performance, today=TODAY)
+
+    # A needs ceil(4 credits x 0.8 x 2) = 7 sessions but only days 1-2 precede its exam
+    assert agent.shortfall.to_dict("records") == [
+        {"student_id": "S1", "subject_id": "A", "missed_sessions": 5}
+    ]
+
+
+def test_exams_before_today_give_no_deadline():
+    weak, subjects, performance = _inputs()
+    agent = StudySchedulerAgent(daily_hours=2, session_hours=1)
+    plan = agent.run(weak, subjects, performance, today=date(2026, 6, 1))
+
+    assert plan["exam_date"].isna().all()
+    assert agent.shortfall.empty
@@ -1,9 +1,11 @@
 # ui/app.py
 import streamlit as st
-import pandas as pd
 import os
 
+import json
 import sys
+import time
+from datetime import date
 
 # -------------------------
 # Path setup
@@ -15,12 +17,18 @@ if PROJECT_ROOT not in sys.path:
 # -------------------------
 # Imports
 # -------------------------
-from agents.weak_subject_agent import WeakSubjectAgent
-from agents.risk_agent import AcademicRiskAgent
-from agents.study_plan_agent import StudyPlanAgent
 from agents.advanced_mentorship_insight_agent import AdvancedMentorshipAgent
-
-from services.ollama_wrapper import OllamaGenerator
+from agents.performance_trend_agent import PerformanceTrendAgent
+from pipeline.data_loader import load_data as load_columnar_data
+from pipeline.id_codes import encode_frames
+from pipeline.profiling import PROFILER, stage
+from pipeline.snapshot import CohortSnapshot, file_stamps
+
+from services.llm_backend import build_chain
+from services.llm_cache import get_default_cache
+from services.prompt_builder import (
+    compile_student_context, estimate_tokens, mentor_prompt, roadmap_prompt
+)
 
 # -------------------------
 # App Config
@@ -32,52 +40,68 @@ st.set_page_config(
 
 st.title("🎓 AI Autonomous Student Success Agent")
 
+# -------------------------
+# Debug profiling (sidebar)
+# -------------------------
+# Per session: the choice lives in session_state and only switches
+# recording for this session's script thread
+st.session_state["profiling"] = st.sidebar.toggle(
+    "🛠 Debug: stage profiling", value=st.session_state.get("profiling", PROFILER.enabled)
+)
+PROFILER.new_run(enabled=st.session_state["profiling"])
+
 # -------------------------
 # Load Data
 # -------------------------
 @st.cache_data
 def load_data():
-    students = pd.read_csv("data/students.csv", dtype=str)
-    subjects = pd.read_csv("data/subjects.csv", dtype=str)
-    performance = pd.read_csv("data/performance.csv", dtype=str)
+    # Typed columnar cache; the CSVs are parsed and stripped once at ingest.
+    # IDs become dense int32 codes and are decoded only for display.
+    return encode_frames(*load_columnar_data())
 
-    # Clean columns
-    students.columns = students.columns.str.strip()
-    subjects.columns = subjects.columns.str.strip()
-    performance.columns = performance.columns.str.strip()
 
-    # Strip values
-    students = students.apply(lambda x: x.str.strip())
-    subjects = subjects.apply(lambda x: x.str.strip())
-    performance = performance.apply(lambda x: x.str.strip())
+with stage("app.load_data") as s:
+    ids, students, subjects, performance = load_data()
+    s.set(rows=len(performance))
+display_subjects = ids.decode(subjects)
 
-    # Numeric safety
-    performance["marks_obtained"] = pd.to_numeric(
-        performance["marks_obtained"], errors="coerce"
-    ).fillna(0)
 
-    performance["max_marks"] = pd.to_numeric(
-        performance.get("max_marks", 100), errors="coerce"
-    ).fillna(100)
+# -------------------------
+# Cohort Snapshot
+# -------------------------
+@st.cache_resource(show_spinner="Building cohort snapshot...")
+def load_snapshot(stamps, day, _students, _subjects, _performance):
+    # stamps (size + mtime of the CSVs) and the day are the cache key; the
+    # snapshot itself is keyed on a content hash and rebuilt only when the
+    # data changes or its plan dates go stale
+    return CohortSnapshot.load_or_build(_students, _subjects, _performance)
+
+
+with stage("app.snapshot"):
+    snapshot = load_snapshot(
+        file_stamps(), date.today().isoformat(), students, subjects, performance
+    )
 
-    performance["attendance"] = pd.to_numeric(
-        performance.get("attendance", 0), errors="coerce"
-    ).fillna(0)
 
-    return students, subjects, performance
+@st.cache_resource(show_spinner="Computing performance trends...")
+def load_trends(stamps, _performance):
+    # One grouped pass over exam dates; lookups afterwards are index hits
+    return PerformanceTrendAgent().fit(_performance)
 
 
-students, subjects, performance = load_data()
+with stage("app.trends"):
+    trend_agent = load_trends(file_stamps(), performance)
 
 # -------------------------
 # Sidebar – Student Selection
 # -------------------------
 st.sidebar.header("Select Student")
-students["display_name"] = students["student_id"] + " - " + students["name"]
+students["display_name"] = ids.decode_students(students["student_id"]) + " - " + students["name"]
 selection = st.sidebar.selectbox("Student", students["display_name"])
 
 student_id = selection.split(" - ")[0]
-student_info = students[students["student_id"] == student_id].iloc[0]
+student_code = ids.student_code(student_id)
+student_info = ids.decode(students[students["student_id"] == student_code]).iloc[0]
 
 # -------------------------
 # Student Profile
@@ -92,45 +116,61 @@ c4.metric("Branch", student_info["branch"])
 # -------------------------
 # Initialize Agents
 # -------------------------
-weak_agent = WeakSubjectAgent()
-risk_agent = AcademicRiskAgent()
-study_agent = StudyPlanAgent()
 mentorship_agent = AdvancedMentorshipAgent()
-ollama_gen = OllamaGenerator()
-# -------------------------
-# Cache function for roadmap per student
-# -------------------------
-@st.cache_data(show_spinner=False)
-def generate_roadmap(student_id, student_weak, student_plan, student_risk):
-    roadmap_prompt = f"""
-You are an expert academic mentor.
 
-Create a concise, actionable roadmap for the student to achieve their priority score. 
-Use the following data:
 
-- Weak subjects: {student_weak.to_dict(orient='records')}
-- Personalized study plan: {student_plan.to_dict(orient='records')}
-- Current academic risk: {student_risk.to_dict(orient='records')}
+@st.cache_resource
+def load_llm():
+    # Configured fallback chain (LLM_BACKENDS); providers (and their SDKs)
+    # are built on first use, i.e. the first Generate click
+    return build_chain()
+
+
+# -------------------------
+# Streaming LLM output
+# -------------------------
+def format_output(raw):
+    # Format spacing cleanly
+    return "\n\n".join(line.strip() for line in raw.splitlines() if line.strip())
+
+
+def stream_output(prompt, store, key, fallback=None):
+    """
+    Render tokens as they arrive and keep the partial text in store, so a
+    cancelled run still shows what was generated. Pressing Stop reruns the
+    script, which closes the generator and its HTTP connection.
+    """
+    st.button("⏹ Stop", key=f"stop_{key}")
+    placeholder = st.empty()
+    llm = load_llm()
+    raw = ""
+    with stage(f"llm.{key.rsplit('_', 1)[0]}", prompt_tokens=estimate_tokens(prompt)) as s:
+        if s.enabled:
+            cache = get_default_cache()
+            hits, start, first_token = cache.hits, time.perf_counter(), None
+        for token in llm.stream(prompt, fallback=fallback):
+            if s.enabled and first_token is None:
+                first_token = time.perf_counter() - start
+            raw += token
+            store[student_id] = format_output(raw)
+            placeholder.markdown(raw)
+        if s.enabled:
+            s.set(
+                backend=llm.last_backend,
+                output_tokens=estimate_tokens(raw),
+                first_token_ms=round((first_token or 0) * 1000, 1),
+                cache_hit=cache.hits > hits,
+            )
+    placeholder.empty()
 
-Output the roadmap as:
-1. Step-by-step actions
-2. Weekly goals
-3. Motivation tips
-4. Focus areas for weak subjects
-Keep it under 300 words and actionable.
-"""
-    return ollama_gen.enhance(roadmap_prompt)
 
 # -------------------------
-# Run Agents
+# Agent Results (from snapshot)
 # -------------------------
-weak_df = weak_agent.run(performance, subjects)
-risk_df = risk_agent.run(performance, subjects)
-study_df = study_agent.run(weak_df)
-
-student_weak = weak_df[weak_df["student_id"] == student_id]
-student_risk = risk_df[risk_df["student_id"] == student_id]
-student_plan = study_df[study_df["student_id"] == student_id]
+with stage("app.snapshot_lookup"):
+    student_weak, student_risk, student_plan = (
+        ids.decode(frame) for frame in snapshot.lookup(student_code)
+    )
 
 # -------------------------
 # Risk Section
@@ -159,7 +199,7 @@ if student_weak.empty:
     st.success("No weak subjects detected 🎉")
 else:
     merged_weak = student_weak.merge(
-        subjects, on="subject_id", how="left"
+        display_subjects, on="subject_id", how="left"
     )
 
     display_cols = ["subject_id", "name", "avg_score"]
@@ -186,11 +226,13 @@ else:
 # -------------------------
 st.subheader("💡 AI Mentorship Insights (Deterministic)")
 
+# Timed as agent.mentorship.generate_mentorship by the agent itself
 logic_insights = mentorship_agent.generate_mentorship(
     student_info=student_info,
     student_risk=student_risk,
     student_weak=merged_weak if not student_weak.empty else student_weak,
-    student_plan=student_plan
+    student_plan=student_plan,
+    student_trend=trend_agent.student_trend(student_code)
 )
 
 st.text_area(
@@ -215,31 +257,22 @@ if 'roadmaps' not in st.session_state:
 st.subheader("🧠 AI Mentor & 🗺️ Roadmap")
 col1, col2 = st.columns(2)
 
+# Compact, token-budgeted analytics shared by the roadmap prompt
+roadmap_context = compile_student_context(
+    student_weak, student_plan, student_risk, subjects=display_subjects
+)
+
 ## -------------------------
 # Left column: AI Mentor
 # -------------------------
 with col1:
     if st.button("Generate AI Mentorship Guidance", key=f"ai_mentor_{student_id}"):
-        with st.spinner("Generating AI mentorship guidance..."):
-            raw_ai = ollama_gen.enhance(
-                f"""
-You are an expert academic mentor.
-
-Rewrite the mentorship advice below in:
-- clear bullet points
-- maximum 400 words
-- actionable steps
-- motivational but concise tone
-
-Mentorship Data:
-{logic_insights}
-"""
-            )
-
-            # Format spacing cleanly
-            st.session_state['ai_outputs'][student_id] = "\n\n".join(
-                line.strip() for line in raw_ai.splitlines() if line.strip()
-            )
+        stream_output(
+            mentor_prompt(logic_insights),
+            st.session_state['ai_outputs'],
+            key=f"ai_mentor_{student_id}",
+            fallback=logic_insights
+        )
 
     # Show AI text only if generated
     ai_text = st.session_state['ai_outputs'].get(student_id, "")
@@ -251,17 +284,30 @@ Mentorship Data:
 # -------------------------
 with col2:
     if st.button("Generate Roadmap", key=f"roadmap_{student_id}"):
-        with st.spinner("Creating personalized roadmap..."):
-            raw_roadmap = generate_roadmap(
-                student_id, student_weak, student_plan, student_risk
-            )
+        stream_output(
+            roadmap_prompt(roadmap_context),
+            st.session_state['roadmaps'],
+            key=f"roadmap_{student_id}",
+            fallback=logic_insights
+        )
 
-            # Format spacing cleanly
-            st.session_state['roadmaps'][student_id] = "\n\n".join(
-                line.strip() for line in raw_roadmap.splitlines() if line.strip()
-            )
+    st.caption(f"Roadmap context: ~{roadmap_context.tokens} prompt tokens")
 
     # Show roadmap only if generated
     roadmap_text = st.session_state['roadmaps'].get(student_id, "")
     if roadmap_text:  # only display if there is content
         st.text_area("🗺️ Personalized Roadmap", roadmap_text, height=520)
+
+# -------------------------
+# Debug panel: stage timings for this run
+# -------------------------
+if PROFILER.is_enabled():
+    with st.sidebar.expander("⏱ Stage timings", expanded=True):
+        timings = PROFILER.summary()
+        st.dataframe(timings, width="stretch", hide_index=True)
+        st.caption(f"LLM cache: {get_default_cache().stats()}")
+        st.download_button(
+            "Export JSON lines",
+            "\n".join(json.dumps(r, default=str) for r in PROFILER.run_records()),
+            file_name="stage_timings.jsonl",
+        )
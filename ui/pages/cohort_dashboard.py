@@ -0,0 +1,133 @@
+# ui/pages/cohort_dashboard.py
+import streamlit as st
+import os
+
+import sys
+
+# -------------------------
+# Path setup
+# -------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# -------------------------
+# Imports
+# -------------------------
+from pipeline.cohort_cube import ALL, RISK_LEVELS, CohortCube
+from pipeline.data_loader import load_data as load_columnar_data
+from pipeline.profiling import PROFILER, stage
+from pipeline.snapshot import file_stamps
+
+# -------------------------
+# App Config
+# -------------------------
+st.set_page_config(
+    page_title="Cohort Dashboard",
+    layout="wide"
+)
+
+st.title("🏫 Cohort Dashboard")
+# Same per-session profiling switch as the main page
+PROFILER.new_run(enabled=st.session_state.get("profiling", PROFILER.enabled))
+
+# -------------------------
+# Load Cube
+# -------------------------
+@st.cache_resource(show_spinner="Building cohort rollups...")
+def load_cube(stamps):
+    # stamps (size + mtime of the CSVs) are the cache key; the cube itself
+    # is stored next to the cohort snapshot and rebuilt only on new data
+    return CohortCube.load_or_build(*load_columnar_data())
+
+
+with stage("dashboard.cube"):
+    cube = load_cube(file_stamps())
+
+# -------------------------
+# Sidebar – Filters
+# -------------------------
+st.sidebar.header("Filter Cohort")
+branch = st.sidebar.selectbox("Branch", [ALL] + cube.values("branch"))
+semester = st.sidebar.selectbox("Semester", [ALL] + cube.values("semester"))
+
+# "All" reads the rolled-up cells
+branch_key = None if branch == ALL else branch
+semester_key = None if semester == ALL else semester
+
+# -------------------------
+# Headline Metrics
+# -------------------------
+cell = cube.cell(branch=branch_key, semester=semester_key)
+
+st.subheader(f"📊 {branch} branch · {semester} semester")
+
+if not cell:
+    st.info("No students in this selection.")
+    st.stop()
+
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Students", int(cell["students"]))
+c2.metric("High Risk", f"{cell['high_share']:.1%}")
+c3.metric("Mean Risk Score", round(float(cell["mean_risk_score"]), 2))
+c4.metric("Weak Subject Rate", f"{cell['weak_rate']:.1%}")
+
+# -------------------------
+# Risk Distribution
+# -------------------------
+st.subheader("⚠️ Risk Distribution")
+
+# Break the selection out by whichever dimension is not fixed
+by = "branch" if branch_key is None else "semester"
+breakdown = cube.query(
+    branch="*" if by == "branch" else branch_key,
+    semester="*" if by == "semester" else semester_key,
+)
+if by == "semester":
+    breakdown = breakdown.sort_values("semester", key=lambda s: s.astype(int))
+
+risk_counts = breakdown.set_index(by)[[level.lower() for level in RISK_LEVELS]]
+risk_counts.columns = RISK_LEVELS
+st.bar_chart(risk_counts)
+
+# -------------------------
+# High-Risk Share: Branch x Semester
+# -------------------------
+st.subheader("🔥 High-Risk Share (%) by Branch and Semester")
+
+grid = cube.query(branch="*", semester="*")
+heatmap = grid.pivot(index="branch", columns="semester", values="high_share")
+heatmap = (heatmap[sorted(heatmap.columns, key=int)] * 100).round(1)
+st.dataframe(heatmap, width="stretch")
+
+# -------------------------
+# Subjects
+# -------------------------
+st.subheader("📉 Subjects")
+
+with stage("dashboard.subjects"):
+    subjects = cube.query(branch=branch_key, semester=semester_key, subject="*")
+
+if subjects.empty:
+    st.info("No subject results for this selection.")
+else:
+    table = subjects.sort_values("weak_rate", ascending=False)[
+        ["subject_id", "subject", "enrolled", "weak", "weak_rate", "mean_score", "high_share"]
+    ].rename(columns={
+        "subject": "name",
+        "enrolled": "students",
+        "weak": "weak_students",
+        "weak_rate": "weak_rate_%",
+        "mean_score": "avg_score",
+        "high_share": "high_risk_%",
+    })
+    table[["weak_rate_%", "high_risk_%"]] = (table[["weak_rate_%", "high_risk_%"]] * 100).round(1)
+    table["avg_score"] = table["avg_score"].round(2)
+
+    st.dataframe(table, width="stretch", hide_index=True)
+
+    st.download_button(
+        "Download subject rollup (CSV)",
+        table.to_csv(index=False),
+        file_name=f"cohort_subjects_{branch}_{semester}.csv".lower(),
+    )